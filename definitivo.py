@@ -1,3 +1,4 @@
+INICIO_PROGRAMA = __import__("time").perf_counter()  # Para --medir-inicio (antes de cualquier importación)
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
@@ -6,6 +7,1468 @@ import sys
 import customtkinter  # Librería para interfaz moderna
 import fnmatch  # Para búsqueda con comodines (wildcards)
 import re  # Necesario para el compilador para procesar cadenas con comillas
+from concurrent.futures import ThreadPoolExecutor  # Trabajo en paralelo (ProcessPoolExecutor se importa al usarse)
+from collections import deque, OrderedDict, namedtuple  # Colas, cachés ordenadas por uso y registros
+import gzip  # Compresión de cada bloque de un .tar.gz
+import time  # Fecha actual para calcular la antigüedad de los archivos
+import hashlib  # Comparación opcional por contenido al sincronizar
+import hmac  # Comparar el token del servicio sin filtrar información por el tiempo
+import secrets  # Token aleatorio del modo servicio
+import struct  # Lectura de cabeceras binarias (tamaño y fecha de fotos/videos)
+import json  # Caché de metadatos guardada en disco
+import unicodedata  # Quitar tildes al comparar palabras clave del compilador
+import argparse  # Opciones de línea de comandos (ej: --script)
+import heapq  # Elegir las mejores coincidencias sin ordenar todo
+import threading  # Búsqueda instantánea en segundo plano
+import queue  # Pasar resultados del hilo de búsqueda a la ventana
+from array import array  # Listas compactas de números (tabla de nombres)
+from itertools import islice  # Recorrer candidatos por bloques
+import socket  # Socket Unix del modo servicio
+import tempfile  # Volcar a disco resultados de búsqueda muy grandes
+import errno  # Códigos de error del sistema (ej: "operación no soportada")
+import stat  # Tipo de archivo a partir de os.stat (caché de metadatos)
+import functools  # Decorador de las operaciones masivas (conserva nombre y docstring)
+
+try:
+    import fcntl  # ioctl FICLONE para copias reflink (solo Linux/Unix)
+except ImportError:
+    fcntl = None
+
+# Módulos pesados que solo usan algunas funciones (zipfile/tarfile, tomllib, ctypes,
+# ProcessPoolExecutor, csv, marshal, http.server) se importan dentro de ellas: así la ventana abre antes.
+
+# Carpeta donde el gestor guarda sus cachés entre sesiones (y los trabajos reanudables)
+DIRECTORIO_DATOS = os.path.join(os.path.expanduser('~'), '.gestor_archivos')
+DIRECTORIO_TRABAJOS = os.path.join(DIRECTORIO_DATOS, "trabajos")
+
+# Definimos a qué carpetas van las extensiones
+MAPEO_TIPOS = {
+    "Imagenes": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp"],
+    "Documentos": [".pdf", ".docx", ".xlsx", ".pptx", ".txt", ".csv", ".md"],
+    "Comprimidos": [".zip", ".rar", ".7z", ".tar", ".gz"],
+    "Musica": [".mp3", ".wav", ".aac", ".flac"],
+    "Videos": [".mp4", ".mov", ".avi", ".mkv"],
+    "Programas": [".exe", ".msi", ".dmg", ".deb", ".rpm"],
+    "Codigo": [".py", ".js", ".html", ".css", ".java", ".c", ".cpp", ".php"]
+}
+
+# Extensiones de las que se pueden extraer metadatos (dimensiones y fecha)
+EXTENSIONES_MULTIMEDIA = set(MAPEO_TIPOS["Imagenes"] + MAPEO_TIPOS["Videos"])
+
+# Cantidad de hilos usados para analizar carpetas en paralelo (el trabajo es de E/S, no de CPU)
+HILOS_ANALISIS = min(8, (os.cpu_count() or 1) * 2)
+
+# Modo de bajo consumo: memoria máxima de resultados antes de volcarlos a un archivo
+# temporal, y cuántas carpetas abiertas a la vez puede tener el recorrido
+MEMORIA_RESULTADOS = 64 * 1024 * 1024
+MAX_CARPETAS_ABIERTAS = 64
+MAX_LINEAS_LIGERO = 1000  # Resultados que muestra el compilador en modo ligero
+
+# Exportación de búsquedas: formatos según la extensión del archivo (+ ".gz" para comprimir)
+FORMATOS_EXPORTACION = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".gcol": "columnar"}
+FILAS_POR_GRUPO = 65536  # Formato columnar: filas que se juntan antes de escribir cada grupo
+FIRMA_COLUMNAR = b"GESTORCOL1\n"
+
+# Caché de metadatos (tipo, tamaño, fecha, inodo) compartida por todas las operaciones:
+# cuántas rutas recuerda como máximo y cuántos segundos se confía en cada dato
+CACHE_METADATOS_MAXIMO = 200_000
+CACHE_METADATOS_SEGUNDOS = 60
+
+# Trabajos largos reanudables (organizar, copias masivas): cada cuántos pasos o segundos
+# se guarda un punto de control, pasos del plan por línea del registro y cuántos
+# registros de trabajos terminados se conservan
+PUNTO_CONTROL_PASOS = 500
+PUNTO_CONTROL_SEGUNDOS = 2.0
+PASOS_POR_LINEA = 1000
+MAX_TRABAJOS_TERMINADOS = 50
+
+# Límites de E/S de las operaciones masivas (servidores compartidos), ver LimitadorES:
+# prioridades de disco (clase y nivel de ioprio: 2 = best-effort, 3 = idle), número de la
+# llamada ioprio_set() según la arquitectura, y cuándo la latencia se considera alta
+PRIORIDADES_ES = {"normal": (2, 4), "baja": (2, 7), "minima": (3, 0)}
+SYS_IOPRIO_SET = {"x86_64": 251, "i686": 289, "aarch64": 30, "armv7l": 314}
+IOPRIO_WHO_PROCESS = 1  # Con el id de un hilo: aplica solo a ese hilo
+UMBRAL_LATENCIA = 2.0   # Latencia media mayor a 2 veces la habitual: frenar a la mitad
+LATENCIA_MINIMA = 0.001  # Por debajo de 1 ms no se frena (ruido de la caché del sistema)
+FACTOR_MINIMO = 0.05     # Nunca se baja de un 5 % del ritmo configurado
+RAFAGA_LIMITE = 0.25     # Segundos de "ahorro" que se pueden gastar de golpe tras una pausa
+
+# Modo servicio (--serve): puerto local, hilos que atienden, peticiones que pueden esperar
+# antes de responder 503, y caché de búsquedas compartida entre peticiones
+PUERTO_SERVICIO = 8765
+HILOS_SERVICIO = 8
+COLA_SERVICIO = 32
+MAX_CUERPO_SERVICIO = 1024 * 1024
+HOSTS_SERVICIO = ("127.0.0.1", "localhost", "[::1]")  # Cualquier otro Host se rechaza (DNS rebinding)
+CACHE_SERVICIO_ENTRADAS = 64
+CACHE_SERVICIO_SEGUNDOS = 30
+CACHE_SERVICIO_MAX_RESULTADOS = 100_000
+
+# Sincronización: hilos de copia y diferencia de fechas tolerada (FAT/exFAT guardan de a 2 s)
+HILOS_COPIA = 4
+TOLERANCIA_MTIME = 2.0
+
+# Estrategias de copia: reflink (clon instantáneo en Btrfs/XFS), hardlink (mismo archivo
+# con dos nombres), full (copia completa de los bytes) y auto (reflink si se puede, si no full)
+ESTRATEGIAS_COPIA = ("auto", "reflink", "hardlink", "full")
+FICLONE = 0x40049409  # Número del ioctl de Linux que clona un archivo
+
+# Qué hacer cuando al mover/renombrar/organizar el nombre destino ya existe
+POLITICAS_CONFLICTO = ("renombrar", "saltar", "sobrescribir", "conservar_reciente")
+RENAME_NOREPLACE = 1  # Bandera de renameat2(): falla con EEXIST en vez de reemplazar
+AT_FDCWD = -100       # "Relativo a la carpeta actual" para las llamadas *at() de Linux
+
+# Compresión de .tar.gz: tamaño de cada bloque que comprime un proceso y cantidad de procesos
+BLOQUE_COMPRESION = 1024 * 1024
+PROCESOS_COMPRESION = os.cpu_count() or 1
+
+
+def formatear_tamano(tamano_bytes):
+    """Convierte una cantidad de bytes en un texto legible (ej: 1536 → '1.50 KB')."""
+    tamano = float(tamano_bytes)
+    for unidad in ("B", "KB", "MB", "GB", "TB"):
+        if tamano < 1024 or unidad == "TB":
+            return f"{tamano:.2f} {unidad}" if unidad != "B" else f"{int(tamano)} B"
+        tamano /= 1024
+
+
+def copiar_rapido(ruta_origen, ruta_destino):
+    """
+    Copia un archivo usando la vía más rápida que ofrezca el sistema operativo:
+    os.copy_file_range (Linux, la copia ocurre dentro del kernel) y, si no está
+    disponible, shutil.copyfile (que usa sendfile/fcopyfile). Conserva las fechas.
+    Se escribe primero en un archivo temporal y luego se renombra, así el destino
+    nunca queda a medio copiar.
+    """
+    ruta_temporal = ruta_destino + ".gestor-tmp"
+    try:
+        copiado = False
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(ruta_origen, 'rb') as f_origen, open(ruta_temporal, 'wb') as f_destino:
+                    while os.copy_file_range(f_origen.fileno(), f_destino.fileno(), 1 << 30):
+                        pass
+                copiado = True
+            except OSError:
+                copiado = False  # Ej: sistemas de archivos distintos en kernels viejos
+        if not copiado:
+            shutil.copyfile(ruta_origen, ruta_temporal)
+        shutil.copystat(ruta_origen, ruta_temporal)
+        os.replace(ruta_temporal, ruta_destino)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+def _hash_archivo(ruta):
+    """Calcula el hash SHA-1 de un archivo leyéndolo por bloques."""
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def clonar_reflink(ruta_origen, ruta_destino):
+    """
+    Crea ruta_destino como clon reflink de ruta_origen: comparten los bloques en disco
+    hasta que alguno se modifique, así la copia es instantánea y no ocupa espacio.
+    Lanza OSError si el sistema de archivos no lo soporta.
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink no disponible en este sistema")
+    try:
+        with open(ruta_origen, 'rb') as f_origen, open(ruta_destino, 'wb') as f_destino:
+            fcntl.ioctl(f_destino.fileno(), FICLONE, f_origen.fileno())
+        shutil.copystat(ruta_origen, ruta_destino)
+    except OSError:
+        if os.path.exists(ruta_destino):
+            os.remove(ruta_destino)
+        raise
+
+
+InfoArchivo = namedtuple("InfoArchivo", "tipo tamano mtime_ns inodo dispositivo")
+
+
+class CacheMetadatos:
+    """
+    Recuerda el resultado de os.stat() de cada ruta ya vista (por cualquier recorrido:
+    búsquedas, organizar, análisis de espacio...) para que la siguiente operación sobre
+    la misma carpeta no vuelva a consultar el disco archivo por archivo.
+    - LRU: pasado `maximo` se olvidan las rutas usadas hace más tiempo
+    - Caducidad: un dato con más de `caducidad` segundos se vuelve a leer (cambios externos)
+    - Las operaciones del propio gestor (mover, borrar, renombrar, ...) invalidan sus rutas
+    Se comparte entre hilos, así que todo pasa por un candado.
+    """
+
+    def __init__(self, maximo=CACHE_METADATOS_MAXIMO, caducidad=CACHE_METADATOS_SEGUNDOS):
+        self.maximo = maximo
+        self.caducidad = caducidad
+        self._entradas = OrderedDict()  # ruta -> (momento, InfoArchivo)
+        self._candado = threading.Lock()
+        self.aciertos = self.fallos = self.invalidaciones = 0
+
+    def guardar(self, ruta, info):
+        """Guarda un os.stat_result (de os.stat o de DirEntry.stat) y devuelve su InfoArchivo."""
+        if stat.S_ISREG(info.st_mode):
+            tipo = "archivo"
+        elif stat.S_ISDIR(info.st_mode):
+            tipo = "carpeta"
+        else:
+            tipo = "otro"
+        dato = InfoArchivo(tipo, info.st_size, info.st_mtime_ns, info.st_ino, info.st_dev)
+        with self._candado:
+            self._entradas[ruta] = (time.monotonic(), dato)
+            self._entradas.move_to_end(ruta)
+            if len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return dato
+
+    def obtener(self, ruta):
+        """InfoArchivo guardado y vigente de la ruta, o None (cuenta aciertos y fallos)."""
+        with self._candado:
+            entrada = self._entradas.get(ruta)
+            if entrada is not None and time.monotonic() - entrada[0] <= self.caducidad:
+                self._entradas.move_to_end(ruta)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._entradas[ruta]  # Caducado
+            self.fallos += 1
+            return None
+
+    def stat(self, ruta, entrada=None):
+        """
+        InfoArchivo de una ruta: de la caché si está, si no del disco (y se guarda).
+        `entrada` es el os.DirEntry si se está recorriendo una carpeta con scandir.
+        Lanza OSError si la ruta no existe.
+        """
+        dato = self.obtener(ruta)
+        if dato is None:
+            dato = self.guardar(ruta, entrada.stat() if entrada is not None else os.stat(ruta))
+        return dato
+
+    def invalidar(self, *rutas):
+        """Olvida rutas que el gestor acaba de crear, cambiar o borrar."""
+        with self._candado:
+            for ruta in rutas:
+                # Las rutas se guardan tal como las dio el recorrido: se prueba también la forma normalizada
+                for forma in {ruta, os.path.normpath(ruta)}:
+                    if self._entradas.pop(forma, None) is not None:
+                        self.invalidaciones += 1
+
+    def invalidar_carpeta(self, carpeta):
+        """Olvida una carpeta y todo lo guardado dentro (borrados, sincronizaciones, extracciones)."""
+        carpetas = {carpeta.rstrip(os.sep) or os.sep, os.path.normpath(carpeta)}
+        prefijos = tuple(os.path.join(c, "") for c in carpetas)
+        with self._candado:
+            dentro = [r for r in self._entradas if r in carpetas or r.startswith(prefijos)]
+            for ruta in dentro:
+                del self._entradas[ruta]
+            self.invalidaciones += len(dentro)
+
+    def vaciar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        porcentaje = 100 * self.aciertos / consultas if consultas else 0
+        return (f"ℹ️ Caché de metadatos: {self.aciertos} aciertos, {self.fallos} fallos "
+                f"({porcentaje:.1f} % de aciertos), {len(self)} rutas guardadas, "
+                f"{self.invalidaciones} invalidaciones.")
+
+
+# Una sola caché para todo el proceso (ventana, compilador y servicio)
+CACHE_METADATOS = CacheMetadatos()
+
+
+def _cargar_renameat2():
+    """Busca renameat2() en la libc (glibc 2.28+); devuelve None si no está disponible."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes  # Llamar a funciones de la libc
+    try:
+        funcion = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    funcion.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    funcion.restype = ctypes.c_int
+    return funcion
+
+
+_renameat2 = False  # False: todavía no se buscó (se carga en el primer uso); None: no disponible
+
+
+def renombrar_sin_sobrescribir(ruta_origen, ruta_destino):
+    """
+    Mueve ruta_origen a ruta_destino SOLO si el destino no existe; si existe lanza
+    FileExistsError sin tocar nada. La comprobación y el movimiento son una sola
+    operación atómica, así que no hay carrera entre "ver si existe" y "mover":
+    1. renameat2(RENAME_NOREPLACE) si el kernel y el sistema de archivos lo soportan
+    2. os.link() + os.unlink(): link falla con EEXIST de forma atómica (solo archivos)
+    3. Entre volúmenes distintos: copia temporal en el volumen destino y se aplica lo anterior
+    """
+    global _renameat2
+    entre_volumenes = False
+    if _renameat2 is False:
+        _renameat2 = _cargar_renameat2()
+
+    if _renameat2 is not None:
+        if _renameat2(AT_FDCWD, os.fsencode(ruta_origen), AT_FDCWD, os.fsencode(ruta_destino), RENAME_NOREPLACE) == 0:
+            return
+        import ctypes  # Ya cargado por _cargar_renameat2
+        codigo = ctypes.get_errno()
+        if codigo == errno.ENOSYS:
+            _renameat2 = None  # Kernel antiguo: no volvemos a intentarlo
+        elif codigo == errno.EXDEV:
+            entre_volumenes = True
+        elif codigo != errno.EINVAL:  # EINVAL: este sistema de archivos no soporta la bandera
+            # OSError elige la subclase según el código (FileExistsError, FileNotFoundError, ...)
+            raise OSError(codigo, os.strerror(codigo), ruta_destino)
+
+    if not entre_volumenes and not os.path.isdir(ruta_origen):
+        try:
+            os.link(ruta_origen, ruta_destino, follow_symlinks=False)
+            os.unlink(ruta_origen)
+            return
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                entre_volumenes = True
+            elif e.errno not in (errno.EPERM, errno.EOPNOTSUPP, errno.EMLINK, errno.ENOSYS):
+                raise
+            # FAT, exFAT, algunos montajes de red... no tienen enlaces duros
+
+    if entre_volumenes:
+        # La copia se arma en una carpeta temporal con nombre único junto al destino (nunca
+        # pisa un archivo ajeno) y se borra pase lo que pase: si la copia falla a medias
+        # (ej: disco lleno) no quedan restos
+        carpeta_temporal = tempfile.mkdtemp(prefix=".gestor-", dir=os.path.dirname(ruta_destino) or ".")
+        temporal = os.path.join(carpeta_temporal, os.path.basename(ruta_destino))
+        try:
+            if os.path.isdir(ruta_origen) and not os.path.islink(ruta_origen):
+                shutil.copytree(ruta_origen, temporal, symlinks=True)
+            else:
+                shutil.copy2(ruta_origen, temporal, follow_symlinks=False)
+            renombrar_sin_sobrescribir(temporal, ruta_destino)
+        finally:
+            shutil.rmtree(carpeta_temporal, ignore_errors=True)
+        if os.path.isdir(ruta_origen) and not os.path.islink(ruta_origen):
+            shutil.rmtree(ruta_origen)
+        else:
+            os.remove(ruta_origen)
+        return
+
+    # Último recurso (carpetas sin renameat2): comprobar y renombrar, con una pequeña ventana de carrera
+    if os.path.lexists(ruta_destino):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), ruta_destino)
+    os.rename(ruta_origen, ruta_destino)
+
+
+class NombresOcupados:
+    """
+    Recuerda en memoria qué nombres existen en cada carpeta destino para generar
+    "foto (1).jpg", "foto (2).jpg"... sin preguntar al disco en cada intento.
+    Cada carpeta se lista una sola vez y el contador de cada nombre sigue donde
+    quedó, así que un sufijo nuevo cuesta O(1) aunque haya cientos de colisiones.
+    """
+
+    def __init__(self):
+        self._carpetas = {}    # carpeta -> set de nombres existentes
+        self._contadores = {}  # (carpeta, nombre) -> último sufijo usado
+
+    def _nombres(self, carpeta):
+        nombres = self._carpetas.get(carpeta)
+        if nombres is None:
+            try:
+                nombres = set(os.listdir(carpeta))
+            except FileNotFoundError:
+                nombres = set()
+            self._carpetas[carpeta] = nombres
+        return nombres
+
+    def ocupado(self, carpeta, nombre):
+        return nombre in self._nombres(carpeta)
+
+    def reservar(self, carpeta, nombre):
+        self._nombres(carpeta).add(nombre)
+
+    def liberar(self, carpeta, nombre):
+        self._nombres(carpeta).discard(nombre)
+
+    def siguiente_libre(self, carpeta, nombre):
+        """Próximo "nombre (N).ext" que no está ocupado en la carpeta."""
+        ocupados = self._nombres(carpeta)
+        raiz, ext = os.path.splitext(nombre)
+        numero = self._contadores.get((carpeta, nombre), 0)
+        while True:
+            numero += 1
+            candidato = f"{raiz} ({numero}){ext}"
+            if candidato not in ocupados:
+                self._contadores[(carpeta, nombre)] = numero
+                return candidato
+
+
+class RegistroTrabajo:
+    """
+    Un trabajo largo (organizar una carpeta enorme, copiar miles de archivos) guardado
+    como registro de solo-agregar, en JSON por líneas, en ~/.gestor_archivos/trabajos/<id>.jsonl:
+      {"evento": "plan", "tipo", "parametros", "total", "creado"}    una vez, al crearlo
+      {"evento": "pasos", "pasos": [...]}                            el plan, por bloques
+      {"evento": "control" | "pausa" | "fin", "hechos", "contadores", ...}
+    El plan se escribe completo antes de empezar; después solo se agregan puntos de
+    control (una línea cada tanto), así que guardar el avance cuesta casi nada y un
+    cierre brusco pierde como mucho la última línea. Al reanudar se lee el plan y se
+    sigue desde el último punto de control, sin volver a recorrer las carpetas.
+    Mientras se ejecuta, el archivo queda bloqueado (flock) para que nadie lo reanude dos veces.
+    """
+
+    REANUDABLES = ("pendiente", "interrumpido", "pausado", "error")
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.id = os.path.splitext(os.path.basename(ruta))[0]
+        self.tipo = None
+        self.parametros = {}
+        self.pasos = []
+        self.total = 0
+        self.hechos = 0
+        self.contadores = {}
+        self.creado = self.actualizado = 0.0
+        self.estado = "pendiente"
+        self.mensaje = ""
+        self._archivo = None
+
+    @classmethod
+    def crear(cls, tipo, parametros, pasos):
+        """Guarda el plan de un trabajo nuevo (aparece completo o no aparece) y lo devuelve."""
+        os.makedirs(DIRECTORIO_TRABAJOS, exist_ok=True)
+        cls.podar()
+        id_trabajo = f"{time.strftime('%Y%m%d-%H%M%S')}-{tipo}-{os.urandom(2).hex()}"
+        registro = cls(os.path.join(DIRECTORIO_TRABAJOS, id_trabajo + ".jsonl"))
+        registro.tipo, registro.parametros, registro.pasos = tipo, parametros, pasos
+        registro.total = len(pasos)
+        registro.creado = registro.actualizado = time.time()
+
+        temporal = registro.ruta + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"evento": "plan", "tipo": tipo, "parametros": parametros,
+                                "total": registro.total, "creado": registro.creado}, ensure_ascii=False) + "\n")
+            for i in range(0, len(pasos), PASOS_POR_LINEA):
+                f.write(json.dumps({"evento": "pasos", "pasos": pasos[i:i + PASOS_POR_LINEA]},
+                                   ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, registro.ruta)
+        return registro
+
+    @classmethod
+    def cargar(cls, ruta, con_pasos=True):
+        """
+        Lee un registro y reconstruye su estado. Con con_pasos=False no se carga el plan
+        (para listar trabajos sin leer miles de pasos). Lanza OSError si no existe.
+        """
+        registro = cls(ruta)
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if not con_pasos and linea.startswith('{"evento": "pasos"'):
+                    continue
+                try:
+                    evento = json.loads(linea)
+                except ValueError:
+                    continue  # Línea cortada por un cierre brusco
+                tipo = evento.get("evento")
+                if tipo == "plan":
+                    registro.tipo = evento["tipo"]
+                    registro.parametros = evento["parametros"]
+                    registro.total = evento["total"]
+                    registro.creado = registro.actualizado = evento["creado"]
+                elif tipo == "pasos":
+                    registro.pasos.extend(evento["pasos"])
+                elif tipo in ("control", "pausa", "fin"):
+                    registro.hechos = evento["hechos"]
+                    registro.contadores = evento["contadores"]
+                    registro.actualizado = evento["momento"]
+                    registro.estado = {"control": "interrumpido", "pausa": "pausado"}.get(tipo, evento.get("estado"))
+                    registro.mensaje = evento.get("mensaje", "")
+        if registro.estado in cls.REANUDABLES and registro.en_uso():
+            registro.estado = "en curso"
+        return registro
+
+    @classmethod
+    def listar(cls):
+        """Todos los trabajos guardados (sin sus planes), del más reciente al más antiguo."""
+        try:
+            nombres = [n for n in os.listdir(DIRECTORIO_TRABAJOS) if n.endswith(".jsonl")]
+        except FileNotFoundError:
+            return []
+        registros = []
+        for nombre in nombres:
+            try:
+                registros.append(cls.cargar(os.path.join(DIRECTORIO_TRABAJOS, nombre), con_pasos=False))
+            except OSError:
+                continue  # Lo borró otro proceso mientras listábamos
+        registros.sort(key=lambda r: r.creado, reverse=True)
+        return registros
+
+    @classmethod
+    def podar(cls, conservar=MAX_TRABAJOS_TERMINADOS):
+        """Borra los registros terminados más viejos, dejando `conservar`. Devuelve cuántos borró."""
+        terminados = [r for r in cls.listar() if r.estado == "completado"]
+        for registro in terminados[conservar:]:
+            try:
+                os.remove(registro.ruta)
+            except OSError:
+                pass
+        return max(0, len(terminados) - conservar)
+
+    def en_uso(self):
+        """True si algún proceso (incluido este) está ejecutando el trabajo."""
+        if self._archivo is not None:
+            return True
+        if fcntl is None:
+            return False  # Sin flock (Windows) no se puede saber desde afuera
+        try:
+            with open(self.ruta, 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        return False
+
+    def abrir(self):
+        """Abre el registro para agregar eventos. Lanza RuntimeError si ya se está ejecutando."""
+        archivo = open(self.ruta, 'ab+')
+        if fcntl is not None:
+            try:
+                fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                archivo.close()
+                raise RuntimeError("el trabajo ya se está ejecutando")
+        archivo.seek(-1, os.SEEK_END)
+        if archivo.read(1) != b"\n":
+            archivo.write(b"\n")  # Separamos la línea que dejó cortada un cierre brusco
+        self._archivo = archivo
+        self.estado = "en curso"
+
+    def _agregar(self, evento, hechos, contadores, sincronizar=False):
+        self.hechos, self.contadores, self.actualizado = hechos, contadores, time.time()
+        evento.update(hechos=hechos, contadores=contadores, momento=self.actualizado)
+        self._archivo.write((json.dumps(evento, ensure_ascii=False) + "\n").encode('utf-8'))
+        self._archivo.flush()  # Llega al sistema operativo: sobrevive a un cierre de la app
+        if sincronizar:
+            os.fsync(self._archivo.fileno())
+
+    def punto_de_control(self, hechos, contadores):
+        self._agregar({"evento": "control"}, hechos, contadores)
+
+    def pausar(self, hechos, contadores):
+        self._agregar({"evento": "pausa"}, hechos, contadores, sincronizar=True)
+        self.estado = "pausado"
+
+    def terminar(self, estado, hechos, contadores, mensaje=""):
+        self._agregar({"evento": "fin", "estado": estado, "mensaje": mensaje}, hechos, contadores, sincronizar=True)
+        self.estado, self.mensaje = estado, mensaje
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()  # Libera también el candado
+            self._archivo = None
+
+    def describir(self):
+        """Una línea con el estado del trabajo (para el compilador y la pestaña Trabajos)."""
+        destino = self.parametros.get("destino")
+        ruta = self.parametros.get("ruta", "") + (f" → {destino}" if destino else "")
+        return f"{self.id}  {self.estado:<12} {self.hechos}/{self.total}  {self.tipo} {ruta}"
+
+
+def _cargar_ioprio_set():
+    """Prepara la llamada ioprio_set() de Linux (no está en os); None si no se puede usar."""
+    numero = SYS_IOPRIO_SET.get(os.uname().machine) if sys.platform.startswith("linux") else None
+    if numero is None:
+        return None
+    import ctypes  # Llamar a syscall() de la libc
+    try:
+        syscall = ctypes.CDLL(None, use_errno=True).syscall
+    except (OSError, AttributeError):
+        return None
+    return lambda clase, nivel: syscall(numero, IOPRIO_WHO_PROCESS, threading.get_native_id(), (clase << 13) | nivel)
+
+
+class LimitadorES:
+    """
+    Frena las operaciones masivas (organizar, copias, sincronizar, limpiar, deduplicar)
+    para que no saturen el disco de un servidor compartido:
+    - Cubo de fichas: como máximo `mb_por_segundo` MB/s y `archivos_por_segundo`
+      archivos/s (con ráfagas de hasta RAFAGA_LIMITE segundos). Vale para todos los hilos a la vez.
+    - Adaptativo: se mide la latencia de cada operación; si la media sube a más de
+      UMBRAL_LATENCIA veces la habitual (otro programa está usando el disco) el ritmo
+      baja a la mitad, y vuelve a subir de a poco cuando la latencia se normaliza.
+      Sin límites fijos, frenar significa dejar pausas entre operaciones.
+    - Prioridad: `nice` (0-19) y `prioridad_es` ("normal", "baja", "minima") se aplican
+      a los hilos que hacen el trabajo, no a la ventana (ver operacion_masiva).
+    Sin límites solo se mide (ritmo y latencia, ver estadisticas), sin esperar nunca.
+    """
+
+    def __init__(self, mb_por_segundo=None, archivos_por_segundo=None, nice=None, prioridad_es=None,
+                 adaptativo=False):
+        if mb_por_segundo is not None and mb_por_segundo <= 0:
+            raise ValueError("el límite de MB/s debe ser mayor que 0")
+        if archivos_por_segundo is not None and archivos_por_segundo <= 0:
+            raise ValueError("el límite de archivos/s debe ser mayor que 0")
+        if nice is not None and not 0 <= nice <= 19:
+            raise ValueError("nice debe estar entre 0 y 19")
+        if prioridad_es is not None and prioridad_es not in PRIORIDADES_ES:
+            raise ValueError(f"prioridad desconocida '{prioridad_es}' (usa: {', '.join(PRIORIDADES_ES)})")
+        self.mb_por_segundo = mb_por_segundo
+        self.archivos_por_segundo = archivos_por_segundo
+        self.nice = nice
+        self.prioridad_es = prioridad_es
+        self.adaptativo = adaptativo
+        self.factor = 1.0  # Fracción del ritmo configurado que se permite ahora
+
+        # Cubos: [fichas por segundo, fichas disponibles]; empiezan vacíos y las fichas pueden
+        # quedar en negativo: quien las dejó así espera lo que falta, sin frenar a los demás hilos
+        self._cubos = {}
+        if mb_por_segundo:
+            self._cubos["bytes"] = [mb_por_segundo * 1024 * 1024, 0.0]
+        if archivos_por_segundo:
+            self._cubos["archivos"] = [archivos_por_segundo, 0.0]
+        self._ultima_recarga = time.monotonic()
+        self._candado = threading.Lock()
+        self._local = threading.local()
+
+        self._latencia = None   # Media móvil de la latencia por operación
+        self._habitual = None   # Latencia de referencia (la mínima, que se adapta despacio)
+        self._ultimo_ajuste = time.monotonic()
+        self.operaciones = self.bytes = self.frenadas = 0
+        self.tiempo_es = 0.0
+        # Tiempo con alguna operación en curso (esperas incluidas): el ritmo real se mide
+        # sobre él, así los ratos sin operaciones no lo hacen parecer más bajo
+        self.tiempo_activo = 0.0
+        self._fin_activo = 0.0
+
+    def cambia_prioridad(self):
+        return self.nice is not None or self.prioridad_es is not None
+
+    def aplicar_prioridad(self):
+        """Baja la prioridad de CPU y de disco del hilo actual (solo se puede bajar, no subir)."""
+        if self.nice is not None:
+            try:
+                actual = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), max(actual, self.nice))
+            except (OSError, AttributeError):
+                pass  # Windows no tiene nice por hilo
+        if self.prioridad_es is not None:
+            global _ioprio_set
+            if _ioprio_set is False:
+                _ioprio_set = _cargar_ioprio_set()
+            if _ioprio_set is not None:
+                _ioprio_set(*PRIORIDADES_ES[self.prioridad_es])
+        self._local.aplicada = True
+
+    def prioridad_aplicada(self):
+        return getattr(self._local, "aplicada", False)
+
+    def ejecutar(self, funcion, *args, cantidad_bytes=0):
+        """Espera su turno, ejecuta funcion(*args) midiendo cuánto tarda y devuelve su resultado."""
+        llegada = time.monotonic()
+        if self._cubos:
+            self._esperar(cantidad_bytes)
+        inicio = time.monotonic()
+        try:
+            return funcion(*args)
+        finally:
+            self._registrar(llegada, inicio, cantidad_bytes)
+
+    def _esperar(self, cantidad_bytes):
+        espera = 0.0
+        with self._candado:
+            ahora = time.monotonic()
+            transcurrido, self._ultima_recarga = ahora - self._ultima_recarga, ahora
+            for nombre, cubo in self._cubos.items():
+                ritmo = cubo[0] * self.factor
+                cubo[1] = min(cubo[0] * RAFAGA_LIMITE, cubo[1] + transcurrido * ritmo)
+                cubo[1] -= cantidad_bytes if nombre == "bytes" else 1
+                if cubo[1] < 0:
+                    espera = max(espera, -cubo[1] / ritmo)
+        if espera > 0:
+            time.sleep(espera)
+
+    def _registrar(self, llegada, inicio, cantidad_bytes):
+        ahora = time.monotonic()
+        duracion = ahora - inicio
+        # Latencia por operación sin contar el tamaño (un archivo de 1 GB tarda más y no es "lentitud")
+        latencia = duracion / (1 + cantidad_bytes / (1024 * 1024))
+        pausa = 0.0
+        with self._candado:
+            # Con varios hilos las operaciones se solapan: solo se suma lo que no estaba contado
+            self.tiempo_activo += max(0.0, ahora - max(llegada, self._fin_activo))
+            self._fin_activo = max(self._fin_activo, ahora)
+            self.operaciones += 1
+            self.bytes += cantidad_bytes
+            self.tiempo_es += duracion
+            if not self.adaptativo:
+                return
+            self._latencia = latencia if self._latencia is None else 0.8 * self._latencia + 0.2 * latencia
+            if self._habitual is None or self._latencia < self._habitual:
+                self._habitual = self._latencia
+            else:
+                self._habitual += (self._latencia - self._habitual) * 0.001  # La referencia se adapta despacio
+            if ahora - self._ultimo_ajuste >= 0.5:
+                # AIMD: baja a la mitad si la latencia se disparó, sube de a poco si no
+                if self._latencia > max(UMBRAL_LATENCIA * self._habitual, LATENCIA_MINIMA):
+                    self.factor = max(FACTOR_MINIMO, self.factor / 2)
+                    self.frenadas += 1
+                else:
+                    self.factor = min(1.0, self.factor + 0.1)
+                self._ultimo_ajuste = ahora
+            if not self._cubos and self.factor < 1.0:
+                # Sin límites fijos: se usa el disco solo una fracción `factor` del tiempo
+                pausa = duracion * (1 / self.factor - 1)
+                self.tiempo_activo += pausa  # La pausa es parte de la operación frenada
+                self._fin_activo = ahora + pausa
+        if pausa > 0:
+            time.sleep(pausa)
+
+    def describir(self):
+        partes = []
+        if self.mb_por_segundo:
+            partes.append(f"{self.mb_por_segundo:g} MB/s")
+        if self.archivos_por_segundo:
+            partes.append(f"{self.archivos_por_segundo:g} archivos/s")
+        if self.nice is not None:
+            partes.append(f"nice {self.nice}")
+        if self.prioridad_es is not None:
+            partes.append(f"prioridad de disco {self.prioridad_es}")
+        if self.adaptativo:
+            partes.append("adaptativo")
+        return ", ".join(partes) if partes else "sin límites"
+
+    def estadisticas(self):
+        """Rendimiento medido: ritmo real, latencia media y cuánto se frenó."""
+        if not self.operaciones:
+            return f"ℹ️ Límites de E/S: {self.describir()}. Todavía no hay operaciones medidas."
+        total = max(self.tiempo_activo, 1e-9)
+        texto = (f"ℹ️ Límites de E/S: {self.describir()}. {self.operaciones} operaciones, "
+                 f"{self.bytes / total / (1024 * 1024):.1f} MB/s y {self.operaciones / total:.1f} archivos/s reales, "
+                 f"latencia media {self.tiempo_es / self.operaciones * 1000:.2f} ms")
+        if self.adaptativo:
+            texto += f", ritmo actual {self.factor * 100:.0f} % ({self.frenadas} frenadas)"
+        return texto + "."
+
+
+_ioprio_set = False  # False: todavía no se buscó; None: no disponible
+
+
+def operacion_masiva(metodo):
+    """
+    Decorador de los métodos de GestorDeArchivos que recorren o copian muchos archivos.
+    Si hay una prioridad configurada (nice / ioprio) el método corre en un hilo aparte con
+    esa prioridad: bajar la del hilo de la ventana no se podría deshacer sin ser root.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        limitador = self.limitador
+        if not limitador.cambia_prioridad() or limitador.prioridad_aplicada():
+            return metodo(self, *args, **kwargs)
+        with ThreadPoolExecutor(max_workers=1, initializer=limitador.aplicar_prioridad) as hilo:
+            return hilo.submit(metodo, self, *args, **kwargs).result()
+    return envoltura
+
+
+def _hash_inicio(ruta, cantidad=65536):
+    """Hash de los primeros bytes de un archivo (descarta rápido los que no son iguales)."""
+    with open(ruta, 'rb') as f:
+        return hashlib.sha1(f.read(cantidad)).hexdigest()
+
+
+def _comprimir_bloque(datos, nivel):
+    """Comprime un bloque como un miembro gzip independiente (se ejecuta en otro proceso)."""
+    return gzip.compress(datos, compresslevel=nivel, mtime=0)
+
+
+class EscritorGzipParalelo:
+    """
+    Objeto tipo archivo que recibe datos con write() y los guarda comprimidos en gzip.
+    Los datos se parten en bloques de BLOQUE_COMPRESION bytes y cada bloque se comprime
+    en un proceso distinto. Cada bloque es un miembro gzip completo: concatenados forman
+    un .gz válido (igual que hace pigz). Solo se mantienen en memoria unos pocos bloques.
+    """
+
+    def __init__(self, ruta_destino, nivel=6, procesos=PROCESOS_COMPRESION):
+        self.archivo = open(ruta_destino, 'wb')
+        self.nivel = nivel
+        self.buffer = bytearray()
+        self.pendientes = deque()  # Bloques enviados a comprimir, en orden
+        self.max_pendientes = procesos * 2
+        if procesos > 1:
+            from concurrent.futures import ProcessPoolExecutor  # Carga multiprocessing solo si se usa
+            self.pool = ProcessPoolExecutor(max_workers=procesos)
+        else:
+            self.pool = None
+
+    def write(self, datos):
+        self.buffer += datos
+        while len(self.buffer) >= BLOQUE_COMPRESION:
+            self._enviar_bloque(bytes(self.buffer[:BLOQUE_COMPRESION]))
+            del self.buffer[:BLOQUE_COMPRESION]
+        return len(datos)
+
+    def _enviar_bloque(self, bloque):
+        if self.pool is None:
+            self.archivo.write(_comprimir_bloque(bloque, self.nivel))
+            return
+        self.pendientes.append(self.pool.submit(_comprimir_bloque, bloque, self.nivel))
+        # Si hay demasiados bloques en vuelo esperamos al más antiguo (mantiene el orden)
+        while len(self.pendientes) > self.max_pendientes:
+            self.archivo.write(self.pendientes.popleft().result())
+
+    def close(self):
+        try:
+            if self.buffer:
+                self._enviar_bloque(bytes(self.buffer))
+                self.buffer.clear()
+            while self.pendientes:
+                self.archivo.write(self.pendientes.popleft().result())
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+            self.archivo.close()
+
+# --- Extracción de metadatos de imágenes y videos (solo cabeceras) ---
+
+def _fecha_exif(tiff):
+    """
+    Busca la fecha de captura dentro del bloque TIFF de un segmento EXIF.
+    Prefiere DateTimeOriginal (0x9003) y si no existe usa DateTime (0x0132).
+    Devuelve 'AAAA-MM-DD HH:MM:SS' o None.
+    """
+    if len(tiff) < 8 or tiff[:2] not in (b"II", b"MM"):
+        return None
+    orden = "<" if tiff[:2] == b"II" else ">"
+
+    def leer_ifd(desplazamiento):
+        etiquetas = {}
+        if desplazamiento + 2 > len(tiff):
+            return etiquetas
+        (cantidad,) = struct.unpack_from(orden + "H", tiff, desplazamiento)
+        for i in range(cantidad):
+            inicio = desplazamiento + 2 + i * 12
+            if inicio + 12 > len(tiff):
+                break
+            etiqueta, tipo, numero, valor = struct.unpack_from(orden + "HHII", tiff, inicio)
+            etiquetas[etiqueta] = (tipo, numero, valor)
+        return etiquetas
+
+    def texto(entrada):
+        tipo, numero, valor = entrada
+        if tipo != 2 or numero < 19 or valor + 19 > len(tiff):
+            return None
+        crudo = tiff[valor:valor + 19].decode("ascii", "replace")
+        return crudo[:10].replace(":", "-") + crudo[10:]
+
+    (inicio_ifd0,) = struct.unpack_from(orden + "I", tiff, 4)
+    ifd0 = leer_ifd(inicio_ifd0)
+    if 0x8769 in ifd0:  # Puntero al IFD Exif
+        exif = leer_ifd(ifd0[0x8769][2])
+        if 0x9003 in exif:
+            return texto(exif[0x9003])
+    if 0x0132 in ifd0:
+        return texto(ifd0[0x0132])
+    return None
+
+
+def _metadatos_jpeg(f):
+    """Recorre los marcadores JPEG saltando los datos; lee EXIF (APP1) y el tamaño (SOFn)."""
+    meta = {}
+    f.seek(2)
+    while True:
+        cabecera = f.read(4)
+        if len(cabecera) < 4 or cabecera[0] != 0xFF:
+            break
+        marcador = cabecera[1]
+        (longitud,) = struct.unpack(">H", cabecera[2:])
+        if marcador == 0xE1 and 'fecha' not in meta:
+            datos = f.read(longitud - 2)
+            if datos.startswith(b"Exif\x00\x00"):
+                meta['fecha'] = _fecha_exif(datos[6:])
+        elif 0xC0 <= marcador <= 0xCF and marcador not in (0xC4, 0xC8, 0xCC):
+            alto, ancho = struct.unpack(">xHH", f.read(5))
+            meta['ancho'], meta['alto'] = ancho, alto
+            break  # Después del SOF empiezan los datos de la imagen
+        elif marcador == 0xDA:
+            break
+        else:
+            f.seek(longitud - 2, os.SEEK_CUR)
+    return meta
+
+
+def _cajas_mp4(f, inicio, fin):
+    """Genera (tipo, inicio_datos, fin_caja) para cada caja MP4/MOV entre inicio y fin."""
+    posicion = inicio
+    while posicion + 8 <= fin:
+        f.seek(posicion)
+        cabecera = f.read(8)
+        if len(cabecera) < 8:
+            return
+        tamano, tipo = struct.unpack(">I4s", cabecera)
+        datos = posicion + 8
+        if tamano == 1:  # Tamaño de 64 bits
+            (tamano,) = struct.unpack(">Q", f.read(8))
+            datos += 8
+        elif tamano == 0:  # La caja llega hasta el final del archivo
+            tamano = fin - posicion
+        if tamano < 8:
+            return
+        yield tipo, datos, posicion + tamano
+        posicion += tamano
+
+
+def _metadatos_mp4(f, tamano_archivo):
+    """Lee la fecha de creación (mvhd) y el tamaño del primer video (tkhd) de un MP4/MOV."""
+    meta = {}
+    for tipo, datos, fin in _cajas_mp4(f, 0, tamano_archivo):
+        if tipo != b"moov":
+            continue
+        for subtipo, subdatos, subfin in _cajas_mp4(f, datos, fin):
+            if subtipo == b"mvhd":
+                f.seek(subdatos)
+                version = f.read(4)[0]
+                segundos = struct.unpack(">Q" if version == 1 else ">I", f.read(8 if version == 1 else 4))[0]
+                if segundos:
+                    # Las fechas MP4 cuentan segundos desde 1904-01-01
+                    fecha = time.gmtime(segundos - 2082844800)
+                    meta['fecha'] = time.strftime("%Y-%m-%d %H:%M:%S", fecha)
+            elif subtipo == b"trak" and 'ancho' not in meta:
+                for tipo_trak, datos_trak, fin_trak in _cajas_mp4(f, subdatos, subfin):
+                    if tipo_trak == b"tkhd":
+                        # Ancho y alto son los últimos 8 bytes (punto fijo 16.16)
+                        f.seek(fin_trak - 8)
+                        ancho, alto = struct.unpack(">II", f.read(8))
+                        if ancho and alto:
+                            meta['ancho'], meta['alto'] = ancho >> 16, alto >> 16
+        break
+    return meta
+
+
+def extraer_metadatos(ruta):
+    """
+    Obtiene {'ancho', 'alto', 'fecha'} de una imagen o video leyendo SOLO sus cabeceras,
+    sin decodificar la imagen. Soporta JPEG (con fecha EXIF), PNG, GIF, BMP, WEBP y MP4/MOV.
+    Los campos que no se puedan leer quedan en None.
+    """
+    meta = {}
+    try:
+        with open(ruta, 'rb') as f:
+            cabecera = f.read(32)
+            if cabecera.startswith(b"\xFF\xD8"):
+                meta = _metadatos_jpeg(f)
+            elif cabecera.startswith(b"\x89PNG\r\n\x1a\n"):
+                meta['ancho'], meta['alto'] = struct.unpack(">II", cabecera[16:24])
+            elif cabecera[:4] in (b"GIF8",):
+                meta['ancho'], meta['alto'] = struct.unpack("<HH", cabecera[6:10])
+            elif cabecera.startswith(b"BM"):
+                ancho, alto = struct.unpack("<ii", cabecera[18:26])
+                meta['ancho'], meta['alto'] = ancho, abs(alto)
+            elif cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+                formato = cabecera[12:16]
+                if formato == b"VP8X":
+                    meta['ancho'] = int.from_bytes(cabecera[24:27], "little") + 1
+                    meta['alto'] = int.from_bytes(cabecera[27:30], "little") + 1
+                elif formato == b"VP8L":
+                    bits = int.from_bytes(cabecera[21:25], "little")
+                    meta['ancho'], meta['alto'] = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                elif formato == b"VP8 ":
+                    ancho, alto = struct.unpack("<HH", cabecera[26:30])
+                    meta['ancho'], meta['alto'] = ancho & 0x3FFF, alto & 0x3FFF
+            elif cabecera[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free"):
+                meta = _metadatos_mp4(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error, IndexError, ValueError):
+        pass
+    return {'ancho': meta.get('ancho'), 'alto': meta.get('alto'), 'fecha': meta.get('fecha')}
+
+
+def _extraer_metadatos_lote(rutas):
+    """Extrae los metadatos de varias rutas (se ejecuta en otro proceso)."""
+    return [extraer_metadatos(ruta) for ruta in rutas]
+
+
+# --- Búsqueda instantánea (difusa) por nombre ---
+
+def puntuar_coincidencia(consulta, nombre):
+    """
+    Puntaje difuso de 'consulta' contra 'nombre' (ambos en minúsculas); mayor es mejor.
+    - Si la consulta aparece tal cual: gana más cuanto antes aparezca y más corto sea el nombre
+    - Si no, sus letras deben aparecer en orden (ej: 'rpt' → 'reporte'); suman las seguidas
+    Devuelve None si no coincide.
+    """
+    posicion = nombre.find(consulta)
+    if posicion >= 0:
+        puntaje = 1000 - posicion * 5 - (len(nombre) - len(consulta))
+        if posicion == 0 or not nombre[posicion - 1].isalnum():
+            puntaje += 200  # Empieza una palabra
+        return puntaje
+
+    puntaje = 0
+    anterior = -2
+    i = 0
+    for caracter in consulta:
+        i = nombre.find(caracter, i)
+        if i < 0:
+            return None
+        puntaje += 10 if i == anterior + 1 else 1
+        if i == 0 or not nombre[i - 1].isalnum():
+            puntaje += 5
+        anterior = i
+        i += 1
+    return puntaje - (len(nombre) - len(consulta)) * 0.5
+
+
+def _trigramas(texto):
+    """Conjunto de fragmentos de 3 letras de un texto ('abcd' → {'abc', 'bcd'})."""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class TablaDeNombres:
+    """
+    Tabla en memoria con todos los nombres de un árbol de carpetas, para buscar mientras
+    se escribe. Se guarda de forma compacta:
+    - nombres / minusculas: listas de textos internados (sys.intern), uno por entrada
+    - padres: array con el índice de la carpeta que contiene cada entrada (-1 = raíz)
+    - trigramas: {fragmento de 3 letras: array de índices de archivos que lo contienen}
+    La ruta completa de un resultado se arma subiendo por 'padres' solo cuando se muestra.
+    """
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self.nombres = []
+        self.minusculas = []
+        self.padres = array('i')
+        self.es_carpeta = bytearray()
+        self.trigramas = {}
+        self._ultima_consulta = None  # (consulta, candidatos) para refinar la siguiente
+        self.parcial = False  # True si la última búsqueda se cortó por tiempo
+
+    def construir(self, cancelado=None):
+        """Recorre el árbol una vez con os.scandir y llena la tabla y el índice."""
+        pendientes = [(self.raiz, -1)]
+        while pendientes:
+            if cancelado and cancelado():
+                return False
+            ruta_dir, indice_dir = pendientes.pop()
+            try:
+                entradas = os.scandir(ruta_dir)
+            except OSError:
+                continue
+            with entradas:
+                for entrada in entradas:
+                    try:
+                        carpeta = entrada.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    indice = len(self.nombres)
+                    minuscula = sys.intern(entrada.name.lower())
+                    self.nombres.append(sys.intern(entrada.name))
+                    self.minusculas.append(minuscula)
+                    self.padres.append(indice_dir)
+                    self.es_carpeta.append(carpeta)
+                    if carpeta:
+                        pendientes.append((entrada.path, indice))
+                    else:
+                        for trigrama in _trigramas(minuscula):
+                            lista = self.trigramas.get(trigrama)
+                            if lista is None:
+                                lista = self.trigramas[trigrama] = array('i')
+                            lista.append(indice)
+        return True
+
+    def ruta(self, indice):
+        """Reconstruye la ruta completa de una entrada subiendo por sus carpetas padre."""
+        partes = []
+        while indice >= 0:
+            partes.append(self.nombres[indice])
+            indice = self.padres[indice]
+        return os.path.join(self.raiz, *reversed(partes))
+
+    def _candidatos(self, consulta):
+        """Índices que podrían coincidir, usando el índice de trigramas cuando se puede."""
+        anteriores = None
+        if self._ultima_consulta and consulta.startswith(self._ultima_consulta[0]):
+            # El usuario siguió escribiendo: solo pueden coincidir los que ya coincidían
+            anteriores = self._ultima_consulta[1]
+
+        trigramas = _trigramas(consulta)
+        if not trigramas:
+            return anteriores  # Consulta muy corta: None = revisar toda la tabla
+
+        listas = sorted((self.trigramas.get(t, ()) for t in trigramas), key=len)
+        if anteriores is not None and len(anteriores) <= len(listas[0]):
+            return anteriores
+
+        if len(listas[0]) > 50000:
+            # Intersecar listas tan grandes cuesta más que dejar que el filtro por texto descarte
+            return listas[0]
+        # Con las 3 listas más chicas alcanza: el filtro por texto hace el resto
+        exactos = set(listas[0])
+        for lista in listas[1:3]:
+            if not exactos:
+                break
+            exactos.intersection_update(lista)
+        if len(exactos) >= 200:
+            return exactos
+        # Pocos resultados exactos: para tolerar errores de tipeo sumamos los que
+        # comparten alguno de los 2 trigramas más raros
+        aproximados = exactos.union(listas[0], *listas[1:2])
+        # Si ni eso aparece (ej: 'dfntv' → 'definitivo') se revisa toda la tabla
+        return aproximados or None
+
+    def buscar(self, consulta, limite=200, cancelado=None, presupuesto=None):
+        """
+        Devuelve [(puntaje, ruta), ...] con las mejores 'limite' coincidencias, o None
+        si la búsqueda se canceló (cancelado() devolvió True a mitad de camino).
+        Con 'presupuesto' (segundos) se deja de puntuar al agotarse el tiempo y se
+        devuelve lo mejor encontrado hasta ahí; en ese caso self.parcial queda en True.
+        """
+        limite_tiempo = time.perf_counter() + presupuesto if presupuesto else None
+        self.parcial = False
+        consulta = consulta.lower().strip()
+        if not consulta:
+            self._ultima_consulta = None
+            return []
+
+        candidatos = self._candidatos(consulta)
+        if candidatos is None:
+            candidatos = range(len(self.minusculas))
+
+        minusculas = self.minusculas
+        es_carpeta = self.es_carpeta
+        coincidentes = []
+        puntuados = []
+        pendientes = iter(candidatos)
+        while True:
+            bloque = list(islice(pendientes, 2048))
+            if not bloque:
+                break
+            # Primero el filtro barato: la consulta aparece tal cual en el nombre
+            exactos = [i for i in bloque if consulta in minusculas[i] and not es_carpeta[i]]
+            for indice in exactos:
+                nombre = minusculas[indice]
+                posicion = nombre.find(consulta)
+                puntaje = 1000 - posicion * 5 - (len(nombre) - len(consulta))
+                if posicion == 0 or not nombre[posicion - 1].isalnum():
+                    puntaje += 200
+                puntuados.append((puntaje, indice))
+            coincidentes.extend(exactos)
+            if cancelado and cancelado():
+                return None
+            if limite_tiempo and time.perf_counter() > limite_tiempo:
+                self.parcial = True
+                break
+
+        # Solo si hay pocas coincidencias exactas se prueban las difusas (más lentas)
+        if len(puntuados) < limite and not self.parcial:
+            ya_vistos = set(coincidentes)
+            for n, indice in enumerate(candidatos):
+                if n % 2048 == 0:
+                    if cancelado and cancelado():
+                        return None
+                    if limite_tiempo and time.perf_counter() > limite_tiempo:
+                        self.parcial = True
+                        break
+                if indice in ya_vistos or es_carpeta[indice]:
+                    continue
+                puntaje = puntuar_coincidencia(consulta, minusculas[indice])
+                if puntaje is not None:
+                    puntuados.append((puntaje, indice))
+                    coincidentes.append(indice)
+
+        # Si no se revisó todo, la próxima consulta no puede partir de esta lista
+        self._ultima_consulta = None if self.parcial else (consulta, coincidentes)
+        mejores = heapq.nlargest(limite, puntuados)
+        return [(puntaje, self.ruta(indice)) for puntaje, indice in mejores]
+
+
+class ResultadosColumnares:
+    """
+    Lista de resultados de búsqueda que ocupa poca memoria: en vez de un diccionario
+    por archivo guarda todas las rutas seguidas en un solo bloque de bytes, más dos
+    arrays de números (dónde termina cada ruta y su tamaño): ~16 bytes + la ruta por
+    resultado. Pasado limite_memoria, lo acumulado se vuelca a archivos temporales.
+    Al recorrerla entrega los mismos diccionarios que buscar_archivos.
+    """
+
+    ENTRADAS_POR_LECTURA = 65536  # Al leer lo volcado a disco, de a cuántas entradas
+
+    def __init__(self, limite_memoria=MEMORIA_RESULTADOS):
+        self.limite_memoria = limite_memoria
+        self._rutas = bytearray()  # Rutas en bytes, una detrás de otra
+        self._fines = array('Q')   # Posición (en el total) donde termina cada ruta
+        self._tamanos = array('q')  # Tamaño en bytes de cada archivo
+        self._volcadas = 0         # Entradas ya escritas en disco
+        self._bytes_volcados = 0   # Bytes de rutas ya escritos en disco
+        self._archivos = None      # (rutas, fines, tamaños) temporales, al volcar por primera vez
+
+    def agregar(self, ruta, tamano_bytes):
+        self._rutas += os.fsencode(ruta)
+        self._fines.append(self._bytes_volcados + len(self._rutas))
+        self._tamanos.append(tamano_bytes)
+        if len(self._rutas) + 16 * len(self._fines) > self.limite_memoria:
+            self._volcar()
+
+    def _volcar(self):
+        """Pasa lo acumulado en memoria al final de los archivos temporales."""
+        if self._archivos is None:
+            self._archivos = tuple(tempfile.TemporaryFile(prefix="gestor-resultados-") for _ in range(3))
+        archivo_rutas, archivo_fines, archivo_tamanos = self._archivos
+        for archivo in self._archivos:
+            archivo.seek(0, os.SEEK_END)
+        archivo_rutas.write(self._rutas)
+        self._fines.tofile(archivo_fines)
+        self._tamanos.tofile(archivo_tamanos)
+        self._bytes_volcados += len(self._rutas)
+        self._volcadas += len(self._fines)
+        self._rutas, self._fines, self._tamanos = bytearray(), array('Q'), array('q')
+
+    def cerrar(self):
+        """Borra los archivos temporales (también se borran solos al terminar el programa)."""
+        if self._archivos is not None:
+            for archivo in self._archivos:
+                archivo.close()
+            self._archivos = None
+
+    def __len__(self):
+        return self._volcadas + len(self._fines)
+
+    @staticmethod
+    def _como_diccionario(ruta_bytes, tamano_bytes):
+        ruta = os.fsdecode(bytes(ruta_bytes))
+        _, ext = os.path.splitext(ruta)
+        return {
+            'ruta': ruta,
+            'extension': ext if ext else "Sin Extensión",
+            'tamano_kb': tamano_bytes / 1024,
+            'tamano_bytes': tamano_bytes
+        }
+
+    def _leer_volcado(self, desde, cantidad):
+        """Lee del disco las entradas [desde, desde + cantidad) → (inicio, fines, tamaños, rutas)."""
+        archivo_rutas, archivo_fines, archivo_tamanos = self._archivos
+        fines, tamanos = array('Q'), array('q')
+        archivo_fines.seek(desde * fines.itemsize)
+        fines.fromfile(archivo_fines, cantidad)
+        archivo_tamanos.seek(desde * tamanos.itemsize)
+        tamanos.fromfile(archivo_tamanos, cantidad)
+        inicio = 0
+        if desde:
+            anterior = array('Q')
+            archivo_fines.seek((desde - 1) * anterior.itemsize)
+            anterior.fromfile(archivo_fines, 1)
+            inicio = anterior[0]
+        archivo_rutas.seek(inicio)
+        return inicio, fines, tamanos, archivo_rutas.read(fines[-1] - inicio)
+
+    def __iter__(self):
+        # Primero lo que está en disco, por bloques (la memoria no crece al recorrer)
+        leidas = 0
+        while leidas < self._volcadas:
+            cantidad = min(self.ENTRADAS_POR_LECTURA, self._volcadas - leidas)
+            inicio, fines, tamanos, rutas = self._leer_volcado(leidas, cantidad)
+            anterior = inicio
+            for fin, tamano in zip(fines, tamanos):
+                yield self._como_diccionario(rutas[anterior - inicio:fin - inicio], tamano)
+                anterior = fin
+            leidas += cantidad
+        # Después lo que sigue en memoria
+        anterior = self._bytes_volcados
+        for fin, tamano in zip(self._fines, self._tamanos):
+            yield self._como_diccionario(self._rutas[anterior - self._bytes_volcados:fin - self._bytes_volcados], tamano)
+            anterior = fin
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de rango")
+        if indice < self._volcadas:
+            inicio, fines, tamanos, rutas = self._leer_volcado(indice, 1)
+            return self._como_diccionario(rutas, tamanos[0])
+        local = indice - self._volcadas
+        inicio = self._fines[local - 1] if local else self._bytes_volcados
+        fin = self._fines[local]
+        return self._como_diccionario(
+            self._rutas[inicio - self._bytes_volcados:fin - self._bytes_volcados], self._tamanos[local]
+        )
+
+
+class ExportadorResultados:
+    """
+    Escribe resultados de búsqueda en un archivo a medida que llegan, sin juntarlos:
+    la memoria usada no depende de cuántos sean. Formatos (según la extensión):
+    - .csv: columnas ruta, extension, tamano_bytes (+ las extra, ej: ancho/alto/fecha)
+    - .jsonl / .ndjson: un objeto JSON por línea
+    - .gcol: columnar binario compacto (ver leer_columnar); solo ruta y tamaño
+    Agregando ".gz" al final (ej: "resultados.csv.gz") se comprime mientras se escribe.
+    """
+
+    COLUMNAS = ("ruta", "extension", "tamano_bytes")
+
+    def __init__(self, ruta_archivo, columnas_extra=()):
+        nombre = ruta_archivo.lower()
+        comprimido = nombre.endswith(".gz")
+        _, ext = os.path.splitext(nombre[:-3] if comprimido else nombre)
+        self.formato = FORMATOS_EXPORTACION.get(ext)
+        if self.formato is None:
+            raise ValueError(f"formato desconocido '{ext}' (usa: {', '.join(FORMATOS_EXPORTACION)}, con .gz opcional)")
+        self.columnas = self.COLUMNAS + tuple(columnas_extra)
+        self.filas = 0
+
+        binario = self.formato == "columnar"
+        if comprimido:
+            # Nivel 6 (como el resto del gestor): casi igual de chico que 9 y mucho más rápido
+            self.archivo = gzip.open(ruta_archivo, 'wb' if binario else 'wt', compresslevel=6,
+                                     encoding=None if binario else 'utf-8', newline=None if binario else '')
+        else:
+            self.archivo = open(ruta_archivo, 'wb' if binario else 'w', encoding=None if binario else 'utf-8', newline=None if binario else '')
+
+        if self.formato == "csv":
+            import csv  # Solo al exportar a .csv
+            self._csv = csv.writer(self.archivo)
+            self._csv.writerow(self.columnas)
+        elif binario:
+            self.archivo.write(FIRMA_COLUMNAR)
+            self._rutas, self._fines, self._tamanos = bytearray(), array('I'), array('q')
+
+    def escribir(self, res):
+        self.filas += 1
+        if self.formato == "csv":
+            self._csv.writerow([res.get(columna, "") for columna in self.columnas])
+        elif self.formato == "jsonl":
+            self.archivo.write(json.dumps({columna: res.get(columna) for columna in self.columnas}, ensure_ascii=False) + "\n")
+        else:
+            self._rutas += os.fsencode(res['ruta'])
+            self._fines.append(len(self._rutas))
+            self._tamanos.append(res['tamano_bytes'])
+            if len(self._fines) >= FILAS_POR_GRUPO:
+                self._escribir_grupo()
+
+    def _escribir_grupo(self):
+        """
+        Un grupo del formato columnar: cantidad de filas y bytes de rutas ('<II'),
+        el fin de cada ruta (uint32), las rutas seguidas (UTF-8) y los tamaños (int64).
+        Todo en little-endian, para que el archivo se lea igual en cualquier máquina.
+        """
+        fines, tamanos = self._fines, self._tamanos
+        if sys.byteorder == "big":
+            fines, tamanos = array('I', fines), array('q', tamanos)
+            fines.byteswap()
+            tamanos.byteswap()
+        self.archivo.write(struct.pack('<II', len(self._fines), len(self._rutas)))
+        self.archivo.write(fines.tobytes())
+        self.archivo.write(self._rutas)
+        self.archivo.write(tamanos.tobytes())
+        self._rutas, self._fines, self._tamanos = bytearray(), array('I'), array('q')
+
+    def cerrar(self):
+        if self.formato == "columnar":
+            if self._fines:
+                self._escribir_grupo()
+            self.archivo.write(struct.pack('<II', 0, 0))  # Grupo vacío = fin del archivo
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def leer_columnar(ruta_archivo):
+    """Lee un archivo .gcol (o .gcol.gz) grupo por grupo y entrega (ruta, tamano_bytes)."""
+    abrir = gzip.open if ruta_archivo.lower().endswith(".gz") else open
+    with abrir(ruta_archivo, 'rb') as f:
+        if f.read(len(FIRMA_COLUMNAR)) != FIRMA_COLUMNAR:
+            raise ValueError("no es un archivo columnar del gestor")
+        while True:
+            filas, bytes_rutas = struct.unpack('<II', f.read(8))
+            if not filas:
+                return
+            fines, tamanos = array('I'), array('q')
+            fines.frombytes(f.read(filas * fines.itemsize))
+            rutas = f.read(bytes_rutas)
+            tamanos.frombytes(f.read(filas * tamanos.itemsize))
+            if sys.byteorder == "big":
+                fines.byteswap()
+                tamanos.byteswap()
+            inicio = 0
+            for fin, tamano in zip(fines, tamanos):
+                yield os.fsdecode(rutas[inicio:fin]), tamano
+                inicio = fin
+
+
+def recorrer_archivos(raiz, evitar=None, detener=None, max_abiertas=MAX_CARPETAS_ABIERTAS):
+    """
+    Recorre un árbol de carpetas y entrega un os.DirEntry por cada archivo
+    (como los 'filenames' de os.walk, sin descender por enlaces a carpetas).
+    A diferencia de os.walk no arma la lista de nombres de cada carpeta: usa una pila
+    de iteradores de os.scandir, así la memoria depende de la profundidad y no de
+    cuántos archivos tenga una carpeta. Como mucho hay max_abiertas carpetas abiertas;
+    las más profundas esperan su turno guardando solo su ruta.
+    - evitar: set de (dispositivo, inodo) de carpetas que no se recorren
+    - detener: threading.Event que corta el recorrido
+    """
+    pila = []
+    en_espera = [raiz]
+    try:
+        while pila or en_espera:
+            if not pila:
+                try:
+                    pila.append(os.scandir(en_espera.pop()))
+                except OSError:
+                    pass  # Sin permiso o borrada mientras tanto
+                continue
+            try:
+                entrada = next(pila[-1], None)
+            except OSError:
+                entrada = None
+            if entrada is None:
+                pila.pop().close()
+                if detener is not None and detener.is_set():
+                    return
+                continue
+
+            try:
+                es_carpeta = entrada.is_dir()
+                if es_carpeta and entrada.is_symlink():
+                    continue  # Igual que os.walk: el enlace no se recorre ni cuenta como archivo
+            except OSError:
+                continue
+            if not es_carpeta:
+                yield entrada
+                continue
+            if evitar:
+                try:
+                    info = entrada.stat(follow_symlinks=False)
+                    if (info.st_dev, info.st_ino) in evitar:
+                        continue
+                except OSError:
+                    pass
+            if len(pila) < max_abiertas:
+                try:
+                    pila.append(os.scandir(entrada.path))
+                except OSError:
+                    pass
+            else:
+                en_espera.append(entrada.path)
+    finally:
+        for iterador in pila:
+            iterador.close()
+
 
 # -----------------------------------------------------------------
 # PASO 1: Backend Lógico
@@ -27,6 +1490,20 @@ class GestorDeArchivos:
             "videos": os.path.join(ruta_home, "Videos"),
             ".": os.getcwd(),  # Punto “.” representa el directorio actual
         }
+        # Caché del análisis de espacio: carpeta → resumen de su contenido directo.
+        # Se invalida sola cuando cambia el mtime de la carpeta.
+        self._cache_espacio = {}
+        # Caché de metadatos de fotos/videos: "dispositivo:inodo" → [mtime_ns, ancho, alto, fecha].
+        # Se carga desde disco la primera vez que se usa.
+        self._cache_multimedia = None
+        self.ruta_cache_multimedia = os.path.join(DIRECTORIO_DATOS, "metadatos.json")
+        # st_dev del volumen → True/False según soporte reflink (se prueba una vez por volumen)
+        self._soporta_reflink = {}
+        # Ritmo y prioridad de las operaciones masivas (sin límites hasta configurar_limites)
+        self.limitador = LimitadorES()
+        # Tablas de nombres para la búsqueda instantánea: ruta raíz → TablaDeNombres
+        self._tablas_nombres = {}
+        self._candado_tablas = threading.Lock()
         print("Gestor de archivos listo.")
         print(f"Atajos conocidos: {list(self.atajos_ruta.keys())}")
 
@@ -71,56 +1548,188 @@ class GestorDeArchivos:
             # Abrimos el archivo en modo escritura, lo cerramos inmediatamente
             with open(ruta_completa, 'w') as f:
                 pass
+            CACHE_METADATOS.invalidar(ruta_completa)
             return f"✅ Archivo creado en: {ruta_completa}"
         except Exception as e:
             return f"❌ Error al crear: {e}"
 
-    def mover_archivo(self, nombre_origen, ruta_origen, nombre_destino, ruta_destino):
-        """Mueve un archivo desde origen hasta destino."""
+    def mover_archivo(self, nombre_origen, ruta_origen, nombre_destino, ruta_destino, politica="renombrar"):
+        """
+        Mueve un archivo desde origen hasta destino.
+        politica: qué hacer si el destino ya existe (ver mover_sin_conflictos).
+        """
         try:
             ruta_completa_origen = os.path.join(self.traducir_ruta(ruta_origen), nombre_origen)
             ruta_completa_destino = os.path.join(self.traducir_ruta(ruta_destino), nombre_destino)
             # Crear la carpeta destino si no existe
             os.makedirs(os.path.dirname(ruta_completa_destino), exist_ok=True)
+            # Si el destino es una carpeta, el archivo va dentro de ella
+            if os.path.isdir(ruta_completa_destino):
+                ruta_completa_destino = os.path.join(ruta_completa_destino, os.path.basename(ruta_completa_origen))
+            if not os.path.lexists(ruta_completa_origen):
+                raise FileNotFoundError(ruta_completa_origen)
+            if os.path.abspath(ruta_completa_origen) == os.path.abspath(ruta_completa_destino):
+                return "ℹ️ El archivo ya está en ese destino."
             # Mover el archivo
-            shutil.move(ruta_completa_origen, ruta_completa_destino)
-            return f"✅ Archivo movido a: {ruta_completa_destino}"
+            resultado, ruta_final = self.mover_sin_conflictos(ruta_completa_origen, ruta_completa_destino, politica)
+            if resultado == "saltado":
+                return f"ℹ️ No se movió: ya existe '{ruta_final}'."
+            if resultado == "renombrado":
+                return f"✅ Archivo movido a: {ruta_final} (el nombre ya existía)"
+            if resultado == "sobrescrito":
+                return f"✅ Archivo movido a: {ruta_final} (reemplazó al existente)"
+            return f"✅ Archivo movido a: {ruta_final}"
         except FileNotFoundError:
             return "❌ Error: No se encontró el archivo de origen."
         except Exception as e:
             return f"❌ Error al mover: {e}"
 
+    def mover_sin_conflictos(self, ruta_origen, ruta_destino, politica="renombrar", nombres=None):
+        """
+        Mueve rutas completas sin pisar nunca un archivo por accidente. Si el destino ya
+        existe se aplica la política:
+        - "renombrar": usa "nombre (1).ext", "nombre (2).ext"... (el primero libre)
+        - "saltar": deja el origen donde está
+        - "sobrescribir": reemplaza el destino
+        - "conservar_reciente": reemplaza solo si el origen es más nuevo; si no, salta
+        nombres: NombresOcupados compartido entre varias llamadas (ej: al organizar una carpeta)
+        Devuelve (resultado, ruta_final) con resultado "movido", "renombrado", "sobrescrito" o "saltado".
+        """
+        if politica not in POLITICAS_CONFLICTO:
+            raise ValueError(f"política desconocida '{politica}' (usa: {', '.join(POLITICAS_CONFLICTO)})")
+
+        carpeta, nombre = os.path.split(ruta_destino)
+        if nombres is None:
+            # Movimiento suelto: se intenta directo (sin sobrescribir) y la carpeta destino
+            # solo se lista si el nombre ya está ocupado
+            try:
+                renombrar_sin_sobrescribir(ruta_origen, ruta_destino)
+                CACHE_METADATOS.invalidar(ruta_origen, ruta_destino)
+                return "movido", ruta_destino
+            except FileExistsError:
+                if politica == "saltar":
+                    return "saltado", ruta_destino  # No hace falta listar la carpeta
+                nombres = NombresOcupados()
+
+        candidato = nombre
+        while True:
+            ruta_candidata = os.path.join(carpeta, candidato)
+            if not nombres.ocupado(carpeta, candidato):
+                try:
+                    renombrar_sin_sobrescribir(ruta_origen, ruta_candidata)
+                    nombres.reservar(carpeta, candidato)
+                    CACHE_METADATOS.invalidar(ruta_origen, ruta_candidata)
+                    return ("movido" if candidato == nombre else "renombrado"), ruta_candidata
+                except FileExistsError:
+                    nombres.reservar(carpeta, candidato)  # Apareció después de listar la carpeta
+
+            # El nombre está ocupado: decide la política (solo importa para el nombre original)
+            if candidato == nombre and politica != "renombrar":
+                if politica == "conservar_reciente":
+                    reemplazar = os.stat(ruta_origen).st_mtime_ns > os.stat(ruta_destino).st_mtime_ns
+                else:
+                    reemplazar = politica == "sobrescribir"
+                if not reemplazar:
+                    return "saltado", ruta_destino
+                try:
+                    os.replace(ruta_origen, ruta_destino)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(ruta_origen, ruta_destino)  # Entre volúmenes: copia y borra
+                CACHE_METADATOS.invalidar(ruta_origen, ruta_destino)
+                return "sobrescrito", ruta_destino
+
+            candidato = nombres.siguiente_libre(carpeta, nombre)
+
     def borrar_archivo(self, nombre_archivo, ruta_corta):
         """Borra un archivo en la ruta dada."""
         try:
             ruta_completa = os.path.join(self.traducir_ruta(ruta_corta), nombre_archivo)
             os.remove(ruta_completa)
+            CACHE_METADATOS.invalidar(ruta_completa)
             return f"✅ Archivo borrado: {ruta_completa}"
         except FileNotFoundError:
             return "❌ Error: No se encontró el archivo."
         except Exception as e:
             return f"❌ Error al borrar: {e}"
 
-    def copiar_archivo(self, nombre_origen, ruta_origen, nombre_destino, ruta_destino):
-        """Copia un archivo de origen a destino."""
+    def copiar_archivo(self, nombre_origen, ruta_origen, nombre_destino, ruta_destino, estrategia="auto"):
+        """
+        Copia un archivo de origen a destino.
+        estrategia: "auto" (reflink si el volumen lo soporta, si no copia completa),
+        "reflink", "hardlink" (solo dentro del mismo volumen) o "full" (copia completa).
+        """
         try:
             ruta_completa_origen = os.path.join(self.traducir_ruta(ruta_origen), nombre_origen)
             ruta_completa_destino = os.path.join(self.traducir_ruta(ruta_destino), nombre_destino)
             os.makedirs(os.path.dirname(ruta_completa_destino), exist_ok=True)
-            shutil.copy(ruta_completa_origen, ruta_completa_destino)
-            return f"✅ Archivo copiado a: {ruta_completa_destino}"
+            usada = self.copiar_con_estrategia(ruta_completa_origen, ruta_completa_destino, estrategia)
+            if usada == "full":
+                return f"✅ Archivo copiado a: {ruta_completa_destino}"
+            return f"✅ Archivo copiado a: {ruta_completa_destino} ({usada})"
         except FileNotFoundError:
             return "❌ Error: No se encontró el archivo de origen."
         except Exception as e:
             return f"❌ Error al copiar: {e}"
 
-    def renombrar_archivo(self, nombre_original, ruta_corta, nombre_nuevo):
-        """Renombra un archivo dentro de la misma ruta."""
+    def copiar_con_estrategia(self, ruta_origen, ruta_destino, estrategia="auto"):
+        """
+        Copia rutas completas con la estrategia pedida y devuelve la que se usó realmente.
+        Si el destino existe se reemplaza (igual que una copia normal).
+        Lanza ValueError si la estrategia no es válida u OSError si no se puede aplicar.
+        """
+        if estrategia not in ESTRATEGIAS_COPIA:
+            raise ValueError(f"estrategia desconocida '{estrategia}' (usa: {', '.join(ESTRATEGIAS_COPIA)})")
+
+        # Se crea con un nombre temporal y se renombra: el destino nunca queda a medias
+        temporal = ruta_destino + ".gestor-tmp"
+        CACHE_METADATOS.invalidar(ruta_destino)  # Cambia de contenido (y de inodo) pase lo que pase
+
+        if estrategia == "hardlink":
+            os.link(ruta_origen, temporal)
+            os.replace(temporal, ruta_destino)
+            return "hardlink"
+
+        if estrategia in ("auto", "reflink"):
+            # El st_dev del destino ya identifica el volumen: no hace falta buscar su punto de montaje
+            volumen = os.stat(os.path.dirname(ruta_destino) or ".").st_dev
+            mismo_volumen = os.stat(ruta_origen).st_dev == volumen
+            if mismo_volumen and self._soporta_reflink.get(volumen, True):
+                try:
+                    clonar_reflink(ruta_origen, temporal)
+                    os.replace(temporal, ruta_destino)
+                    self._soporta_reflink[volumen] = True
+                    return "reflink"
+                except OSError as e:
+                    if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS):
+                        raise
+                    # El volumen no soporta reflink: lo recordamos para no volver a probar
+                    self._soporta_reflink[volumen] = False
+            if estrategia == "reflink":
+                raise OSError(errno.EOPNOTSUPP, "el volumen destino no soporta reflink (se necesita Btrfs, XFS, ...)")
+
+        copiar_rapido(ruta_origen, ruta_destino)
+        return "full"
+
+    def renombrar_archivo(self, nombre_original, ruta_corta, nombre_nuevo, politica="renombrar"):
+        """
+        Renombra un archivo dentro de la misma ruta.
+        politica: qué hacer si ya existe un archivo con el nombre nuevo (ver mover_sin_conflictos).
+        """
         try:
             ruta = self.traducir_ruta(ruta_corta)
             ruta_original = os.path.join(ruta, nombre_original)
             ruta_nueva = os.path.join(ruta, nombre_nuevo)
-            os.rename(ruta_original, ruta_nueva)
+            if nombre_original == nombre_nuevo:
+                return "ℹ️ El nombre nuevo es igual al actual."
+            if not os.path.lexists(ruta_original):
+                raise FileNotFoundError(ruta_original)
+            resultado, ruta_final = self.mover_sin_conflictos(ruta_original, ruta_nueva, politica)
+            if resultado == "saltado":
+                return f"ℹ️ No se renombró: ya existe '{nombre_nuevo}'."
+            if resultado == "renombrado":
+                return f"✅ Archivo renombrado a: {os.path.basename(ruta_final)} ('{nombre_nuevo}' ya existía)"
             return f"✅ Archivo renombrado a: {nombre_nuevo}"
         except FileNotFoundError:
             return "❌ Error: No se encontró el archivo."
@@ -141,6 +1750,7 @@ class GestorDeArchivos:
         try:
             ruta_completa = os.path.join(self.traducir_ruta(ruta_corta), nombre_carpeta)
             shutil.rmtree(ruta_completa)
+            CACHE_METADATOS.invalidar_carpeta(ruta_completa)
             return f"✅ Carpeta borrada: {ruta_completa}"
         except FileNotFoundError:
             return "❌ Error: No se encontró la carpeta."
@@ -151,28 +1761,23 @@ class GestorDeArchivos:
 
     # --- Funciones “inteligentes” (más allá de operaciones simples) ---
 
-    def organizar_carpeta_por_tipo(self, ruta_corta):
+    @operacion_masiva
+    def organizar_carpeta_por_tipo(self, ruta_corta, politica="renombrar", detener=None, progreso=None):
         """
         Organiza todos los archivos de una carpeta:
         - Detecta el tipo según la extensión
         - Mueve cada archivo a una subcarpeta adecuada
+        - Si el nombre ya existe en la subcarpeta aplica la política (ver mover_sin_conflictos)
         - Retorna un resumen con cuántos archivos movió por categoría
+        Se ejecuta como trabajo reanudable (ver ejecutar_trabajo): la carpeta se lista una
+        sola vez, el plan se guarda, y si la app se cierra a mitad se sigue con reanudar_trabajo.
         """
+        if politica not in POLITICAS_CONFLICTO:
+            return f"❌ Error: Política desconocida '{politica}' (usa: {', '.join(POLITICAS_CONFLICTO)})."
         ruta_completa = self.traducir_ruta(ruta_corta)
         if not os.path.isdir(ruta_completa):
             return f"❌ Error: La ruta '{ruta_completa}' no es un directorio válido."
 
-        # Definimos a qué carpetas van las extensiones
-        MAPEO_TIPOS = {
-            "Imagenes": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp"],
-            "Documentos": [".pdf", ".docx", ".xlsx", ".pptx", ".txt", ".csv", ".md"],
-            "Comprimidos": [".zip", ".rar", ".7z", ".tar", ".gz"],
-            "Musica": [".mp3", ".wav", ".aac", ".flac"],
-            "Videos": [".mp4", ".mov", ".avi", ".mkv"],
-            "Programas": [".exe", ".msi", ".dmg", ".deb", ".rpm"],
-            "Codigo": [".py", ".js", ".html", ".css", ".java", ".c", ".cpp", ".php"]
-        }
-
         # Creamos un diccionario inverso para saber a qué carpeta va cada extensión
         mapa_extensiones = {}
         for carpeta, extensiones in MAPEO_TIPOS.items():
@@ -180,100 +1785,1381 @@ class GestorDeArchivos:
                 mapa_extensiones[ext.lower()] = carpeta
 
         otros_dir = "Otros"
-        contador = {}  # Llevará cuántos archivos se movieron por carpeta
+        pasos = []  # [nombre del archivo, carpeta destino]
+
+        try:
+            with os.scandir(ruta_completa) as entradas:
+                entradas = list(entradas)  # Se lista antes de mover nada dentro de la carpeta
+            for entrada in entradas:
+                try:
+                    # Tipo desde la caché compartida si otra operación ya vio este archivo
+                    tipo = CACHE_METADATOS.stat(entrada.path, entrada).tipo
+                except OSError:
+                    continue  # Enlace roto o archivo que desapareció
+
+                # Solo procesamos archivos, no directorios
+                if tipo == "archivo":
+                    _, ext = os.path.splitext(entrada.name)
+                    # Calculamos a qué carpeta de destino va el archivo
+                    pasos.append([entrada.name, mapa_extensiones.get(ext.lower(), otros_dir)])
+
+            registro = RegistroTrabajo.crear("organizar", {"ruta": ruta_completa, "politica": politica}, pasos)
+        except Exception as e:
+            return f"❌ Error durante la organización: {e}"
+        return self.ejecutar_trabajo(registro, detener, progreso)
+
+    def _preparar_organizar(self, parametros):
+        """Paso de un trabajo "organizar": mueve un archivo a su subcarpeta."""
+        ruta_completa, politica = parametros["ruta"], parametros["politica"]
+        nombres = NombresOcupados()  # Nombres de cada subcarpeta, listados una sola vez
+        creadas = set()
+
+        def paso(datos, contadores):
+            nombre_archivo, carpeta_destino_nombre = datos
+            ruta_carpeta_destino = os.path.join(ruta_completa, carpeta_destino_nombre)
+            # Creamos la carpeta si no existe
+            if carpeta_destino_nombre not in creadas:
+                os.makedirs(ruta_carpeta_destino, exist_ok=True)
+                creadas.add(carpeta_destino_nombre)
+
+            movidos = contadores.setdefault("carpetas", {})
+            try:
+                # Movemos el archivo sin pisar los que ya estén en la subcarpeta
+                resultado, _ = self.limitador.ejecutar(
+                    self.mover_sin_conflictos, os.path.join(ruta_completa, nombre_archivo),
+                    os.path.join(ruta_carpeta_destino, nombre_archivo), politica, nombres
+                )
+            except FileNotFoundError:
+                # Ya se había movido justo antes de un cierre brusco (después del último punto de control)
+                resultado = "movido"
+            if resultado != "movido":
+                conflictos = contadores.setdefault("conflictos", {})
+                conflictos[resultado] = conflictos.get(resultado, 0) + 1
+            if resultado != "saltado":
+                # Contabilizamos
+                movidos[carpeta_destino_nombre] = movidos.get(carpeta_destino_nombre, 0) + 1
+
+        return paso
+
+    def _resumir_organizar(self, parametros, contadores):
+        contador = contadores.get("carpetas", {})
+        conflictos = contadores.get("conflictos", {})
+        detalle = ""
+        if conflictos:
+            detalle = " (" + ", ".join(f"{v} {k}s" for k, v in conflictos.items()) + " por nombre repetido)"
+        if contadores.get("errores"):
+            detalle += f" ({contadores['errores']} no se pudieron mover)"
+
+        # Si no se movió ningún archivo
+        if not contador:
+            return f"ℹ️ No se encontraron archivos para organizar en '{parametros['ruta']}'{detalle}."
+
+        # Preparamos un resumen del tipo "3 Imagenes, 5 Documentos"
+        resumen = ", ".join([f"{v} {k}" for k, v in contador.items()])
+        return f"✅ Organización completa: {resumen}{detalle}."
+
+    @operacion_masiva
+    def copiar_lote(self, patron, ruta_origen_corta, ruta_destino_corta, estrategia="auto", detener=None, progreso=None):
+        """
+        Copia todos los archivos que coinciden con el patrón (recursivo), conservando las
+        subcarpetas dentro del destino. Es un trabajo reanudable (ver ejecutar_trabajo):
+        la lista de archivos se busca una sola vez y queda guardada con el avance.
+        """
+        if estrategia not in ESTRATEGIAS_COPIA:
+            return f"❌ Error: Estrategia desconocida '{estrategia}' (usa: {', '.join(ESTRATEGIAS_COPIA)})."
+        ruta_origen = os.path.normpath(self.traducir_ruta(ruta_origen_corta))
+        ruta_destino = os.path.normpath(self.traducir_ruta(ruta_destino_corta))
+        if not os.path.isdir(ruta_origen):
+            return f"❌ Error: La ruta '{ruta_origen}' no es un directorio válido."
+
+        try:
+            # Si el destino está dentro del origen no se copian las copias de una vez anterior
+            dentro_destino = os.path.join(ruta_destino, "")
+            pasos = [os.path.relpath(res['ruta'], ruta_origen)
+                     for res in self.iterar_busqueda(ruta_origen, patron)
+                     if not res['ruta'].startswith(dentro_destino)]
+            registro = RegistroTrabajo.crear(
+                "copiar", {"ruta": ruta_origen, "destino": ruta_destino, "estrategia": estrategia, "patron": patron}, pasos
+            )
+        except Exception as e:
+            return f"❌ Error al preparar la copia: {e}"
+        return self.ejecutar_trabajo(registro, detener, progreso)
+
+    def _preparar_copiar(self, parametros):
+        """Paso de un trabajo "copiar": copia un archivo (volver a copiarlo da lo mismo)."""
+        ruta_origen, ruta_destino = parametros["ruta"], parametros["destino"]
+        estrategia = parametros["estrategia"]
+        creadas = set()
+
+        def paso(relativa, contadores):
+            destino = os.path.join(ruta_destino, relativa)
+            carpeta = os.path.dirname(destino)
+            if carpeta not in creadas:
+                os.makedirs(carpeta, exist_ok=True)
+                creadas.add(carpeta)
+            origen = os.path.join(ruta_origen, relativa)
+            usada = self.limitador.ejecutar(self.copiar_con_estrategia, origen, destino, estrategia,
+                                            cantidad_bytes=CACHE_METADATOS.stat(origen).tamano)
+            contadores[usada] = contadores.get(usada, 0) + 1
+
+        return paso
+
+    def _resumir_copiar(self, parametros, contadores):
+        copiados = sum(v for k, v in contadores.items() if k in ESTRATEGIAS_COPIA)
+        if not copiados and not contadores.get("errores"):
+            return f"ℹ️ No hay archivos '{parametros['patron']}' para copiar en '{parametros['ruta']}'."
+        detalle = ", ".join(f"{v} {k}" for k, v in contadores.items() if k in ESTRATEGIAS_COPIA)
+        if contadores.get("errores"):
+            return f"❌ Copia con {contadores['errores']} errores: {copiados} archivos copiados a {parametros['destino']}."
+        return f"✅ {copiados} archivos copiados a: {parametros['destino']} ({detalle})"
+
+    # --- Trabajos reanudables ---
+
+    @operacion_masiva
+    def ejecutar_trabajo(self, registro, detener=None, progreso=None):
+        """
+        Ejecuta los pasos de un trabajo desde su último punto de control.
+        - Cada PUNTO_CONTROL_PASOS pasos (o PUNTO_CONTROL_SEGUNDOS) se agrega un punto de control
+        - Los pasos son idempotentes: repetir los pocos que quedaron después del último
+          punto de control tras un cierre brusco no cambia el resultado
+        - detener: threading.Event que pausa el trabajo (queda listo para reanudar)
+        - progreso(hechos, total) se llama en cada punto de control
+        """
+        tipos = {
+            "organizar": (self._preparar_organizar, self._resumir_organizar),
+            "copiar": (self._preparar_copiar, self._resumir_copiar),
+        }
+        if registro.tipo not in tipos:
+            return f"❌ Error: Tipo de trabajo desconocido '{registro.tipo}'."
+        preparar, resumir = tipos[registro.tipo]
+        try:
+            registro.abrir()
+        except (OSError, RuntimeError) as e:
+            return f"ℹ️ No se ejecutó el trabajo '{registro.id}': {e}."
+
+        contadores = dict(registro.contadores)
+        hechos = registro.hechos
+        try:
+            paso = preparar(registro.parametros)
+            ultimo_control = time.monotonic()
+            for datos in islice(registro.pasos, hechos, None):
+                if detener is not None and detener.is_set():
+                    registro.pausar(hechos, contadores)
+                    return f"ℹ️ Trabajo '{registro.id}' pausado en {hechos}/{registro.total}; se puede reanudar."
+                try:
+                    paso(datos, contadores)
+                except OSError:
+                    contadores["errores"] = contadores.get("errores", 0) + 1
+                hechos += 1
+                if hechos % PUNTO_CONTROL_PASOS == 0 or time.monotonic() - ultimo_control >= PUNTO_CONTROL_SEGUNDOS:
+                    registro.punto_de_control(hechos, contadores)
+                    ultimo_control = time.monotonic()
+                    if progreso:
+                        progreso(hechos, registro.total)
+            mensaje = resumir(registro.parametros, contadores)
+            registro.terminar("completado", hechos, contadores, mensaje)
+            return mensaje
+        except Exception as e:
+            registro.terminar("error", hechos, contadores, str(e))
+            return f"❌ Error en el trabajo '{registro.id}' ({hechos}/{registro.total}): {e}"
+        finally:
+            registro.cerrar()
+
+    def reanudar_trabajo(self, id_trabajo, detener=None, progreso=None):
+        """Sigue un trabajo interrumpido, pausado o con error desde su último punto de control."""
+        ruta = os.path.join(DIRECTORIO_TRABAJOS, os.path.basename(id_trabajo) + ".jsonl")
+        try:
+            registro = RegistroTrabajo.cargar(ruta)
+        except OSError:
+            return f"❌ Error: No existe el trabajo '{id_trabajo}'."
+        if registro.estado not in RegistroTrabajo.REANUDABLES:
+            return f"ℹ️ El trabajo '{id_trabajo}' está {registro.estado}; no hay nada que reanudar."
+        return self.ejecutar_trabajo(registro, detener, progreso)
+
+    def listar_trabajos(self):
+        """Devuelve (trabajos, mensaje) con todos los trabajos guardados, del más reciente al más antiguo."""
+        trabajos = RegistroTrabajo.listar()
+        if not trabajos:
+            return trabajos, "ℹ️ No hay trabajos guardados."
+        pendientes = sum(1 for t in trabajos if t.estado in RegistroTrabajo.REANUDABLES)
+        return trabajos, f"ℹ️ {len(trabajos)} trabajos ({pendientes} se pueden reanudar)."
+
+    def borrar_trabajos_terminados(self):
+        """Borra los registros de los trabajos completados."""
+        borrados = RegistroTrabajo.podar(conservar=0)
+        return f"✅ {borrados} trabajos terminados borrados."
+
+    # --- Límites de E/S de las operaciones masivas ---
+
+    def configurar_limites(self, mb_por_segundo=None, archivos_por_segundo=None, nice=None, prioridad_es=None,
+                           adaptativo=True):
+        """
+        Limita organizar, las copias masivas, sincronizar, limpiar y deduplicar (ver LimitadorES):
+        - mb_por_segundo / archivos_por_segundo: ritmo máximo (None = sin límite)
+        - nice (0-19) y prioridad_es ("normal", "baja", "minima"): prioridad de los hilos que trabajan
+        - adaptativo: frena solo cuando la latencia del disco sube
+        Sin ningún parámetro (y adaptativo=False) quita todos los límites.
+        """
+        try:
+            self.limitador = LimitadorES(mb_por_segundo, archivos_por_segundo, nice, prioridad_es, adaptativo)
+        except ValueError as e:
+            return f"❌ Error: {e}."
+        return f"✅ Operaciones masivas: {self.limitador.describir()}."
+
+    def buscar_archivos(self, ruta_corta, nombre_archivo="", bajo_consumo=False, limite_memoria=MEMORIA_RESULTADOS):
+        """
+        Busca recursivamente en la ruta traducida todos los archivos cuyo nombre
+        coincide con un patrón (se puede usar comodines, ejemplo '*.txt').
+        La ruta también puede ser "todos" o varias rutas separadas por comas:
+        en ese caso se recorren todas a la vez (ver resolver_raices).
+        Devuelve una lista de diccionarios con información y un mensaje final.
+        Con bajo_consumo=True la lista es un ResultadosColumnares, que se recorre igual
+        pero no ocupa más de limite_memoria (el resto va a un archivo temporal).
+        """
+        raices = self.resolver_raices(ruta_corta)
+        if not raices:
+            return [], f"❌ Error: Ninguna de las rutas de '{ruta_corta}' es un directorio válido."
+        if len(raices) == 1 and not os.path.isdir(raices[0]):
+            return [], f"❌ Error: La ruta '{raices[0]}' no es un directorio válido."
+
+        try:
+            # En bajo consumo los resultados tampoco pasan por la caché de metadatos
+            encontrados = self._iterar_raices(raices, nombre_archivo, usar_cache=not bajo_consumo)
+            if bajo_consumo:
+                resultados = ResultadosColumnares(limite_memoria)
+                for res in encontrados:
+                    resultados.agregar(res['ruta'], res['tamano_bytes'])
+            else:
+                resultados = list(encontrados)
+            mensaje = f"✅ Búsqueda finalizada. {len(resultados)} archivos encontrados"
+            if len(raices) > 1:
+                mensaje += f" en {len(raices)} carpetas"
+            return resultados, mensaje + "."
+
+        except Exception as e:
+            return [], f"❌ Error durante la búsqueda: {e}"
+
+    def _iterar_raices(self, raices, nombre_archivo, usar_cache=True):
+        """Generador de resultados de una o varias raíces ya resueltas."""
+        if len(raices) == 1:
+            return self.iterar_busqueda(raices[0], nombre_archivo, usar_cache=usar_cache)
+        return self.iterar_busqueda_multiple(raices, nombre_archivo, usar_cache=usar_cache)
+
+    def exportar_busqueda(self, ruta_corta, nombre_archivo, ruta_exportacion):
+        """
+        Busca igual que buscar_archivos pero escribe cada resultado directamente en un
+        archivo .csv, .jsonl o .gcol (opcionalmente .gz) en vez de devolver la lista:
+        la memoria no crece aunque haya millones de resultados.
+        """
+        raices = self.resolver_raices(ruta_corta)
+        if not raices:
+            return f"❌ Error: Ninguna de las rutas de '{ruta_corta}' es un directorio válido."
+        if len(raices) == 1 and not os.path.isdir(raices[0]):
+            return f"❌ Error: La ruta '{raices[0]}' no es un directorio válido."
+        return self.exportar_resultados(self._iterar_raices(raices, nombre_archivo, usar_cache=False), ruta_exportacion)
+
+    def exportar_resultados(self, resultados, ruta_exportacion, columnas_extra=()):
+        """Escribe en un archivo resultados ya obtenidos (lista o generador)."""
+        ruta_completa = self.traducir_ruta(ruta_exportacion)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta_completa)), exist_ok=True)
+            with ExportadorResultados(ruta_completa, columnas_extra) as exportador:
+                for res in resultados:
+                    exportador.escribir(res)
+            return f"✅ {exportador.filas} resultados exportados a: {ruta_completa}"
+        except Exception as e:
+            return f"❌ Error al exportar: {e}"
+        finally:
+            if hasattr(resultados, "close"):
+                resultados.close()  # Un generador a medias detiene sus hilos de búsqueda
+
+    def resolver_raices(self, ruta_corta):
+        """
+        Convierte la ruta de una búsqueda en la lista de carpetas a recorrer:
+        - "todos": todos los atajos (descargas, documentos, escritorio, ...)
+        - "descargas, documentos, /otra/ruta": una lista separada por comas
+        - cualquier otra cosa: una sola ruta (sin validar)
+        De una lista se descartan las rutas que no existen, las repetidas (mismo inodo,
+        ej: un enlace simbólico o un montaje duplicado) y las que están dentro de otra.
+        """
+        texto = ruta_corta.strip()
+        if texto.lower() == "todos":
+            candidatas = [ruta for atajo, ruta in self.atajos_ruta.items() if atajo != "."]
+        elif "," in texto and not os.path.isdir(self.traducir_ruta(texto)):
+            candidatas = [self.traducir_ruta(parte.strip()) for parte in texto.split(",") if parte.strip()]
+        else:
+            return [self.traducir_ruta(ruta_corta)]
+
+        vistas = set()  # (dispositivo, inodo) de cada carpeta ya incluida
+        reales = []
+        for ruta in candidatas:
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            if not os.path.isdir(ruta) or (info.st_dev, info.st_ino) in vistas:
+                continue
+            vistas.add((info.st_dev, info.st_ino))
+            reales.append((os.path.realpath(ruta), ruta))
+
+        # Las más cortas primero: una carpeta contenida en otra se descarta al llegar a ella
+        reales.sort(key=lambda par: len(par[0]))
+        raices = []
+        for real, ruta in reales:
+            if any(real.startswith(otra.rstrip(os.sep) + os.sep) for otra, _ in raices):
+                continue
+            raices.append((real, ruta))
+        return [ruta for _, ruta in raices]
+
+    def iterar_busqueda(self, ruta_completa, nombre_archivo="", evitar=None, detener=None, usar_cache=True):
+        """
+        Generador con los resultados de buscar_archivos en UNA carpeta, a medida que se
+        encuentran (mismo formato de diccionario).
+        - evitar: set de (dispositivo, inodo) de carpetas que no se deben recorrer
+          (ej: otra raíz de una búsqueda múltiple montada dentro de esta)
+        - detener: threading.Event que corta el recorrido
+        - usar_cache=False: no se guarda nada en CACHE_METADATOS (modo de bajo consumo y
+          exportaciones: millones de resultados no deben quedar en memoria)
+        """
+        # Construimos el patrón para buscar; si no hay nombre, usamos "*"
+        patron_nombre = nombre_archivo.lower() if nombre_archivo else "*"
+
+        # Caminamos por todos los subdirectorios sin guardar listas de nombres
+        for entrada in recorrer_archivos(ruta_completa, evitar, detener):
+            # Filtramos por patrón
+            if not fnmatch.fnmatch(entrada.name.lower(), patron_nombre):
+                continue
+
+            try:
+                _, ext = os.path.splitext(entrada.name)
+                if usar_cache:
+                    tamano_bytes = CACHE_METADATOS.stat(entrada.path, entrada).tamano
+                else:
+                    tamano_bytes = entrada.stat().st_size
+
+                yield {
+                    'ruta': entrada.path,
+                    'extension': ext if ext else "Sin Extensión",
+                    'tamano_kb': tamano_bytes / 1024,
+                    'tamano_bytes': tamano_bytes
+                }
+
+            except OSError:
+                # Si falló obtener datos del archivo, lo omitimos
+                continue
+
+    def iterar_busqueda_multiple(self, raices, nombre_archivo="", detener=None, usar_cache=True):
+        """
+        Recorre varias carpetas al mismo tiempo (un hilo por raíz) y entrega los resultados
+        de todas mezclados en un solo generador, en cuanto cualquiera encuentra algo.
+        Si quien consume deja de leer (cierra el generador) o se activa `detener`,
+        los hilos terminan solos.
+        """
+        identidades = {}
+        for raiz in raices:
+            try:
+                info = os.stat(raiz)
+                identidades[raiz] = (info.st_dev, info.st_ino)
+            except OSError:
+                continue
+
+        detener = detener or threading.Event()
+        cola = queue.Queue(maxsize=1024)  # Acotada: si nadie lee, los hilos esperan
+        terminado = object()  # Marca que un hilo ya recorrió toda su raíz
+
+        def poner(elemento):
+            while not detener.is_set():
+                try:
+                    cola.put(elemento, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def recorrer(raiz):
+            # Las demás raíces no se recorren desde esta (evita duplicados por montajes anidados)
+            evitar = set(identidades.values()) - {identidades[raiz]}
+            try:
+                for resultado in self.iterar_busqueda(raiz, nombre_archivo, evitar, detener, usar_cache):
+                    poner(resultado)
+            finally:
+                poner(terminado)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(len(identidades), HILOS_ANALISIS)))
+        try:
+            for raiz in identidades:
+                pool.submit(recorrer, raiz)
+            pendientes = len(identidades)
+            while pendientes and not detener.is_set():
+                try:
+                    # Con espera acotada: si se activa `detener` mientras no llega nada
+                    # (ej: carpetas enormes sin coincidencias) el generador termina igual
+                    elemento = cola.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if elemento is terminado:
+                    pendientes -= 1
+                else:
+                    yield elemento
+        finally:
+            detener.set()
+            pool.shutdown(wait=False)
+
+    # --- Sincronización de carpetas ---
+
+    @staticmethod
+    def _listar_entradas(ruta_dir):
+        """
+        Devuelve {nombre: DirEntry} del contenido de una carpeta ({} si no existe).
+        Cualquier otro error (permisos, disco o red desconectada) se lanza: una carpeta
+        que no se pudo leer no es lo mismo que una vacía.
+        """
+        try:
+            with os.scandir(ruta_dir) as entradas:
+                return {entrada.name: entrada for entrada in entradas}
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _copiar_si_distinto(ruta_origen, ruta_destino, verificar_hash):
+        """
+        Tarea de un hilo de copia. Si verificar_hash es True el archivo tiene igual
+        tamaño y fecha: solo se copia si el contenido es distinto. Devuelve (copiado, bytes).
+        """
+        if verificar_hash and _hash_archivo(ruta_origen) == _hash_archivo(ruta_destino):
+            return False, 0
+        copiar_rapido(ruta_origen, ruta_destino)
+        return True, os.path.getsize(ruta_destino)
+
+    @operacion_masiva
+    def sincronizar_carpetas(self, ruta_origen_corta, ruta_destino_corta, eliminar_sobrantes=False,
+                             comparar_hash=False, hilos=HILOS_COPIA):
+        """
+        Deja la carpeta destino igual que la de origen (espejo), copiando solo lo necesario:
+        - Ambos árboles se recorren a la par, carpeta por carpeta, con os.scandir
+        - Un archivo se copia si no existe en destino o si cambió su tamaño o fecha
+          (con comparar_hash=True también se comparan contenidos con igual tamaño y fecha)
+        - Con eliminar_sobrantes=True se borra del destino lo que ya no está en el origen
+        - Las copias se hacen en un grupo limitado de hilos
+        """
+        ruta_origen = os.path.normpath(self.traducir_ruta(ruta_origen_corta))
+        ruta_destino = os.path.normpath(self.traducir_ruta(ruta_destino_corta))
+        if not os.path.isdir(ruta_origen):
+            return f"❌ Error: La ruta '{ruta_origen}' no es un directorio válido."
+        # Con rutas reales (enlaces simbólicos resueltos): si una raíz contiene a la otra, el
+        # espejo se copiaría dentro de sí mismo o borraría el origen como "sobrante"
+        real_origen, real_destino = os.path.realpath(ruta_origen), os.path.realpath(ruta_destino)
+        if (real_origen == real_destino or real_destino.startswith(os.path.join(real_origen, ""))
+                or real_origen.startswith(os.path.join(real_destino, ""))):
+            return "❌ Error: El origen y el destino no pueden ser la misma carpeta ni estar uno dentro del otro."
+
+        copiados = sin_cambios = eliminados = errores = 0
+        bytes_copiados = 0
+        tareas = deque()  # Copias en curso; se limita su cantidad para no acumular memoria
+
+        def recoger_tarea():
+            nonlocal copiados, sin_cambios, errores, bytes_copiados
+            try:
+                copiado, cantidad = tareas.popleft().result()
+                if copiado:
+                    copiados += 1
+                    bytes_copiados += cantidad
+                else:
+                    sin_cambios += 1
+            except OSError:
+                errores += 1
+
+        try:
+            os.makedirs(ruta_destino, exist_ok=True)
+            # Los hilos de copia trabajan con la prioridad configurada (ver LimitadorES)
+            with ThreadPoolExecutor(max_workers=hilos, initializer=self.limitador.aplicar_prioridad) as pool:
+                pendientes = [""]  # Rutas relativas a ambas raíces
+                while pendientes:
+                    relativa = pendientes.pop()
+                    dir_origen = os.path.join(ruta_origen, relativa)
+                    dir_destino = os.path.join(ruta_destino, relativa)
+                    try:
+                        entradas_destino = self._listar_entradas(dir_destino)
+                        entradas_origen = self._listar_entradas(dir_origen)
+                    except OSError:
+                        # Sin poder comparar esta carpeta no se copia ni se borra nada en ella
+                        errores += 1
+                        continue
+                    incompleta = False  # Alguna entrada de esta carpeta no se pudo comparar
+
+                    for nombre, entrada in entradas_origen.items():
+                        en_destino = entradas_destino.pop(nombre, None)
+                        destino = os.path.join(dir_destino, nombre)
+                        try:
+                            # stat en vez de is_dir()/is_file(): esos devuelven False si fallan
+                            # y un error se confundiría con "otro tipo" (y se borraría el destino)
+                            info = entrada.stat(follow_symlinks=False)
+                            modo_destino = en_destino.stat(follow_symlinks=False).st_mode if en_destino else None
+                            if stat.S_ISDIR(info.st_mode):
+                                if modo_destino is not None and not stat.S_ISDIR(modo_destino):
+                                    os.remove(destino)  # Había un archivo donde ahora va una carpeta
+                                    modo_destino = None
+                                if modo_destino is None:
+                                    os.makedirs(destino, exist_ok=True)
+                                pendientes.append(os.path.join(relativa, nombre))
+                                continue
+                            if not stat.S_ISREG(info.st_mode):
+                                continue
+
+                            verificar_hash = False
+                            if modo_destino is not None and stat.S_ISREG(modo_destino):
+                                info_destino = en_destino.stat(follow_symlinks=False)
+                                iguales = (info.st_size == info_destino.st_size and
+                                           abs(info.st_mtime - info_destino.st_mtime) <= TOLERANCIA_MTIME)
+                                if iguales and not comparar_hash:
+                                    sin_cambios += 1
+                                    continue
+                                verificar_hash = iguales
+                            elif modo_destino is not None:
+                                shutil.rmtree(destino)  # Había una carpeta donde ahora va un archivo
+                        except OSError:
+                            errores += 1
+                            incompleta = True
+                            continue
+
+                        tareas.append(pool.submit(self.limitador.ejecutar, self._copiar_si_distinto, entrada.path,
+                                                  destino, verificar_hash, cantidad_bytes=info.st_size))
+                        while len(tareas) > hilos * 4:
+                            recoger_tarea()
+
+                    # Lo que quedó en destino no existe en el origen (solo si toda la carpeta
+                    # se pudo comparar: ante un error es mejor dejar un sobrante que borrar de más)
+                    if eliminar_sobrantes and not incompleta:
+                        for en_destino in entradas_destino.values():
+                            try:
+                                if en_destino.is_dir(follow_symlinks=False):
+                                    shutil.rmtree(en_destino.path)
+                                else:
+                                    os.remove(en_destino.path)
+                                eliminados += 1
+                            except OSError:
+                                errores += 1
+
+                while tareas:
+                    recoger_tarea()
+
+        except Exception as e:
+            return f"❌ Error durante la sincronización: {e}"
+        finally:
+            CACHE_METADATOS.invalidar_carpeta(ruta_destino)  # El espejo cambió archivos del destino
+
+        resumen = (
+            f"{copiados} copiados ({formatear_tamano(bytes_copiados)}), {sin_cambios} sin cambios, "
+            f"{eliminados} eliminados, {errores} errores"
+        )
+        if errores:
+            return f"❌ Sincronización con errores: {resumen}."
+        return f"✅ Sincronización completa: {resumen}."
+
+    # --- Deduplicación ---
+
+    @staticmethod
+    def _sin_cambios(ruta, info):
+        """True si la ruta sigue siendo el mismo archivo, con igual tamaño y fecha, que en `info`."""
+        try:
+            actual = os.lstat(ruta)
+        except OSError:
+            return False
+        return ((actual.st_dev, actual.st_ino, actual.st_size, actual.st_mtime_ns)
+                == (info.st_dev, info.st_ino, info.st_size, info.st_mtime_ns))
+
+    @operacion_masiva
+    def deduplicar(self, ruta_corta, estrategia="hardlink", simular=False):
+        """
+        Busca archivos idénticos dentro de una carpeta (recursivo) y reemplaza las copias
+        por enlaces al primero de cada grupo, liberando su espacio:
+        - estrategia "hardlink": todos pasan a ser el mismo archivo (cambiar uno cambia todos)
+        - estrategia "reflink": comparten bloques pero siguen siendo archivos independientes
+        Se compara por tamaño, luego por el hash de los primeros 64 KB y al final por el
+        hash completo, así solo se leen enteros los archivos que probablemente son iguales.
+        Se omiten (sin tocarlas) las parejas con distintos permisos o dueño y las que
+        cambiaron después de calcular su hash.
+        """
+        if estrategia not in ("hardlink", "reflink"):
+            return "❌ Error: La estrategia de deduplicación debe ser 'hardlink' o 'reflink'."
+        ruta_completa = self.traducir_ruta(ruta_corta)
+        if not os.path.isdir(ruta_completa):
+            return f"❌ Error: La ruta '{ruta_completa}' no es un directorio válido."
+
+        # 1) Agrupar por (volumen, tamaño); un mismo inodo se cuenta una sola vez.
+        # Se guarda el stat de cada archivo para ver después si cambió
+        por_tamano = {}
+        inodos = set()
+        for entrada in recorrer_archivos(ruta_completa):
+            try:
+                info = entrada.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+                continue  # Enlaces simbólicos, dispositivos y archivos vacíos no cuentan
+            CACHE_METADATOS.guardar(entrada.path, info)
+            if (info.st_dev, info.st_ino) in inodos:
+                continue  # Ya es un enlace duro a otro archivo de la lista
+            inodos.add((info.st_dev, info.st_ino))
+            por_tamano.setdefault((info.st_dev, info.st_size), []).append((entrada.path, info))
+
+        reemplazados = errores = omitidos = 0
+        bytes_liberados = 0
+        ejemplos = []
+        for (_, tamano), archivos in por_tamano.items():
+            if len(archivos) < 2:
+                continue
+            # 2) y 3) Afinamos los grupos con hash parcial y luego completo
+            grupos = {}
+            for ruta_archivo, info in archivos:
+                try:
+                    inicio = self.limitador.ejecutar(_hash_inicio, ruta_archivo, cantidad_bytes=min(tamano, 65536))
+                    grupos.setdefault(inicio, []).append((ruta_archivo, info))
+                except OSError:
+                    errores += 1
+            iguales = {}
+            for candidatos in grupos.values():
+                if len(candidatos) < 2:
+                    continue
+                for ruta_archivo, info in candidatos:
+                    try:
+                        if tamano > 65536:
+                            clave = self.limitador.ejecutar(_hash_archivo, ruta_archivo, cantidad_bytes=tamano)
+                        else:
+                            clave = "inicio"
+                        iguales.setdefault(clave + candidatos[0][0], []).append((ruta_archivo, info))
+                    except OSError:
+                        errores += 1
+
+            for duplicados in iguales.values():
+                (original, info_original), *copias = sorted(duplicados)
+                for copia, info_copia in copias:
+                    # Un enlace duro comparte permisos y dueño: no se le cambian a ninguna copia
+                    if (stat.S_IMODE(info_copia.st_mode), info_copia.st_uid, info_copia.st_gid) != (
+                            stat.S_IMODE(info_original.st_mode), info_original.st_uid, info_original.st_gid):
+                        omitidos += 1
+                        continue
+                    if simular:
+                        if len(ejemplos) < 20:
+                            ejemplos.append(f"  {copia} → {original}")
+                    else:
+                        # Justo antes de reemplazar: si alguno cambió desde que se calculó su
+                        # hash, su contenido nuevo se perdería; esa pareja no se toca
+                        if not (self._sin_cambios(original, info_original) and self._sin_cambios(copia, info_copia)):
+                            omitidos += 1
+                            continue
+                        try:
+                            self.limitador.ejecutar(self.copiar_con_estrategia, original, copia, estrategia)
+                        except OSError:
+                            errores += 1
+                            continue
+                    reemplazados += 1
+                    bytes_liberados += tamano
+
+        resumen = f"{reemplazados} duplicados ({formatear_tamano(bytes_liberados)})"
+        nota = f" ({omitidos} omitidos por permisos, dueño o cambios recientes)" if omitidos else ""
+        if simular:
+            encabezado = f"ℹ️ Simulación: se reemplazarían {resumen} por enlaces {estrategia}{nota}."
+            return "\n".join([encabezado] + ejemplos)
+        if errores:
+            return f"❌ Deduplicación con {errores} errores: {resumen} reemplazados por enlaces {estrategia}{nota}."
+        return f"✅ Deduplicación completa: {resumen} reemplazados por enlaces {estrategia}{nota}."
+
+    # --- Compresión y descompresión ---
+
+    def _listar_para_comprimir(self, ruta_completa, omitir=None):
+        """
+        Devuelve [(ruta_real, nombre_dentro_del_archivo), ...] y la suma de tamaños.
+        omitir: ruta del archivo comprimido que se está creando; si está dentro de la
+        carpeta (o ya existía de antes) no se mete dentro de sí mismo.
+        """
+        try:
+            info = os.stat(omitir) if omitir else None
+            omitido = (info.st_dev, info.st_ino) if info else None
+        except OSError:
+            omitido = None
+
+        base = os.path.dirname(os.path.normpath(ruta_completa))
+        if os.path.isfile(ruta_completa):
+            rutas = [ruta_completa]
+        else:
+            rutas = (os.path.join(dirpath, filename)
+                     for dirpath, _, filenames in os.walk(ruta_completa) for filename in filenames)
+
+        archivos = []
+        total_bytes = 0
+        for ruta_archivo in rutas:
+            try:
+                info = os.stat(ruta_archivo)
+            except OSError:
+                continue
+            if (info.st_dev, info.st_ino) == omitido:
+                continue
+            total_bytes += info.st_size
+            archivos.append((ruta_archivo, os.path.relpath(ruta_archivo, base)))
+        return archivos, total_bytes
+
+    @staticmethod
+    def _crear_temporal_comprimido(carpeta, nombre):
+        """
+        Crea (vacío y con nombre único) el temporal donde se escribe el comprimido.
+        No se usa mkstemp porque deja permisos 600; así el resultado respeta la umask
+        igual que si se hubiera creado directamente.
+        """
+        while True:
+            temporal = os.path.join(carpeta, f".{nombre}.{secrets.token_hex(4)}.tmp")
+            try:
+                os.close(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+                return temporal
+            except FileExistsError:
+                continue
+
+    def comprimir(self, ruta_corta, ruta_archivo_corta, progreso=None):
+        """
+        Crea un .zip o .tar.gz con el contenido de una carpeta (o un solo archivo).
+        - Los archivos se leen por bloques, nunca se cargan completos en memoria
+        - En .tar.gz los bloques se comprimen en paralelo en varios procesos
+        - progreso(hechos, total) se llama después de agregar cada archivo (opcional)
+        """
+        import zipfile  # Crear archivos .zip
+        import tarfile  # Crear archivos .tar.gz
+
+        ruta_completa = self.traducir_ruta(ruta_corta)
+        ruta_archivo = self.traducir_ruta(ruta_archivo_corta)
+        if not os.path.exists(ruta_completa):
+            return f"❌ Error: No existe '{ruta_completa}'."
+
+        nombre_archivo = ruta_archivo.lower()
+        es_zip = nombre_archivo.endswith(".zip")
+        if not es_zip and not nombre_archivo.endswith((".tar.gz", ".tgz")):
+            return "❌ Error: El archivo destino debe terminar en .zip, .tar.gz o .tgz."
+
+        try:
+            archivos, total_bytes = self._listar_para_comprimir(ruta_completa, omitir=ruta_archivo)
+            carpeta = os.path.dirname(os.path.abspath(ruta_archivo))
+            os.makedirs(carpeta, exist_ok=True)
+            temporal = self._crear_temporal_comprimido(carpeta, os.path.basename(ruta_archivo))
+        except Exception as e:
+            return f"❌ Error al comprimir: {e}"
+
+        try:
+            # Se escribe en un temporal de la misma carpeta y solo al terminar bien
+            # reemplaza al destino: si algo falla no queda un archivo a medias
+            if es_zip:
+                # zipfile.write ya copia cada archivo por bloques
+                with zipfile.ZipFile(temporal, 'w', zipfile.ZIP_DEFLATED) as zf:
+                    for hechos, (ruta_real, nombre) in enumerate(archivos, 1):
+                        zf.write(ruta_real, nombre)
+                        if progreso:
+                            progreso(hechos, len(archivos))
+            else:
+                # Para archivos chicos no vale la pena arrancar procesos
+                procesos = PROCESOS_COMPRESION if total_bytes > 4 * BLOQUE_COMPRESION else 1
+                escritor = EscritorGzipParalelo(temporal, procesos=procesos)
+                try:
+                    # Modo 'w|' = flujo: tarfile escribe en orden y nunca retrocede
+                    with tarfile.open(fileobj=escritor, mode='w|') as tar:
+                        for hechos, (ruta_real, nombre) in enumerate(archivos, 1):
+                            tar.add(ruta_real, nombre, recursive=False)
+                            if progreso:
+                                progreso(hechos, len(archivos))
+                finally:
+                    escritor.close()
+
+            os.replace(temporal, ruta_archivo)
+        except BaseException as e:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            if not isinstance(e, Exception):
+                raise
+            return f"❌ Error al comprimir: {e}"
+
+        CACHE_METADATOS.invalidar(ruta_archivo)
+        try:
+            tamano_final = os.path.getsize(ruta_archivo)
+            return (
+                f"✅ Archivo comprimido creado: {ruta_archivo} "
+                f"({len(archivos)} archivos, {formatear_tamano(total_bytes)} → {formatear_tamano(tamano_final)})"
+            )
+        except Exception as e:
+            return f"❌ Error al comprimir: {e}"
+
+    def descomprimir(self, ruta_archivo_corta, ruta_destino_corta, progreso=None):
+        """
+        Extrae un .zip o .tar(.gz) en la carpeta destino, miembro por miembro.
+        Se rechazan los miembros cuyo nombre intente salir de la carpeta destino (en .tar,
+        con el filtro "data" de tarfile cuando existe: también enlaces hacia fuera y dispositivos).
+        progreso(hechos, total) se llama tras cada miembro (en .tar cuenta bytes leídos).
+        """
+        import zipfile  # Extraer archivos .zip
+        import tarfile  # Extraer archivos .tar(.gz)
+
+        ruta_archivo = self.traducir_ruta(ruta_archivo_corta)
+        ruta_destino = os.path.abspath(self.traducir_ruta(ruta_destino_corta))
+        if not os.path.isfile(ruta_archivo):
+            return "❌ Error: No se encontró el archivo comprimido."
+
+        def dentro_del_destino(nombre):
+            ruta = os.path.abspath(os.path.join(ruta_destino, nombre))
+            return ruta == ruta_destino or ruta.startswith(os.path.join(ruta_destino, ""))
+
+        try:
+            os.makedirs(ruta_destino, exist_ok=True)
+            extraidos = 0
+
+            if zipfile.is_zipfile(ruta_archivo):
+                with zipfile.ZipFile(ruta_archivo) as zf:
+                    miembros = zf.infolist()
+                    for hechos, miembro in enumerate(miembros, 1):
+                        if not dentro_del_destino(miembro.filename):
+                            continue
+                        zf.extract(miembro, ruta_destino)  # Copia por bloques
+                        extraidos += 1
+                        if progreso:
+                            progreso(hechos, len(miembros))
+            else:
+                total = os.path.getsize(ruta_archivo)
+                # Python 3.12+ (y 3.8-3.11 con parches de seguridad) trae el filtro "data"
+                filtro = "data" if hasattr(tarfile, "data_filter") else None
+                with open(ruta_archivo, 'rb') as f, tarfile.open(fileobj=f, mode='r:*') as tar:
+                    for miembro in tar:
+                        if filtro:
+                            try:
+                                tar.extract(miembro, ruta_destino, set_attrs=False, filter=filtro)
+                            except tarfile.FilterError:
+                                continue  # Ruta absoluta o fuera del destino, enlace hacia fuera, dispositivo...
+                        else:
+                            # Sin filtro: ignoramos rutas peligrosas y enlaces/dispositivos a mano
+                            if not dentro_del_destino(miembro.name) or not (miembro.isfile() or miembro.isdir()):
+                                continue
+                            tar.extract(miembro, ruta_destino, set_attrs=False)
+                        extraidos += 1
+                        if progreso:
+                            progreso(f.tell(), total)
+
+            return f"✅ Extraídos {extraidos} elementos en: {ruta_destino}"
+        except (zipfile.BadZipFile, tarfile.TarError):
+            return "❌ Error: El archivo no es un .zip ni un .tar válido."
+        except Exception as e:
+            return f"❌ Error al descomprimir: {e}"
+        finally:
+            CACHE_METADATOS.invalidar_carpeta(ruta_destino)
+
+    # --- Limpieza por reglas de antigüedad ---
+
+    def cargar_reglas(self, ruta_reglas_corta):
+        """
+        Lee un archivo .toml con reglas de limpieza y las deja listas para usar.
+        Cada regla es una tabla [[regla]] con:
+          patron  = "*.tmp" o ["*.mp4", "*.mkv"]   (comodines sobre el nombre)
+          dias    = 7                               (antigüedad mínima según fecha de modificación)
+          accion  = "borrar" o "mover"
+          destino = "descargas/Archivo"             (solo para "mover")
+          nombre  = "temporales"                    (opcional, para el reporte)
+        Los patrones de cada regla se compilan en una única expresión regular.
+        Lanza ValueError si el archivo no es válido.
+        """
+        try:
+            import tomllib  # Lectura de archivos de reglas .toml (Python 3.11+)
+        except ImportError:
+            try:
+                import tomli as tomllib  # Misma librería, instalada con pip en versiones anteriores
+            except ImportError:
+                raise ValueError("Se necesita Python 3.11+ o la librería 'tomli' para leer reglas .toml")
+
+        ruta_reglas = self.traducir_ruta(ruta_reglas_corta)
+        with open(ruta_reglas, 'rb') as f:
+            datos = tomllib.load(f)
+
+        reglas = []
+        for numero, regla in enumerate(datos.get("regla", []), 1):
+            patrones = regla.get("patron")
+            if isinstance(patrones, str):
+                patrones = [patrones]
+            if not patrones:
+                raise ValueError(f"La regla {numero} no tiene 'patron'.")
+
+            accion = str(regla.get("accion", "")).lower()
+            if accion not in ("borrar", "mover"):
+                raise ValueError(f"La regla {numero} tiene una acción inválida: '{accion}'.")
+            if accion == "mover" and not regla.get("destino"):
+                raise ValueError(f"La regla {numero} mueve archivos pero no indica 'destino'.")
+
+            expresion = "|".join(f"(?:{fnmatch.translate(p.lower())})" for p in patrones)
+            reglas.append({
+                'nombre': regla.get("nombre", f"regla {numero}"),
+                'coincide': re.compile(expresion).match,
+                'segundos': float(regla.get("dias", 0)) * 86400,
+                'accion': accion,
+                'destino': os.path.abspath(self.traducir_ruta(regla["destino"])) if accion == "mover" else None,
+            })
+
+        if not reglas:
+            raise ValueError("El archivo no contiene ninguna [[regla]].")
+        return reglas
+
+    def _ejecutar_lote_limpieza(self, lote, carpetas_creadas):
+        """Aplica un lote de acciones [(regla, ruta), ...]. Devuelve (hechos, omitidos)."""
+        hechos = omitidos = 0
+        for regla, ruta_archivo in lote:
+            try:
+                CACHE_METADATOS.invalidar(ruta_archivo)
+                if regla['accion'] == "borrar":
+                    self.limitador.ejecutar(os.remove, ruta_archivo)
+                else:
+                    if regla['destino'] not in carpetas_creadas:
+                        os.makedirs(regla['destino'], exist_ok=True)
+                        carpetas_creadas.add(regla['destino'])
+                    ruta_destino = os.path.join(regla['destino'], os.path.basename(ruta_archivo))
+                    # "saltar": comprobar y mover es una sola operación, así nunca se pisa un
+                    # archivo del destino (aunque aparezca mientras se limpia)
+                    resultado, _ = self.limitador.ejecutar(
+                        self.mover_sin_conflictos, ruta_archivo, ruta_destino, "saltar"
+                    )
+                    if resultado == "saltado":
+                        omitidos += 1
+                        continue
+                hechos += 1
+            except OSError:
+                omitidos += 1
+        return hechos, omitidos
+
+    @operacion_masiva
+    def limpiar_segun_reglas(self, ruta_corta, ruta_reglas_corta, simular=False, tamano_lote=500):
+        """
+        Aplica las reglas de limpieza a todos los archivos de una carpeta (recursivo).
+        - Todo el árbol se recorre UNA sola vez con os.scandir; para cada archivo se
+          aplica la primera regla que coincida (patrón y antigüedad)
+        - Las acciones se ejecutan en lotes de 'tamano_lote', sin guardar la lista completa
+        - Con simular=True no se toca nada y solo se devuelve el reporte
+        """
+        ruta_completa = self.traducir_ruta(ruta_corta)
+        if not os.path.isdir(ruta_completa):
+            return f"❌ Error: La ruta '{ruta_completa}' no es un directorio válido."
+
+        try:
+            reglas = self.cargar_reglas(ruta_reglas_corta)
+        except FileNotFoundError:
+            return "❌ Error: No se encontró el archivo de reglas."
+        except Exception as e:
+            return f"❌ Error en el archivo de reglas: {e}"
+
+        ahora = time.time()
+        limites = [ahora - regla['segundos'] for regla in reglas]
+        # No entramos en las carpetas de destino: allí están los archivos ya archivados
+        destinos = {regla['destino'] for regla in reglas if regla['destino']}
+
+        conteo = {regla['nombre']: [0, 0] for regla in reglas}  # nombre → [archivos, bytes]
+        ejemplos = []  # Algunas rutas para mostrar en la simulación
+        lote = []
+        carpetas_creadas = set()
+        hechos = omitidos = 0
 
         try:
-            for nombre_archivo in os.listdir(ruta_completa):
-                ruta_archivo_origen = os.path.join(ruta_completa, nombre_archivo)
+            pendientes = [ruta_completa]
+            while pendientes:
+                try:
+                    entradas = os.scandir(pendientes.pop())
+                except OSError:
+                    continue
+                with entradas:
+                    for entrada in entradas:
+                        try:
+                            if entrada.is_dir(follow_symlinks=False):
+                                if os.path.abspath(entrada.path) not in destinos:
+                                    pendientes.append(entrada.path)
+                                continue
+                            if not entrada.is_file(follow_symlinks=False):
+                                continue
+                            nombre = entrada.name.lower()
+                            info = entrada.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+
+                        for regla, limite in zip(reglas, limites):
+                            if info.st_mtime <= limite and regla['coincide'](nombre):
+                                conteo[regla['nombre']][0] += 1
+                                conteo[regla['nombre']][1] += info.st_size
+                                if simular:
+                                    if len(ejemplos) < 20:
+                                        ejemplos.append(f"  {regla['accion']}: {entrada.path}")
+                                else:
+                                    lote.append((regla, entrada.path))
+                                break
+
+                        if len(lote) >= tamano_lote:
+                            h, o = self._ejecutar_lote_limpieza(lote, carpetas_creadas)
+                            hechos, omitidos = hechos + h, omitidos + o
+                            lote = []
+
+            if lote:
+                h, o = self._ejecutar_lote_limpieza(lote, carpetas_creadas)
+                hechos, omitidos = hechos + h, omitidos + o
 
-                # Solo procesamos archivos, no directorios
-                if os.path.isfile(ruta_archivo_origen):
-                    _, ext = os.path.splitext(nombre_archivo)
-                    ext = ext.lower()
+        except Exception as e:
+            return f"❌ Error durante la limpieza: {e}"
 
-                    # Calculamos a qué carpeta de destino va el archivo
-                    carpeta_destino_nombre = mapa_extensiones.get(ext, otros_dir)
-                    ruta_carpeta_destino = os.path.join(ruta_completa, carpeta_destino_nombre)
+        total = sum(c[0] for c in conteo.values())
+        lineas = [f"  {nombre}: {c[0]} archivos ({formatear_tamano(c[1])})" for nombre, c in conteo.items()]
+        if simular:
+            encabezado = f"ℹ️ Simulación: {total} archivos cumplen alguna regla (no se modificó nada)."
+            return "\n".join([encabezado] + lineas + (["Ejemplos:"] + ejemplos if ejemplos else []))
+        encabezado = f"✅ Limpieza completa: {hechos} archivos procesados, {omitidos} omitidos."
+        return "\n".join([encabezado] + lineas)
 
-                    # Creamos la carpeta si no existe
-                    os.makedirs(ruta_carpeta_destino, exist_ok=True)
+    # --- Metadatos de fotos y videos ---
 
-                    ruta_archivo_destino = os.path.join(ruta_carpeta_destino, nombre_archivo)
+    def _cargar_cache_multimedia(self):
+        """Lee la caché de metadatos desde disco (solo la primera vez)."""
+        if self._cache_multimedia is None:
+            try:
+                with open(self.ruta_cache_multimedia, 'r', encoding='utf-8') as f:
+                    self._cache_multimedia = json.load(f)
+            except (OSError, ValueError):
+                self._cache_multimedia = {}
+        return self._cache_multimedia
+
+    def _guardar_cache_multimedia(self):
+        """Guarda la caché en disco (en un temporal que luego reemplaza al original)."""
+        os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+        temporal = self.ruta_cache_multimedia + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self._cache_multimedia, f)
+        os.replace(temporal, self.ruta_cache_multimedia)
+
+    def obtener_metadatos(self, rutas):
+        """
+        Devuelve {ruta: {'ancho', 'alto', 'fecha'}} para una lista de rutas.
+        Los resultados se guardan por (inodo, mtime): un archivo sin cambios nunca se
+        vuelve a leer. Los que faltan se extraen en paralelo en varios procesos.
+        """
+        cache = self._cargar_cache_multimedia()
+        resultado = {}
+        faltantes = []  # (ruta, clave, mtime_ns)
 
-                    # Si el archivo ya está en la carpeta correcta, lo omitimos
-                    if ruta_archivo_origen == ruta_archivo_destino:
-                        continue
+        for ruta in rutas:
+            try:
+                info = CACHE_METADATOS.stat(ruta)  # Normalmente ya la llenó la búsqueda previa
+            except OSError:
+                continue
+            clave = f"{info.dispositivo}:{info.inodo}"
+            guardado = cache.get(clave)
+            if guardado and guardado[0] == info.mtime_ns:
+                resultado[ruta] = {'ancho': guardado[1], 'alto': guardado[2], 'fecha': guardado[3]}
+            else:
+                faltantes.append((ruta, clave, info.mtime_ns))
+
+        if faltantes:
+            rutas_faltantes = [ruta for ruta, _, _ in faltantes]
+            # Repartimos en grupos para que cada proceso haga bastante trabajo por envío
+            tamano_grupo = 64
+            grupos = [rutas_faltantes[i:i + tamano_grupo] for i in range(0, len(rutas_faltantes), tamano_grupo)]
+            if len(grupos) > 1 and PROCESOS_COMPRESION > 1:
+                from concurrent.futures import ProcessPoolExecutor  # Carga multiprocessing solo si se usa
+                with ProcessPoolExecutor(max_workers=PROCESOS_COMPRESION) as pool:
+                    extraidos = [meta for lote in pool.map(_extraer_metadatos_lote, grupos) for meta in lote]
+            else:
+                extraidos = _extraer_metadatos_lote(rutas_faltantes)
 
-                    # Movemos el archivo
-                    shutil.move(ruta_archivo_origen, ruta_archivo_destino)
+            for (ruta, clave, mtime_ns), meta in zip(faltantes, extraidos):
+                cache[clave] = [mtime_ns, meta['ancho'], meta['alto'], meta['fecha']]
+                resultado[ruta] = meta
+            try:
+                self._guardar_cache_multimedia()
+            except OSError:
+                pass  # Sin caché en disco igual funciona; solo será más lento la próxima vez
 
-                    # Contabilizamos
-                    contador[carpeta_destino_nombre] = contador.get(carpeta_destino_nombre, 0) + 1
+        return resultado
 
-            # Si no se movió ningún archivo
-            if not contador:
-                return f"ℹ️ No se encontraron archivos para organizar en '{ruta_completa}'."
+    def buscar_multimedia(self, ruta_corta, nombre_archivo="", fecha_desde=None, fecha_hasta=None,
+                          ordenar_por=None):
+        """
+        Busca fotos y videos (igual que buscar_archivos) y agrega a cada resultado
+        'ancho', 'alto' y 'fecha' tomados de la caché de metadatos.
+        - fecha_desde / fecha_hasta: textos 'AAAA-MM-DD' (los archivos sin fecha se excluyen)
+        - ordenar_por: 'fecha', 'tamano' o 'dimensiones' (de mayor a menor salvo la fecha)
+        """
+        resultados, mensaje = self.buscar_archivos(ruta_corta, nombre_archivo)
+        if not resultados:
+            return resultados, mensaje
 
-            # Preparamos un resumen del tipo "3 Imagenes, 5 Documentos"
-            resumen = ", ".join([f"{v} {k}" for k, v in contador.items()])
-            return f"✅ Organización completa: {resumen}."
+        resultados = [r for r in resultados if r['extension'].lower() in EXTENSIONES_MULTIMEDIA]
+        metadatos = self.obtener_metadatos([r['ruta'] for r in resultados])
+        for res in resultados:
+            res.update(metadatos.get(res['ruta'], {'ancho': None, 'alto': None, 'fecha': None}))
 
-        except Exception as e:
-            return f"❌ Error durante la organización: {e}"
+        if fecha_desde:
+            resultados = [r for r in resultados if r['fecha'] and r['fecha'][:10] >= fecha_desde]
+        if fecha_hasta:
+            resultados = [r for r in resultados if r['fecha'] and r['fecha'][:10] <= fecha_hasta]
 
-    def buscar_archivos(self, ruta_corta, nombre_archivo=""):
+        if ordenar_por == "fecha":
+            # Las fechas 'AAAA-MM-DD HH:MM:SS' se ordenan bien como texto; sin fecha al final
+            resultados.sort(key=lambda r: (r['fecha'] is None, r['fecha'] or ""))
+        elif ordenar_por == "tamano":
+            resultados.sort(key=lambda r: r['tamano_kb'], reverse=True)
+        elif ordenar_por == "dimensiones":
+            resultados.sort(key=lambda r: (r['ancho'] or 0) * (r['alto'] or 0), reverse=True)
+
+        return resultados, f"✅ Búsqueda finalizada. {len(resultados)} fotos/videos encontrados."
+
+    # --- Búsqueda instantánea ---
+
+    def obtener_tabla_nombres(self, ruta_corta, reconstruir=False, cancelado=None, al_construir=None):
         """
-        Busca recursivamente en la ruta traducida todos los archivos cuyo nombre
-        coincide con un patrón (se puede usar comodines, ejemplo '*.txt').
-        Devuelve una lista de diccionarios con información y un mensaje final.
+        Devuelve la TablaDeNombres de una ruta, construyéndola la primera vez
+        (o si reconstruir=True). al_construir() se llama antes de recorrer el disco.
+        Devuelve None si la ruta no es válida o se canceló.
         """
-        ruta_completa = self.traducir_ruta(ruta_corta)
+        ruta_completa = os.path.normpath(self.traducir_ruta(ruta_corta))
         if not os.path.isdir(ruta_completa):
-            return [], f"❌ Error: La ruta '{ruta_completa}' no es un directorio válido."
+            return None
+        with self._candado_tablas:
+            tabla = self._tablas_nombres.get(ruta_completa)
+            if tabla is None or reconstruir:
+                if al_construir:
+                    al_construir()
+                tabla = TablaDeNombres(ruta_completa)
+                if not tabla.construir(cancelado):
+                    return None
+                self._tablas_nombres[ruta_completa] = tabla
+            return tabla
+
+    # --- Análisis de espacio en disco (estilo "du") ---
+
+    def _escanear_directorio(self, ruta_dir):
+        """
+        Lee el contenido directo de UNA carpeta con os.scandir y devuelve un resumen:
+        (mtime_ns, bytes de archivos, cantidad de archivos, subcarpetas, enlaces duros).
+        Si el mtime de la carpeta no cambió desde el último análisis se reutiliza la caché.
+        Nota: modificar el contenido de un archivo no cambia el mtime de su carpeta,
+        así que ese caso solo se detecta al volver a crear/borrar/renombrar algo en ella.
+        """
+        try:
+            mtime_ns = os.stat(ruta_dir).st_mtime_ns
+        except OSError:
+            return None
 
-        resultados = []  # Lista para guardar la información de cada archivo encontrado
+        en_cache = self._cache_espacio.get(ruta_dir)
+        if en_cache is not None and en_cache[0] == mtime_ns:
+            return en_cache
 
-        # Construimos el patrón para buscar; si no hay nombre, usamos "*"
-        patron_nombre = nombre_archivo.lower() if nombre_archivo else "*"
+        bytes_propios = 0
+        cantidad_archivos = 0
+        subcarpetas = []
+        enlaces = []  # (dispositivo, inodo, tamaño) de archivos con varios enlaces duros
 
         try:
-            # Caminamos por todos los subdirectorios
-            for dirpath, _, filenames in os.walk(ruta_completa):
-                for filename in filenames:
-                    # Filtramos por patrón
-                    if not fnmatch.fnmatch(filename.lower(), patron_nombre):
-                        continue
-
+            with os.scandir(ruta_dir) as entradas:
+                for entrada in entradas:
                     try:
-                        ruta_archivo_completa = os.path.join(dirpath, filename)
-                        _, ext = os.path.splitext(filename)
-                        tamano_bytes = os.path.getsize(ruta_archivo_completa)
-                        tamano_kb = tamano_bytes / 1024
-
-                        resultados.append({
-                            'ruta': ruta_archivo_completa,
-                            'extension': ext if ext else "Sin Extensión",
-                            'tamano_kb': tamano_kb
-                        })
-
+                        # No seguimos enlaces simbólicos para no contar nada dos veces
+                        if entrada.is_dir(follow_symlinks=False):
+                            subcarpetas.append(entrada.path)
+                        elif entrada.is_file(follow_symlinks=False):
+                            info = entrada.stat(follow_symlinks=False)
+                            CACHE_METADATOS.guardar(entrada.path, info)
+                            cantidad_archivos += 1
+                            if info.st_nlink > 1:
+                                # Se suma más tarde, una sola vez por inodo
+                                enlaces.append((info.st_dev, info.st_ino, info.st_size))
+                            else:
+                                bytes_propios += info.st_size
                     except OSError:
-                        # Si falló obtener datos del archivo, lo omitimos
                         continue
+        except OSError:
+            return None
+
+        resumen = (mtime_ns, bytes_propios, cantidad_archivos, tuple(subcarpetas), tuple(enlaces))
+        self._cache_espacio[ruta_dir] = resumen
+        return resumen
+
+    def _recorrer_subarbol(self, ruta_dir):
+        """Recorre un subárbol completo (sin recursión) y devuelve {carpeta: resumen}."""
+        resumenes = {}
+        pendientes = [ruta_dir]
+        while pendientes:
+            actual = pendientes.pop()
+            resumen = self._escanear_directorio(actual)
+            if resumen is None:
+                continue
+            resumenes[actual] = resumen
+            pendientes.extend(resumen[3])
+        return resumenes
+
+    def analizar_espacio(self, ruta_corta):
+        """
+        Calcula cuánto ocupa cada carpeta (sumando todas sus subcarpetas), al estilo "du".
+        - Cada subcarpeta de primer nivel se recorre en un hilo distinto
+        - Los archivos con enlaces duros se cuentan una sola vez (por inodo)
+        - Las carpetas que no cambiaron se leen de la caché en lugar del disco
+        Devuelve (analisis, mensaje). 'analisis' es un diccionario con:
+          'raiz', 'tamanos' {carpeta: bytes}, 'archivos' {carpeta: cantidad} e 'hijos' {carpeta: [subcarpetas]}
+        """
+        ruta_completa = os.path.normpath(self.traducir_ruta(ruta_corta))
+        if not os.path.isdir(ruta_completa):
+            return None, f"❌ Error: La ruta '{ruta_completa}' no es un directorio válido."
 
-            return resultados, f"✅ Búsqueda finalizada. {len(resultados)} archivos encontrados."
+        try:
+            resumen_raiz = self._escanear_directorio(ruta_completa)
+            if resumen_raiz is None:
+                return None, f"❌ Error: No se pudo leer '{ruta_completa}'."
+
+            resumenes = {ruta_completa: resumen_raiz}
+            with ThreadPoolExecutor(max_workers=HILOS_ANALISIS) as pool:
+                for parcial in pool.map(self._recorrer_subarbol, resumen_raiz[3]):
+                    resumenes.update(parcial)
+
+            # Orden "padre antes que hijos"; al recorrerlo al revés cada carpeta
+            # se procesa después de todas sus subcarpetas.
+            orden = []
+            pila = [ruta_completa]
+            while pila:
+                carpeta = pila.pop()
+                orden.append(carpeta)
+                pila.extend(h for h in resumenes[carpeta][3] if h in resumenes)
+
+            inodos_vistos = set()
+            tamanos = {}
+            archivos = {}
+            hijos = {}
+            for carpeta in reversed(orden):
+                _, bytes_propios, cantidad, subcarpetas, enlaces = resumenes[carpeta]
+                total = bytes_propios
+                for dispositivo, inodo, tamano in enlaces:
+                    if (dispositivo, inodo) not in inodos_vistos:
+                        inodos_vistos.add((dispositivo, inodo))
+                        total += tamano
+                hijos[carpeta] = [h for h in subcarpetas if h in tamanos]
+                tamanos[carpeta] = total + sum(tamanos[h] for h in hijos[carpeta])
+                archivos[carpeta] = cantidad + sum(archivos[h] for h in hijos[carpeta])
+
+            # Quitamos de la caché las carpetas que ya no existen dentro de esta ruta
+            prefijo = os.path.join(ruta_completa, "")
+            for carpeta in [c for c in self._cache_espacio if c.startswith(prefijo) and c not in resumenes]:
+                del self._cache_espacio[carpeta]
+
+            analisis = {'raiz': ruta_completa, 'tamanos': tamanos, 'archivos': archivos, 'hijos': hijos}
+            mensaje = (
+                f"✅ Análisis completo: {formatear_tamano(tamanos[ruta_completa])} en "
+                f"{archivos[ruta_completa]} archivos y {len(tamanos)} carpetas."
+            )
+            return analisis, mensaje
 
         except Exception as e:
-            return [], f"❌ Error durante la búsqueda: {e}"
+            return None, f"❌ Error durante el análisis: {e}"
 
 
 # -----------------------------------------------------------------
 # PASO 1.5: Mini-Compilador (Intérprete de Texto)
 # -----------------------------------------------------------------
 
+# Gramática de cada comando: "<x>" es un valor (texto, palabra o $variable),
+# las palabras sueltas son obligatorias y "[...]" es una parte opcional
+# (las opcionales pueden ir en cualquier orden, siempre al final).
+GRAMATICA = {
+    "crear": ('archivo <nombre> en <ruta>', 'crear archivo "nombre.txt" en "descargas/a"'),
+    "mover": ('<nombre> desde <origen> hasta <destino> [conflicto <politica>]',
+              'mover "nombre.txt" desde "descargas" hasta "documentos" [conflicto "renombrar|saltar|sobrescribir|conservar_reciente"]'),
+    "copiar": ('<nombre> desde <origen> hasta <destino> [usando <estrategia>]',
+               'copiar "nombre.txt" desde "descargas" hasta "documentos" [usando "auto|reflink|hardlink|full"]'),
+    "renombrar": ('<nombre> a <nuevo> en <ruta> [conflicto <politica>]',
+                  'renombrar "a.txt" a "b.txt" en "documentos" [conflicto "saltar"]'),
+    "borrar": ('<nombre> en <ruta>', 'borrar "nombre.txt" en "descargas/a"'),
+    "organizar": ('carpeta <ruta> [conflicto <politica>]', 'organizar carpeta "descargas" [conflicto "saltar"]'),
+    "buscar": ('<patron> en <ruta> [desde <desde>] [hasta <hasta>] [ordenar <orden>] [ligero] [exportar <exportacion>]',
+               'buscar "*.jpg" en "imágenes" [desde "2023-01-01"] [hasta "2023-12-31"] [ordenar "fecha"] [ligero] '
+               '[exportar "resultados.csv|.jsonl|.gcol[.gz]"]'),
+    "analizar": ('<ruta>', 'analizar "descargas"'),
+    "deduplicar": ('<ruta> [usando <estrategia>] [simular]', 'deduplicar "descargas" [usando "hardlink|reflink"] [simular]'),
+    "comprimir": ('<ruta> en <archivo>', 'comprimir "descargas/Otros" en "descargas/otros.tar.gz"'),
+    "descomprimir": ('<archivo> en <destino>', 'descomprimir "descargas/otros.zip" en "descargas/otros"'),
+    "limpiar": ('<ruta> segun <reglas> [simular]', 'limpiar "descargas" segun "reglas.toml" [simular]'),
+    "sincronizar": ('<origen> con <destino> [eliminar] [hash]',
+                    'sincronizar "documentos" con "/media/usb/documentos" [eliminar] [hash]'),
+    "estadisticas": ('[vaciar]', 'estadisticas [vaciar]'),
+    "trabajos": ('[limpiar]', 'trabajos [limpiar]'),
+    "reanudar": ('<trabajo>', 'reanudar "20261019-153000-organizar-1a2b"'),
+    "limitar": ('[mb <mb>] [archivos <archivos>] [nice <nice>] [prioridad <prioridad>] [fijo] [quitar]',
+                'limitar [mb "20"] [archivos "200"] [nice "10"] [prioridad "normal|baja|minima"] [fijo] [quitar]'),
+}
+
+# Se suma a la clave de la caché de scripts: si cambia la gramática, los
+# programas compilados guardados en disco dejan de usarse.
+VERSION_COMPILADOR = "3"
+
+# Variables que 'para cada' define en cada vuelta (solo existen dentro del bucle)
+VARIABLES_BUCLE = ("ruta", "carpeta", "archivo")
+
+# Analizador léxico: UNA sola expresión regular recorre todo el script de una pasada.
+_PATRON_LEXICO = re.compile(r'''
+    (?P<espacio>[ \t\r]+)
+  | (?P<comentario>\#[^\n]*)
+  | (?P<fin>[\n;])
+  | (?P<cadena>"[^"\n]*")
+  | (?P<abierta>"[^\n]*)
+  | (?P<variable>\$[^\W\d]\w*)
+  | (?P<dos_puntos>:(?=\s|\#|$))
+  | (?P<igual>=)
+  | (?P<palabra>[^\s"\#;=$](?:[^\s";:]|:(?=[^\s\#]))*)
+  | (?P<error>.)
+''', re.VERBOSE)
+
+# Variables dentro de una cadena: "documentos/${anio}"
+_PATRON_INTERPOLACION = re.compile(r'\$\{([^\W\d]\w*)\}')
+
+
+def _sin_acentos(texto):
+    """Pasa a minúsculas y quita tildes, para que 'Según' y 'segun' sean la misma palabra."""
+    return unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+def _compilar_gramatica(especificacion):
+    """
+    Convierte el texto de GRAMATICA en (obligatorios, opcionales):
+      obligatorios = [('palabra', 'en'), ('valor', 'ruta'), ...]
+      opcionales   = {'desde': ['desde', 'nombre_valor'] o ['simular']}
+    """
+    obligatorios, opcionales = [], {}
+    for grupo in re.findall(r'\[[^\]]*\]|\S+', especificacion):
+        if grupo.startswith("["):
+            partes = grupo[1:-1].split()
+            opcionales[partes[0]] = [partes[0]] + [p[1:-1] for p in partes[1:]]
+        elif grupo.startswith("<"):
+            obligatorios.append(('valor', grupo[1:-1]))
+        else:
+            obligatorios.append(('palabra', grupo))
+    return obligatorios, opcionales
+
+
+GRAMATICA_COMPILADA = {nombre: _compilar_gramatica(espec) for nombre, (espec, _) in GRAMATICA.items()}
+
+
+class ErrorDeSintaxis(Exception):
+    """Error al compilar un script; guarda la línea y la columna donde ocurrió."""
+
+    def __init__(self, mensaje, linea, columna):
+        super().__init__(mensaje)
+        self.linea = linea
+        self.columna = columna
+
+    def __str__(self):
+        return f"❌ Error de sintaxis (línea {self.linea}, columna {self.columna}): {self.args[0]}"
+
+
 class MiniCompilador:
     """
-    Interpreta líneas de texto como comandos ("crear", "mover", etc.)
-    y llama a los métodos del GestorDeArchivos.
+    Interpreta scripts de texto con comandos ("crear", "mover", etc.) y llama a los
+    métodos del GestorDeArchivos. El script se compila en dos pasos:
+      1. tokenizar(): analizador léxico de una sola pasada (con posiciones de cada token)
+      2. compilar(): analizador sintáctico que produce una lista de instrucciones
+    Las instrucciones son tuplas:
+      ('cmd', nombre, {argumento: valor}, linea)
+      ('asignar', variable, valor, linea)
+      ('para', patron, ruta, (instrucciones del cuerpo...), linea)
+    y cada valor es ('lit', texto), ('var', nombre) o ('plantilla', (partes...)).
+    Los programas compilados se guardan en caché según el hash del texto.
     """
 
     def __init__(self, gestor):
@@ -287,28 +3173,54 @@ class MiniCompilador:
             "borrar": self.cmd_borrar,
             "organizar": self.cmd_organizar,
             "buscar": self.cmd_buscar,
+            "analizar": self.cmd_analizar,
+            "comprimir": self.cmd_comprimir,
+            "descomprimir": self.cmd_descomprimir,
+            "limpiar": self.cmd_limpiar,
+            "sincronizar": self.cmd_sincronizar,
+            "deduplicar": self.cmd_deduplicar,
+            "estadisticas": self.cmd_estadisticas,
+            "trabajos": self.cmd_trabajos,
+            "reanudar": self.cmd_reanudar,
+            "limitar": self.cmd_limitar,
         }
+        # Variables del usuario ($nombre = "valor"); se conservan entre ejecuciones
+        self.variables = {}
+        # Caché en memoria: hash del script → programa compilado
+        self._programas = OrderedDict()
+        self.directorio_scripts = os.path.join(DIRECTORIO_DATOS, "scripts")
 
     def ejecutar(self, codigo):
         """
-        Toma una línea de texto (comando), la tokeniza y ejecuta el método correspondiente.
-        Devuelve el resultado como texto.
+        Compila el texto (una línea o un script completo) y lo ejecuta.
+        Devuelve el resultado de todas las instrucciones como texto.
         """
-        tokens = self.tokenizar(codigo)
-        if not tokens:
+        try:
+            programa = self.compilar(codigo)
+        except ErrorDeSintaxis as e:
+            return str(e)
+        if not programa:
             return "❌ No se detectaron comandos válidos."
+        return "\n".join(self.ejecutar_programa(programa))
 
-        comando_raw = tokens[0]
-        comando = comando_raw.lower()
+    def ejecutar_archivo(self, ruta_script):
+        """
+        Ejecuta un script guardado en un archivo (ej: tareas programadas con cron).
+        El programa compilado también se guarda en disco, así las siguientes
+        ejecuciones del mismo script no vuelven a analizar el texto.
+        """
+        try:
+            with open(self.gestor.traducir_ruta(ruta_script), 'r', encoding='utf-8') as f:
+                codigo = f.read()
+        except OSError as e:
+            return f"❌ Error al leer el script: {e}"
+        try:
+            programa = self.compilar(codigo, usar_disco=True)
+        except ErrorDeSintaxis as e:
+            return str(e)
+        return "\n".join(self.ejecutar_programa(programa))
 
-        if comando in self.comandos:
-            try:
-                # Llamamos al comando correspondiente, pasándole los tokens
-                return self.comandos[comando](tokens)
-            except Exception as e:
-                return f"❌ Error ejecutando '{comando}': {e}"
-        else:
-            return f"❌ Comando desconocido: {comando}"
+    # === Análisis léxico ===
 
     def tokenizar(self, linea):
         """
@@ -317,82 +3229,805 @@ class MiniCompilador:
           linea = 'crear archivo "mi archivo.txt" en "descargas"'
           tokens = ['crear', 'archivo', 'mi archivo.txt', 'en', 'descargas']
         """
-        patron = r'\"[^\"]+\"|\S+'  # Coincide con "texto con espacios" o con palabras simples
-        tokens = re.findall(patron, linea)
-        # Removemos las comillas de los tokens que tenían
-        tokens = [t.strip('"') for t in tokens]
+        return [token[1] for token in self.analizar_lexico(linea) if token[0] != 'fin']
+
+    def analizar_lexico(self, codigo):
+        """
+        Recorre el texto UNA vez y devuelve tokens (tipo, valor, linea, columna).
+        Tipos: 'palabra', 'cadena', 'variable', 'dos_puntos', 'igual' y 'fin' (fin de instrucción).
+        Dentro de las cadenas la barra invertida es un carácter más (rutas de Windows como
+        "C:\\temp\\" o "\\\\servidor\\carpeta"); "" es una cadena vacía.
+        """
+        tokens = []
+        linea = 1
+        inicio_linea = 0
+        for m in _PATRON_LEXICO.finditer(codigo):
+            tipo = m.lastgroup
+            if tipo in ('espacio', 'comentario'):
+                continue
+            columna = m.start() - inicio_linea + 1
+            texto = m.group()
+            if tipo == 'fin':
+                tokens.append(('fin', texto, linea, columna))
+                if texto == "\n":
+                    linea += 1
+                    inicio_linea = m.end()
+            elif tipo == 'cadena':
+                tokens.append(('cadena', texto[1:-1], linea, columna))
+            elif tipo == 'variable':
+                tokens.append(('variable', texto[1:], linea, columna))
+            elif tipo == 'abierta':
+                raise ErrorDeSintaxis("cadena sin cerrar (falta la comilla final)", linea, columna)
+            elif tipo == 'error':
+                raise ErrorDeSintaxis(f"carácter inesperado '{texto}'", linea, columna)
+            else:
+                tokens.append((tipo, texto, linea, columna))
+        tokens.append(('fin', '', linea, len(codigo) - inicio_linea + 1))
         return tokens
 
+    # === Análisis sintáctico ===
+
+    def compilar(self, codigo, usar_disco=False):
+        """
+        Devuelve el programa (tupla de instrucciones) de un script.
+        Busca primero en la caché por hash del contenido; con usar_disco=True
+        también la guarda/lee en ~/.gestor_archivos/scripts.
+        """
+        clave = hashlib.sha256((VERSION_COMPILADOR + "\0" + codigo).encode('utf-8')).hexdigest()
+        if clave in self._programas:
+            self._programas.move_to_end(clave)
+            return self._programas[clave]
+
+        ruta_cache = os.path.join(self.directorio_scripts, clave + ".bin")
+        programa = None
+        if usar_disco:
+            import marshal  # Caché de scripts en disco (solo con usar_disco)
+            try:
+                with open(ruta_cache, 'rb') as f:
+                    programa = marshal.loads(f.read())  # load(f) lee de a pocos bytes: mucho más lento
+            except (OSError, EOFError, ValueError, TypeError):
+                programa = None
+
+        if programa is None:
+            programa = self._analizar_programa(self.analizar_lexico(codigo))
+            if usar_disco:
+                try:
+                    os.makedirs(self.directorio_scripts, exist_ok=True)
+                    with open(ruta_cache, 'wb') as f:
+                        f.write(marshal.dumps(programa))
+                except OSError:
+                    pass  # Sin caché en disco el script igual se ejecuta
+
+        self._programas[clave] = programa
+        if len(self._programas) > 256:
+            self._programas.popitem(last=False)
+        return programa
+
+    def _analizar_programa(self, tokens):
+        """Convierte la lista de tokens en la tupla de instrucciones del programa."""
+        self._tokens = tokens
+        self._pos = 0
+        instrucciones = self._analizar_bloque(dentro_de_bucle=False)
+        return tuple(instrucciones)
+
+    def _actual(self):
+        return self._tokens[self._pos]
+
+    def _avanzar(self):
+        token = self._tokens[self._pos]
+        if self._pos < len(self._tokens) - 1:
+            self._pos += 1
+        return token
+
+    def _es_palabra(self, token, palabra):
+        return token[0] == 'palabra' and _sin_acentos(token[1]) == palabra
+
+    def _error(self, mensaje, token=None):
+        token = token or self._actual()
+        return ErrorDeSintaxis(mensaje, token[2], token[3])
+
+    def _analizar_bloque(self, dentro_de_bucle):
+        """Lee instrucciones hasta el final del texto o, dentro de un bucle, hasta 'fin'."""
+        instrucciones = []
+        while True:
+            token = self._actual()
+            if token[0] == 'fin':
+                if token[1] == '':
+                    if dentro_de_bucle:
+                        raise self._error("falta 'fin' para cerrar el bucle 'para cada'")
+                    return instrucciones
+                self._avanzar()
+                continue
+            if dentro_de_bucle and self._es_palabra(token, "fin"):
+                self._avanzar()
+                self._esperar_fin_instruccion()
+                return instrucciones
+            instrucciones.append(self._analizar_instruccion())
+            self._esperar_fin_instruccion()
+
+    def _esperar_fin_instruccion(self):
+        token = self._actual()
+        if token[0] != 'fin':
+            raise self._error(f"se esperaba el fin de la instrucción y se encontró '{token[1]}'")
+
+    def _analizar_valor(self, descripcion):
+        """Lee un valor: cadena, palabra suelta o $variable."""
+        token = self._actual()
+        if token[0] == 'variable':
+            self._avanzar()
+            return ('var', token[1])
+        if token[0] == 'palabra':
+            self._avanzar()
+            return ('lit', token[1])
+        if token[0] == 'cadena':
+            self._avanzar()
+            if "${" not in token[1]:
+                return ('lit', token[1])
+            partes = []
+            for i, parte in enumerate(_PATRON_INTERPOLACION.split(token[1])):
+                if parte:
+                    partes.append(('var', parte) if i % 2 else ('lit', parte))
+            return ('plantilla', tuple(partes))
+        raise self._error(f"falta {descripcion}")
+
+    def _analizar_instruccion(self):
+        token = self._actual()
+
+        # $variable = valor
+        if token[0] == 'variable':
+            self._avanzar()
+            if self._actual()[0] != 'igual':
+                raise self._error(f"se esperaba '=' después de ${token[1]}")
+            self._avanzar()
+            return ('asignar', token[1], self._analizar_valor("el valor a asignar"), token[2])
+
+        if token[0] != 'palabra':
+            raise self._error(f"se esperaba un comando y se encontró '{token[1]}'")
+
+        # para cada "patron" en "ruta": instrucción   (o un bloque de líneas terminado en 'fin')
+        if self._es_palabra(token, "para"):
+            self._avanzar()
+            if not self._es_palabra(self._actual(), "cada"):
+                raise self._error("se esperaba 'cada' después de 'para'")
+            self._avanzar()
+            patron = self._analizar_valor("el patrón de archivos")
+            if not self._es_palabra(self._actual(), "en"):
+                raise self._error("se esperaba 'en' después del patrón")
+            self._avanzar()
+            ruta = self._analizar_valor("la ruta del bucle")
+            if self._actual()[0] != 'dos_puntos':
+                raise self._error("se esperaba ':' al final de 'para cada'")
+            self._avanzar()
+            if self._actual()[0] == 'fin':
+                cuerpo = self._analizar_bloque(dentro_de_bucle=True)
+            else:
+                cuerpo = [self._analizar_instruccion()]
+            return ('para', patron, ruta, tuple(cuerpo), token[2])
+
+        comando = token[1].lower()
+        if comando not in GRAMATICA_COMPILADA:
+            raise self._error(f"comando desconocido: {comando}")
+        self._avanzar()
+        obligatorios, opcionales = GRAMATICA_COMPILADA[comando]
+        uso = GRAMATICA[comando][1]
+
+        argumentos = {}
+        for tipo, nombre in obligatorios:
+            if tipo == 'palabra':
+                if not self._es_palabra(self._actual(), nombre):
+                    raise self._error(f"se esperaba '{nombre}'. Uso: {uso}")
+                self._avanzar()
+            else:
+                argumentos[nombre] = self._analizar_valor(f"<{nombre}>. Uso: {uso}")
+
+        # Partes opcionales, en cualquier orden
+        while self._actual()[0] == 'palabra':
+            clave = _sin_acentos(self._actual()[1])
+            if clave not in opcionales or clave in argumentos:
+                raise self._error(f"opción inesperada '{self._actual()[1]}'. Uso: {uso}")
+            self._avanzar()
+            valores = opcionales[clave][1:]
+            if not valores:
+                argumentos[clave] = ('lit', True)  # Opción sin valor (ej: simular)
+            for nombre in valores:
+                argumentos[nombre] = self._analizar_valor(f"<{nombre}>. Uso: {uso}")
+
+        return ('cmd', comando, argumentos, token[2])
+
+    # === Ejecución ===
+
+    def _evaluar(self, valor, variables):
+        """Devuelve el texto de un valor compilado, reemplazando variables."""
+        tipo, contenido = valor
+        if tipo == 'lit':
+            return contenido
+        if tipo == 'var':
+            if contenido not in variables:
+                raise NameError(f"variable no definida: ${contenido}")
+            return variables[contenido]
+        return "".join(self._evaluar(parte, variables) for parte in contenido)
+
+    def ejecutar_programa(self, programa, variables=None):
+        """
+        Ejecuta una tupla de instrucciones y devuelve la lista de resultados (textos).
+        Un error en una instrucción se informa y se sigue con la siguiente.
+        """
+        variables = self.variables if variables is None else variables
+        salida = []
+        for instruccion in programa:
+            tipo, linea = instruccion[0], instruccion[-1]
+            try:
+                if tipo == 'asignar':
+                    variables[instruccion[1]] = self._evaluar(instruccion[2], variables)
+                elif tipo == 'para':
+                    patron = self._evaluar(instruccion[1], variables)
+                    ruta = self._evaluar(instruccion[2], variables)
+                    # La lista se obtiene ANTES de ejecutar el cuerpo, que puede mover archivos
+                    resultados, mensaje = self.gestor.buscar_archivos(ruta, patron)
+                    if not resultados:
+                        salida.append(f"{mensaje} (línea {linea})")
+                    # $ruta, $carpeta y $archivo son del bucle: al terminar vuelven a su valor
+                    # anterior (o dejan de existir) para no quedar en las variables de la sesión
+                    anteriores = {nombre: variables[nombre] for nombre in VARIABLES_BUCLE if nombre in variables}
+                    try:
+                        for res in resultados:
+                            variables['ruta'] = res['ruta']
+                            variables['carpeta'], variables['archivo'] = os.path.split(res['ruta'])
+                            salida.extend(self.ejecutar_programa(instruccion[3], variables))
+                    finally:
+                        for nombre in VARIABLES_BUCLE:
+                            variables.pop(nombre, None)
+                        variables.update(anteriores)
+                else:
+                    argumentos = {nombre: self._evaluar(valor, variables) for nombre, valor in instruccion[2].items()}
+                    salida.append(self.comandos[instruccion[1]](argumentos))
+            except Exception as e:
+                nombre = instruccion[1] if tipo == 'cmd' else tipo
+                salida.append(f"❌ Error ejecutando '{nombre}' (línea {linea}): {e}")
+        return salida
+
     # === Métodos que implementan cada comando específico ===
+    # Cada uno recibe los argumentos ya validados por la gramática.
 
-    def cmd_crear(self, tokens):
-        # Uso esperado: crear archivo "nombre.txt" en "ruta"
-        if len(tokens) < 5 or tokens[1].lower() != "archivo":
-            return '❌ Uso: crear archivo "nombre.txt" en "descargas/a"'
-        nombre = tokens[2]
-        ruta = tokens[4]
-        return self.gestor.crear_archivo(nombre, ruta)
-
-    def cmd_mover(self, tokens):
-        # Uso: mover "nombre" desde "ruta_origen" hasta "ruta_destino"
-        if len(tokens) < 6:
-            return '❌ Uso: mover "nombre.txt" desde "descargas" hasta "documentos"'
-        nombre_origen = tokens[1]
-        ruta_origen = tokens[3]
-        ruta_destino = tokens[5]
+    def cmd_crear(self, args):
+        # crear archivo "nombre.txt" en "ruta"
+        return self.gestor.crear_archivo(args['nombre'], args['ruta'])
+
+    def cmd_mover(self, args):
+        # mover "nombre" desde "ruta_origen" hasta "ruta_destino"
         # Asumimos que el nombre no cambia cuando movemos
-        return self.gestor.mover_archivo(nombre_origen, ruta_origen, nombre_origen, ruta_destino)
-
-    def cmd_copiar(self, tokens):
-        # Uso: copiar "nombre" desde "ruta_origen" hasta "ruta_destino"
-        if len(tokens) < 6:
-            return '❌ Uso: copiar "nombre.txt" desde "descargas" hasta "documentos"'
-        nombre_origen = tokens[1]
-        ruta_origen = tokens[3]
-        ruta_destino = tokens[5]
+        return self.gestor.mover_archivo(
+            args['nombre'], args['origen'], args['nombre'], args['destino'],
+            politica=args.get('politica', "renombrar").lower()
+        )
+
+    def cmd_copiar(self, args):
+        # copiar "nombre" desde "ruta_origen" hasta "ruta_destino"
         # Asumimos que el nombre se conserva al copiar
-        return self.gestor.copiar_archivo(nombre_origen, ruta_origen, nombre_origen, ruta_destino)
-
-    def cmd_renombrar(self, tokens):
-        # Uso: renombrar "archivo_original" a "archivo_nuevo" en "ruta"
-        if len(tokens) < 6:
-            return '❌ Uso: renombrar "a.txt" a "b.txt" en "documentos"'
-        nombre_original = tokens[1]
-        nombre_nuevo = tokens[3]
-        ruta = tokens[5]
-        return self.gestor.renombrar_archivo(nombre_original, ruta, nombre_nuevo)
-
-    def cmd_borrar(self, tokens):
-        # Uso: borrar "nombre" en "ruta"
-        if len(tokens) < 4:
-            return '❌ Uso: borrar "nombre.txt" en "descargas/a"'
-        nombre = tokens[1]
-        ruta = tokens[3]
-        return self.gestor.borrar_archivo(nombre, ruta)
-
-    def cmd_organizar(self, tokens):
-        # Uso: organizar carpeta "ruta"
-        if len(tokens) < 3 or tokens[1].lower() != "carpeta":
-            return '❌ Uso: organizar carpeta "descargas"'
-        ruta = tokens[2]
-        return self.gestor.organizar_carpeta_por_tipo(ruta)
-
-    def cmd_buscar(self, tokens):
-        # Uso: buscar "palabra" en "ruta"
-        if len(tokens) < 4:
-            return '❌ Uso: buscar "palabra" en "descargas/a"'
-        palabra_clave = tokens[1]
-        ruta = tokens[3]
-
-        resultados, mensaje = self.gestor.buscar_archivos(ruta, palabra_clave)
+        if any(c in args['nombre'] for c in "*?["):
+            # Con comodines es una copia masiva: se ejecuta como trabajo reanudable
+            return self.gestor.copiar_lote(
+                args['nombre'], args['origen'], args['destino'], estrategia=args.get('estrategia', "auto").lower()
+            )
+        return self.gestor.copiar_archivo(
+            args['nombre'], args['origen'], args['nombre'], args['destino'],
+            estrategia=args.get('estrategia', "auto").lower()
+        )
+
+    def cmd_renombrar(self, args):
+        # renombrar "archivo_original" a "archivo_nuevo" en "ruta"
+        return self.gestor.renombrar_archivo(
+            args['nombre'], args['ruta'], args['nuevo'], politica=args.get('politica', "renombrar").lower()
+        )
+
+    def cmd_borrar(self, args):
+        # borrar "nombre" en "ruta"
+        return self.gestor.borrar_archivo(args['nombre'], args['ruta'])
+
+    def cmd_organizar(self, args):
+        # organizar carpeta "ruta"
+        return self.gestor.organizar_carpeta_por_tipo(args['ruta'], politica=args.get('politica', "renombrar").lower())
+
+    def cmd_buscar(self, args):
+        # buscar "palabra" en "ruta" [desde "AAAA-MM-DD"] [hasta "AAAA-MM-DD"] [ordenar "fecha"] [exportar "archivo"]
+        # Las opciones extra activan la búsqueda de fotos/videos con metadatos
+        if 'desde' in args or 'hasta' in args or 'orden' in args:
+            resultados, mensaje = self.gestor.buscar_multimedia(
+                args['ruta'], args['patron'],
+                fecha_desde=args.get('desde'),
+                fecha_hasta=args.get('hasta'),
+                ordenar_por=args.get('orden', "").lower() or None
+            )
+            if 'exportacion' in args and resultados:
+                return self.gestor.exportar_resultados(resultados, args['exportacion'], ("ancho", "alto", "fecha"))
+        elif 'exportacion' in args:
+            # Los resultados van directo al archivo, sin juntarlos en memoria
+            return self.gestor.exportar_busqueda(args['ruta'], args['patron'], args['exportacion'])
+        else:
+            resultados, mensaje = self.gestor.buscar_archivos(args['ruta'], args['patron'], bajo_consumo='ligero' in args)
         if not resultados:
             return mensaje
 
         # Formatear los resultados para mostrarlos como texto
-        texto_resultados = [
-            f"Ruta: {res['ruta']} ({res['tamano_kb']:.2f} KB)" for res in resultados
-        ]
-        return f"✅ {mensaje}\n" + "\n".join(texto_resultados)
+        texto_resultados = []
+        if 'ligero' in args and len(resultados) > MAX_LINEAS_LIGERO:
+            # En modo ligero no se arma un texto gigante: solo las primeras líneas
+            mensaje += f" (se muestran los primeros {MAX_LINEAS_LIGERO})"
+            resultados = islice(resultados, MAX_LINEAS_LIGERO)
+        for res in resultados:
+            linea = f"Ruta: {res['ruta']} ({res['tamano_kb']:.2f} KB)"
+            if res.get('ancho'):
+                linea += f" {res['ancho']}x{res['alto']}"
+            if res.get('fecha'):
+                linea += f" {res['fecha']}"
+            texto_resultados.append(linea)
+        return f"{mensaje}\n" + "\n".join(texto_resultados)
+
+    def cmd_comprimir(self, args):
+        # comprimir "carpeta_o_archivo" en "destino.zip|destino.tar.gz"
+        return self.gestor.comprimir(args['ruta'], args['archivo'])
+
+    def cmd_descomprimir(self, args):
+        # descomprimir "archivo.zip" en "carpeta_destino"
+        return self.gestor.descomprimir(args['archivo'], args['destino'])
+
+    def cmd_limpiar(self, args):
+        # limpiar "ruta" segun "reglas.toml" [simular]
+        return self.gestor.limpiar_segun_reglas(args['ruta'], args['reglas'], simular='simular' in args)
+
+    def cmd_sincronizar(self, args):
+        # sincronizar "origen" con "destino" [eliminar] [hash]
+        return self.gestor.sincronizar_carpetas(
+            args['origen'], args['destino'],
+            eliminar_sobrantes='eliminar' in args,
+            comparar_hash='hash' in args
+        )
+
+    def cmd_deduplicar(self, args):
+        # deduplicar "ruta" [usando "hardlink|reflink"] [simular]
+        return self.gestor.deduplicar(
+            args['ruta'], estrategia=args.get('estrategia', "hardlink").lower(), simular='simular' in args
+        )
+
+    def cmd_estadisticas(self, args):
+        # estadisticas [vaciar]  → aciertos de la caché de metadatos compartida
+        mensaje = CACHE_METADATOS.estadisticas()
+        if 'vaciar' in args:
+            CACHE_METADATOS.vaciar()
+            mensaje += " Caché vaciada."
+        return mensaje
+
+    def cmd_trabajos(self, args):
+        # trabajos [limpiar]  → estado de los trabajos reanudables guardados
+        if 'limpiar' in args:
+            return self.gestor.borrar_trabajos_terminados()
+        trabajos, mensaje = self.gestor.listar_trabajos()
+        return "\n".join([mensaje] + [t.describir() for t in trabajos])
+
+    def cmd_reanudar(self, args):
+        # reanudar "id"  → sigue un trabajo desde su último punto de control
+        return self.gestor.reanudar_trabajo(args['trabajo'])
+
+    def cmd_limitar(self, args):
+        # limitar [mb "20"] [archivos "200"] [nice "10"] [prioridad "baja"] [fijo] [quitar]
+        # Sin opciones muestra los límites actuales y el rendimiento medido
+        if 'quitar' in args:
+            return self.gestor.configurar_limites(adaptativo=False)
+        opciones = {'mb', 'archivos', 'nice', 'prioridad', 'fijo'} & set(args)
+        if not opciones:
+            return self.gestor.limitador.estadisticas()
+        return self.gestor.configurar_limites(
+            mb_por_segundo=float(args['mb']) if 'mb' in args else None,
+            archivos_por_segundo=float(args['archivos']) if 'archivos' in args else None,
+            nice=int(args['nice']) if 'nice' in args else None,
+            prioridad_es=args['prioridad'].lower() if 'prioridad' in args else None,
+            adaptativo='fijo' not in args
+        )
+
+    def cmd_analizar(self, args):
+        # analizar "ruta"  → muestra las 10 carpetas que más ocupan
+        analisis, mensaje = self.gestor.analizar_espacio(args['ruta'])
+        if not analisis:
+            return mensaje
+
+        tamanos = analisis['tamanos']
+        mayores = sorted(tamanos, key=tamanos.get, reverse=True)[:10]
+        texto_resultados = [f"{formatear_tamano(tamanos[c]):>12}  {c}" for c in mayores]
+        return f"{mensaje}\n" + "\n".join(texto_resultados)
+
+
+# -----------------------------------------------------------------
+# PASO 1.6: Servicio local HTTP/JSON (sin ventana)
+# -----------------------------------------------------------------
+
+# Operaciones del gestor que se pueden pedir por POST /operacion/<nombre>.
+# Solo estas: el resto de los métodos no se exponen.
+OPERACIONES_SERVICIO = {
+    "crear": "crear_archivo",
+    "mover": "mover_archivo",
+    "copiar": "copiar_archivo",
+    "copiar_lote": "copiar_lote",
+    "renombrar": "renombrar_archivo",
+    "borrar": "borrar_archivo",
+    "crear_carpeta": "crear_carpeta",
+    "borrar_carpeta": "borrar_carpeta",
+    "organizar": "organizar_carpeta_por_tipo",
+    "sincronizar": "sincronizar_carpetas",
+    "comprimir": "comprimir",
+    "descomprimir": "descomprimir",
+    "deduplicar": "deduplicar",
+    "limpiar": "limpiar_segun_reglas",
+    "reanudar": "reanudar_trabajo",
+    "limitar": "configurar_limites",
+}
+
+
+class CacheBusquedas:
+    """
+    Resultados de búsquedas recientes compartidos por todas las peticiones del servicio
+    (LRU con caducidad): repetir la misma búsqueda se responde desde memoria.
+    Cualquier operación que modifica archivos la vacía.
+    """
+
+    def __init__(self, maximo=CACHE_SERVICIO_ENTRADAS, caducidad=CACHE_SERVICIO_SEGUNDOS):
+        self.maximo = maximo
+        self.caducidad = caducidad
+        self._entradas = OrderedDict()  # clave -> (momento, resultados)
+        self._candado = threading.Lock()
+        self.aciertos = self.fallos = 0
+
+    def obtener(self, clave):
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None or time.monotonic() - entrada[0] > self.caducidad:
+                self._entradas.pop(clave, None)
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, resultados):
+        with self._candado:
+            self._entradas[clave] = (time.monotonic(), resultados)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+
+    def vaciar(self):
+        with self._candado:
+            self._entradas.clear()
+
+
+class ManejadorJSON:
+    """
+    Atiende una petición del servicio (se combina con http.server.BaseHTTPRequestHandler
+    en clases_servicio, para no importar http.server al abrir la ventana). Rutas:
+      GET  /estado                 → atajos, hilos y uso de la caché
+      POST /buscar                 → {"ruta", "patron", "instantanea"?}; respuesta NDJSON por partes
+      POST /comando                → {"codigo"}: ejecuta texto del MiniCompilador
+      POST /operacion/<nombre>     → argumentos del método del gestor (ver OPERACIONES_SERVICIO)
+    Toda petición necesita "Authorization: Bearer <token>" y un Host local, y los POST
+    un cuerpo "Content-Type: application/json" (ver _autorizada y _leer_json).
+    """
+
+    server_version = "GestorArchivos/1.0"
+
+    def address_string(self):
+        # En un socket Unix el cliente no tiene dirección IP
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, formato, *args):
+        if self.server.registrar:
+            sys.stderr.write(f"{self.address_string()} - {formato % args}\n")
+
+    def _responder(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _autorizada(self):
+        """
+        Solo se atiende a quien tiene el token del servicio (lo puede leer únicamente el
+        usuario que lo inició) y con un Host local: así una página web abierta en el
+        navegador no puede usar el servicio (ni directo ni con DNS rebinding).
+        Si no, responde 401/403 y devuelve False.
+        """
+        host = (self.headers.get("Host") or "").strip().lower()
+        if host.startswith("["):
+            host = host[:host.find("]") + 1]
+        else:
+            host = host.split(":")[0]
+        if host not in HOSTS_SERVICIO:
+            self._descartar_cuerpo()
+            self._responder(403, {"ok": False, "mensaje": "❌ Host no permitido."})
+            return False
+        esperado = "Bearer " + self.server.token
+        if not hmac.compare_digest(self.headers.get("Authorization", "").encode(), esperado.encode()):
+            self._descartar_cuerpo()
+            self._responder(401, {"ok": False, "mensaje": "❌ Falta el token del servicio (Authorization: Bearer ...)."})
+            return False
+        return True
+
+    def _descartar_cuerpo(self):
+        # Cerrar sin leer el cuerpo haría que el cliente reciba "connection reset" en vez de la respuesta
+        largo = int(self.headers.get("Content-Length") or 0)
+        if 0 < largo <= MAX_CUERPO_SERVICIO:
+            self.rfile.read(largo)
+
+    def _leer_json(self):
+        # Exigir application/json obliga al navegador a preguntar antes (CORS) y el
+        # servicio nunca responde que sí: un formulario o fetch "simple" no llega a ejecutarse
+        tipo = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if tipo != "application/json":
+            raise ValueError("el Content-Type debe ser application/json")
+        largo = int(self.headers.get("Content-Length") or 0)
+        if largo > MAX_CUERPO_SERVICIO:
+            raise ValueError("el cuerpo de la petición es demasiado grande")
+        datos = json.loads(self.rfile.read(largo)) if largo else {}
+        if not isinstance(datos, dict):
+            raise ValueError("se esperaba un objeto JSON")
+        return datos
+
+    def do_GET(self):
+        if not self._autorizada():
+            return
+        if self.path.split("?")[0].rstrip("/") == "/estado":
+            self._responder(200, self.server.estado())
+        else:
+            self._responder(404, {"ok": False, "mensaje": "❌ Ruta desconocida."})
+
+    def do_POST(self):
+        if not self._autorizada():
+            return
+        ruta = self.path.split("?")[0].rstrip("/")
+        try:
+            datos = self._leer_json()
+        except ValueError as e:
+            self._responder(400, {"ok": False, "mensaje": f"❌ JSON inválido: {e}"})
+            return
+
+        try:
+            if ruta == "/buscar":
+                self._buscar(datos)
+            elif ruta == "/comando":
+                resultado = self.server.ejecutar_comando(str(datos["codigo"]))
+                self._responder(200, {"ok": "❌" not in resultado, "mensaje": resultado})
+            elif ruta.startswith("/operacion/") and ruta[len("/operacion/"):] in OPERACIONES_SERVICIO:
+                metodo = getattr(self.server.gestor, OPERACIONES_SERVICIO[ruta[len("/operacion/"):]])
+                resultado = metodo(**datos)
+                self.server.cache.vaciar()  # Los archivos cambiaron: las búsquedas guardadas ya no sirven
+                self._responder(200, {"ok": not resultado.startswith("❌"), "mensaje": resultado})
+            else:
+                self._responder(404, {"ok": False, "mensaje": "❌ Ruta desconocida."})
+        except (KeyError, TypeError, ValueError) as e:
+            self._responder(400, {"ok": False, "mensaje": f"❌ Parámetros inválidos: {e}"})
+
+    def _buscar(self, datos):
+        """Envía un resultado por línea (NDJSON) a medida que aparecen; la última línea es el resumen."""
+        gestor = self.server.gestor
+        ruta, patron = str(datos["ruta"]), str(datos.get("patron", ""))
+
+        if datos.get("instantanea"):
+            # Búsqueda difusa sobre la tabla de nombres compartida (se construye una vez por ruta)
+            tabla = gestor.obtener_tabla_nombres(ruta)
+            if tabla is None:
+                self._responder(400, {"ok": False, "mensaje": f"❌ Error: La ruta '{ruta}' no es un directorio válido."})
+                return
+            with self.server.candado_tablas:
+                encontrados = [{"ruta": r, "puntaje": p} for p, r in tabla.buscar(patron.lower(), limite=int(datos.get("limite", 200)))]
+            self._enviar_lineas(encontrados, "en memoria")
+            return
+
+        clave = (ruta, patron)
+        guardados = self.server.cache.obtener(clave)
+        if guardados is not None:
+            # Se guardaron ya convertidos a texto: se envían tal cual
+            total, texto = guardados
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(texto + (json.dumps({"fin": True, "total": total, "origen": "caché"}) + "\n").encode("utf-8"))
+            return
+
+        raices = gestor.resolver_raices(ruta)
+        if not raices or (len(raices) == 1 and not os.path.isdir(raices[0])):
+            self._responder(400, {"ok": False, "mensaje": f"❌ Error: La ruta '{ruta}' no es un directorio válido."})
+            return
+        encontrados = gestor._iterar_raices(raices, patron)
+
+        # Se guarda en la caché solo si no es enorme (el modo ligero es para esos casos)
+        para_cache = []
+        try:
+            total = self._enviar_lineas(encontrados, "disco", para_cache)
+        finally:
+            encontrados.close()  # Si el cliente se desconectó, los hilos de búsqueda terminan
+        if total <= CACHE_SERVICIO_MAX_RESULTADOS:
+            self.server.cache.guardar(clave, (total, b"".join(para_cache)))
+
+    def _enviar_lineas(self, resultados, origen, copia=None):
+        """
+        Escribe los resultados por bloques (el primero apenas aparece) y la línea final.
+        Si se pasa `copia`, se le agregan los bloques enviados para guardarlos en la caché.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.end_headers()
+        total = 0
+        bloque = []
+        ultimo_envio = 0.0
+        for res in resultados:
+            total += 1
+            bloque.append(json.dumps(res, ensure_ascii=False))
+            if len(bloque) >= 256 or time.monotonic() - ultimo_envio > 0.05:
+                texto = ("\n".join(bloque) + "\n").encode("utf-8")
+                self.wfile.write(texto)
+                if copia is not None and total <= CACHE_SERVICIO_MAX_RESULTADOS:
+                    copia.append(texto)
+                bloque, ultimo_envio = [], time.monotonic()
+        if bloque:
+            texto = ("\n".join(bloque) + "\n").encode("utf-8")
+            if copia is not None:
+                copia.append(texto)
+            self.wfile.write(texto)
+        self.wfile.write((json.dumps({"fin": True, "total": total, "origen": origen}) + "\n").encode("utf-8"))
+        return total
+
+
+class ServidorGestor:
+    """
+    Servidor HTTP del modo --serve (se combina con http.server.HTTPServer en
+    clases_servicio). Las conexiones se atienden en un grupo fijo de
+    hilos; si ya hay `hilos` peticiones en curso y `en_cola` esperando, las nuevas
+    se rechazan enseguida con 503 (el cliente debe reintentar) en vez de acumularse.
+    """
+
+    request_queue_size = 128  # Conexiones que el sistema retiene antes de aceptarlas
+
+    def __init__(self, direccion, gestor, token, hilos=HILOS_SERVICIO, en_cola=COLA_SERVICIO, registrar=False):
+        self.gestor = gestor
+        self.token = token
+        self.registrar = registrar
+        self.cache = CacheBusquedas()
+        self.candado_tablas = threading.Lock()  # TablaDeNombres.buscar no es segura entre hilos
+        # El compilador guarda variables mientras ejecuta: un script a la vez
+        self.compilador = MiniCompilador(gestor)
+        self._candado_compilador = threading.Lock()
+        self.hilos = hilos
+        self._pool = ThreadPoolExecutor(max_workers=hilos)
+        self._cupos = threading.BoundedSemaphore(hilos + en_cola)
+        self.rechazadas = 0
+        super().__init__(direccion, clases_servicio()[0])
+
+    def process_request(self, request, client_address):
+        if not self._cupos.acquire(blocking=False):
+            self.rechazadas += 1
+            cuerpo = json.dumps({"ok": False, "mensaje": "❌ Servicio ocupado, reintenta en un momento."}).encode("utf-8")
+            try:
+                request.settimeout(0.2)
+                request.sendall(
+                    b"HTTP/1.0 503 Service Unavailable\r\nContent-Type: application/json\r\nRetry-After: 1\r\n"
+                    + f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("ascii") + cuerpo
+                )
+                # Se descarta la petición hasta que el cliente cierre: cerrar con datos sin
+                # leer haría que reciba un "connection reset" en vez del 503
+                request.shutdown(socket.SHUT_WR)
+                while request.recv(65536):
+                    pass
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._cupos.release()
+
+    def ejecutar_comando(self, codigo):
+        with self._candado_compilador:
+            resultado = self.compilador.ejecutar(codigo)
+        self.cache.vaciar()
+        return resultado
+
+    def estado(self):
+        return {
+            "ok": True,
+            "atajos": self.gestor.atajos_ruta,
+            "hilos": self.hilos,
+            "rechazadas": self.rechazadas,
+            "cache": {"aciertos": self.cache.aciertos, "fallos": self.cache.fallos},
+            "metadatos": {"aciertos": CACHE_METADATOS.aciertos, "fallos": CACHE_METADATOS.fallos,
+                          "invalidaciones": CACHE_METADATOS.invalidaciones, "rutas": len(CACHE_METADATOS)},
+            "limites": self.gestor.limitador.estadisticas(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+class ServidorGestorUnix(ServidorGestor):
+    """Igual que ServidorGestor pero escuchando en un socket Unix (solo el usuario actual)."""
+
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)  # Socket de una ejecución anterior
+        import socketserver  # Ya cargado por http.server
+        socketserver.TCPServer.server_bind(self)
+        os.chmod(self.server_address, 0o600)
+        self.server_name, self.server_port = "localhost", 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+@functools.lru_cache(maxsize=None)
+def clases_servicio():
+    """
+    Devuelve (manejador, servidor TCP, servidor Unix): las clases de arriba unidas a las
+    de http.server, que se importa recién aquí (solo el modo servicio lo necesita).
+    """
+    import http.server
+    manejador = type("ManejadorJSON", (ManejadorJSON, http.server.BaseHTTPRequestHandler), {})
+    servidor = type("ServidorGestor", (ServidorGestor, http.server.HTTPServer), {})
+    servidor_unix = type("ServidorGestorUnix", (ServidorGestorUnix, http.server.HTTPServer), {})
+    return manejador, servidor, servidor_unix
+
+
+def crear_token_servicio():
+    """
+    Genera el token de esta ejecución del servicio y lo guarda en
+    ~/.gestor_archivos/servicio.token con permisos 600 (solo el usuario actual lo lee).
+    """
+    token = secrets.token_urlsafe(32)
+    os.makedirs(DIRECTORIO_DATOS, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO_DATOS, "servicio.token")
+    descriptor = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as f:
+        os.chmod(ruta, 0o600)  # Por si el archivo ya existía con otros permisos
+        f.write(token)
+    return token, ruta
+
+
+def servir(gestor, puerto=None, ruta_socket=None, hilos=HILOS_SERVICIO):
+    """
+    Inicia el servicio y atiende peticiones hasta Ctrl+C. Sin puerto ni socket escucha
+    en el socket Unix ~/.gestor_archivos/servicio.sock (en Windows, en el puerto por defecto).
+    """
+    token, ruta_token = crear_token_servicio()
+    _, ServidorTCP, ServidorUnix = clases_servicio()
+    if puerto is None and ruta_socket is None:
+        if hasattr(socket, "AF_UNIX"):
+            ruta_socket = os.path.join(DIRECTORIO_DATOS, "servicio.sock")
+        else:
+            puerto = PUERTO_SERVICIO
+    if ruta_socket:
+        servidor = ServidorUnix(ruta_socket, gestor, token, hilos, registrar=True)
+        print(f"Servicio escuchando en el socket {ruta_socket}")
+    else:
+        # Solo en la máquina local: el servicio puede mover y borrar archivos
+        servidor = ServidorTCP(("127.0.0.1", puerto), gestor, token, hilos, registrar=True)
+        print(f"Servicio escuchando en http://127.0.0.1:{puerto}")
+    print(f"Token (también en {ruta_token}): {token}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Servicio detenido.")
+    finally:
+        servidor.server_close()
 
 
 # -----------------------------------------------------------------
@@ -407,9 +4042,11 @@ COLOR_BOTON_BUSCAR = ("#0277BD", "#01579B")
 class App(customtkinter.CTk):
     """Clase principal de la aplicación GUI."""
 
-    def __init__(self, gestor):
+    def __init__(self, gestor, medir_inicio=False):
         super().__init__()
         self.gestor = gestor
+        self.medir_inicio = medir_inicio
+        self._inicio_ventana = time.perf_counter()
         # Creamos el compilador para interpretar comandos
         self.compilador = MiniCompilador(self.gestor)
 
@@ -421,31 +4058,40 @@ class App(customtkinter.CTk):
         customtkinter.set_appearance_mode("system")
         customtkinter.set_default_color_theme("blue")
 
-        # Creamos un TabView (pestañas)
-        self.notebook = customtkinter.CTkTabview(self, width=700)
+        # Creamos un TabView (pestañas); al cambiar de pestaña se construye si hace falta
+        self.notebook = customtkinter.CTkTabview(self, width=700, command=self._al_cambiar_pestana)
         self.notebook.pack(expand=True, fill="both", padx=10, pady=10)
 
         # Añadimos pestañas (tabs) con iconos/emojis
         self.tab_organizar = self.notebook.add("Organizar 🧠")
         self.tab_buscar = self.notebook.add("Buscar 🔍")
+        self.tab_espacio = self.notebook.add("Espacio 📊")
         self.tab_crear = self.notebook.add("Crear 📄")
         self.tab_mover = self.notebook.add("Mover 📦")
         self.tab_copiar = self.notebook.add("Copiar 📋")
         self.tab_renombrar = self.notebook.add("Renombrar 🏷️")
         self.tab_borrar = self.notebook.add("Borrar 🗑️")
         self.tab_carpetas = self.notebook.add("Carpetas 📁")
+        self.tab_trabajos = self.notebook.add("Trabajos ⏯️")
         self.tab_compilador = self.notebook.add("Compilador ⚡")
 
-        # Creamos widgets para cada pestaña
-        self.crear_widgets_organizar()
-        self.crear_widgets_buscar()
-        self.crear_widgets_crear()
-        self.crear_widgets_mover()
-        self.crear_widgets_copiar()
-        self.crear_widgets_renombrar()
-        self.crear_widgets_borrar()
-        self.crear_widgets_carpetas()
-        self.crear_widgets_compilador()
+        # Los widgets de cada pestaña se crean la primera vez que se abre: crear todas
+        # al inicio (decenas de widgets CTk) retrasaba la aparición de la ventana
+        self._pestanas_pendientes = {
+            "Organizar 🧠": self.crear_widgets_organizar,
+            "Buscar 🔍": self.crear_widgets_buscar,
+            "Espacio 📊": self.crear_widgets_espacio,
+            "Crear 📄": self.crear_widgets_crear,
+            "Mover 📦": self.crear_widgets_mover,
+            "Copiar 📋": self.crear_widgets_copiar,
+            "Renombrar 🏷️": self.crear_widgets_renombrar,
+            "Borrar 🗑️": self.crear_widgets_borrar,
+            "Carpetas 📁": self.crear_widgets_carpetas,
+            "Trabajos ⏯️": self.crear_widgets_trabajos,
+            "Compilador ⚡": self.crear_widgets_compilador,
+        }
+        self._al_cambiar_pestana()  # La pestaña visible al abrir
+        self._trabajo_en_curso = None  # (hilo, evento para pausar, [resultado]) del trabajo largo activo
 
         # Configuramos la barra de estado (status bar)
         self.COLOR_EXITO = ("#1B5E20", "#69F0AE")
@@ -461,6 +4107,30 @@ class App(customtkinter.CTk):
         self.COLOR_NORMAL = self.status_label.cget("text_color")
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
 
+        if self.medir_inicio:
+            self.bind("<Map>", self._al_mostrar_ventana)
+        else:
+            # Después de abrir (no retrasa la ventana): avisar si quedaron trabajos a medias
+            self.after(500, self._avisar_trabajos_pendientes)
+
+    def _al_cambiar_pestana(self):
+        """Construye los widgets de la pestaña seleccionada si todavía no existen."""
+        constructor = self._pestanas_pendientes.pop(self.notebook.get(), None)
+        if constructor is not None:
+            constructor()
+
+    def _al_mostrar_ventana(self, _evento=None):
+        """Con --medir-inicio: informa cuánto tardó la ventana en aparecer y la cierra."""
+        self.unbind("<Map>")
+        self.update_idletasks()  # Espera a que termine el primer dibujado
+        ahora = time.perf_counter()
+        print(
+            f"Inicio: {(ahora - INICIO_PROGRAMA) * 1000:.0f} ms "
+            f"(importaciones y gestor: {(self._inicio_ventana - INICIO_PROGRAMA) * 1000:.0f} ms, "
+            f"ventana: {(ahora - self._inicio_ventana) * 1000:.0f} ms)"
+        )
+        self.after(0, self.destroy)
+
     def actualizar_estado(self, mensaje, tipo="auto"):
         """
         Actualiza la barra de estado inferior con un mensaje y define
@@ -603,6 +4273,12 @@ class App(customtkinter.CTk):
         )
         btn_examinar_d.grid(row=1, column=2, padx=10)
 
+        frame_conflicto = customtkinter.CTkFrame(self.tab_mover, fg_color="transparent")
+        frame_conflicto.pack(fill="x", padx=5, pady=5)
+        customtkinter.CTkLabel(frame_conflicto, text="Si el nombre ya existe:").pack(side="left", padx=5)
+        self.mover_politica = customtkinter.CTkOptionMenu(frame_conflicto, values=list(POLITICAS_CONFLICTO), width=170)
+        self.mover_politica.pack(side="left", padx=5)
+
         btn_mover = customtkinter.CTkButton(self.tab_mover, text="Mover Archivo", command=self.accion_gui_mover, height=32)
         btn_mover.pack(pady=10, fill='x', padx=10, ipady=5)
 
@@ -646,6 +4322,13 @@ class App(customtkinter.CTk):
         )
         btn_examinar_d.grid(row=1, column=2, padx=10)
 
+        # Forma de copiar: auto usa reflink (instantáneo) cuando el volumen lo permite
+        frame_estrategia = customtkinter.CTkFrame(self.tab_copiar, fg_color="transparent")
+        frame_estrategia.pack(fill="x", padx=5, pady=5)
+        customtkinter.CTkLabel(frame_estrategia, text="Estrategia:").pack(side="left", padx=5)
+        self.copiar_estrategia = customtkinter.CTkOptionMenu(frame_estrategia, values=list(ESTRATEGIAS_COPIA), width=120)
+        self.copiar_estrategia.pack(side="left", padx=5)
+
         btn_copiar = customtkinter.CTkButton(self.tab_copiar, text="Copiar Archivo", command=self.accion_gui_copiar, height=32)
         btn_copiar.pack(pady=10, fill='x', padx=10, ipady=5)
 
@@ -679,6 +4362,12 @@ class App(customtkinter.CTk):
         self.renombrar_nombre_nuevo = customtkinter.CTkEntry(frame_nuevo, width=300)
         self.renombrar_nombre_nuevo.grid(row=0, column=1, sticky="ew", padx=5)
 
+        frame_conflicto = customtkinter.CTkFrame(self.tab_renombrar, fg_color="transparent")
+        frame_conflicto.pack(fill="x", padx=5, pady=5)
+        customtkinter.CTkLabel(frame_conflicto, text="Si el nombre ya existe:").pack(side="left", padx=5)
+        self.renombrar_politica = customtkinter.CTkOptionMenu(frame_conflicto, values=list(POLITICAS_CONFLICTO), width=170)
+        self.renombrar_politica.pack(side="left", padx=5)
+
         btn_renombrar = customtkinter.CTkButton(self.tab_renombrar, text="Renombrar Archivo", command=self.accion_gui_renombrar, height=32)
         btn_renombrar.pack(pady=20, fill='x', padx=10, ipady=5)
 
@@ -793,6 +4482,13 @@ class App(customtkinter.CTk):
         )
         btn_examinar.grid(row=2, column=1, padx=(10, 5))
 
+        # Qué hacer si en la subcarpeta ya hay un archivo con el mismo nombre
+        frame_conflicto = customtkinter.CTkFrame(frame, fg_color="transparent")
+        frame_conflicto.grid(row=3, column=0, columnspan=2, sticky="w", pady=(10, 0))
+        customtkinter.CTkLabel(frame_conflicto, text="Si el nombre ya existe:").pack(side="left", padx=5)
+        self.organizar_politica = customtkinter.CTkOptionMenu(frame_conflicto, values=list(POLITICAS_CONFLICTO), width=170)
+        self.organizar_politica.pack(side="left", padx=5)
+
         btn_organizar = customtkinter.CTkButton(
             self.tab_organizar, text="¡Organizar!",
             command=self.accion_gui_organizar, height=32,
@@ -828,6 +4524,19 @@ class App(customtkinter.CTk):
         )
         self.buscar_nombre.grid(row=1, column=1, columnspan=2, sticky="ew", padx=5)
 
+        # Filtros opcionales para fotos/videos (usan la caché de metadatos)
+        customtkinter.CTkLabel(frame_criterios, text="Fotos/videos:").grid(row=2, column=0, sticky="w", padx=5, pady=8)
+        frame_filtros = customtkinter.CTkFrame(frame_criterios, fg_color="transparent")
+        frame_filtros.grid(row=2, column=1, columnspan=2, sticky="ew", padx=5)
+        self.buscar_fecha_desde = customtkinter.CTkEntry(frame_filtros, width=120, placeholder_text="desde AAAA-MM-DD")
+        self.buscar_fecha_desde.pack(side="left", padx=(0, 5))
+        self.buscar_fecha_hasta = customtkinter.CTkEntry(frame_filtros, width=120, placeholder_text="hasta AAAA-MM-DD")
+        self.buscar_fecha_hasta.pack(side="left", padx=5)
+        self.buscar_orden = customtkinter.CTkOptionMenu(
+            frame_filtros, values=["Sin orden", "Fecha", "Tamaño", "Dimensiones"], width=130
+        )
+        self.buscar_orden.pack(side="left", padx=5)
+
         # Frame botones Buscar y Limpiar
         frame_botones = customtkinter.CTkFrame(self.tab_buscar, fg_color="transparent")
         frame_botones.pack(pady=10, fill='x', padx=10)
@@ -846,11 +4555,253 @@ class App(customtkinter.CTk):
         )
         btn_limpiar.pack(side="left", ipady=5, padx=(5, 0))
 
+        # Exportar: los resultados se escriben directo a un archivo (CSV, JSONL o columnar)
+        btn_exportar = customtkinter.CTkButton(
+            frame_botones, text="Exportar...",
+            command=self.accion_gui_exportar_busqueda, height=32,
+            width=100, fg_color="gray50", hover_color="gray30"
+        )
+        btn_exportar.pack(side="left", ipady=5, padx=(10, 0))
+
+        # Búsqueda instantánea: cada tecla refina los resultados sin pulsar "Buscar"
+        self.buscar_instantanea = customtkinter.CTkCheckBox(
+            frame_botones, text="Instantánea", width=100,
+            command=self.accion_gui_activar_busqueda_instantanea
+        )
+        self.buscar_instantanea.pack(side="left", padx=(10, 0))
+        self.buscar_nombre.bind("<KeyRelease>", self.accion_gui_busqueda_instantanea)
+        self._generacion_busqueda = 0  # Aumenta en cada tecla; las búsquedas viejas se descartan
+        self._detener_busqueda = threading.Event()  # Se activa al empezar otra búsqueda (ver _nueva_busqueda)
+        self._ejecutor_busqueda = ThreadPoolExecutor(max_workers=1)
+        self._exportacion_en_curso = None  # (hilo, [mensaje]) mientras se exporta
+        self._cola_busqueda = queue.Queue()  # Resultados que llegan desde el hilo de búsqueda
+        self.after(30, self._revisar_cola_busqueda)
+
         # Etiqueta y cuadro de texto para resultados
         customtkinter.CTkLabel(self.tab_buscar, text="Resultados:").pack(fill="x", padx=10, anchor="w", pady=(5, 0))
         self.buscar_resultados_text = customtkinter.CTkTextbox(self.tab_buscar, height=200, state="disabled")
         self.buscar_resultados_text.pack(fill="both", expand=True, padx=10, pady=(5, 10))
 
+    # — Pestaña ESPACIO (análisis de tamaño de carpetas) —
+
+    def crear_widgets_espacio(self):
+        """
+        Widgets para analizar qué carpetas ocupan más espacio:
+        - Ruta a analizar y botón para lanzar el análisis
+        - Vista en árbol (se carga por niveles al expandir) o lista con las 20 mayores
+        """
+        self.espacio_analisis = None           # Último resultado de gestor.analizar_espacio
+        self.espacio_orden = ("tamano", True)  # (columna, descendente)
+
+        frame = customtkinter.CTkFrame(self.tab_espacio, fg_color="transparent")
+        frame.pack(fill="x", expand=False, padx=10, pady=10)
+        frame.grid_columnconfigure((1), weight=1)
+
+        customtkinter.CTkLabel(frame, text="Analizar:").grid(row=0, column=0, sticky="w", padx=5, pady=8)
+        self.espacio_ruta = customtkinter.CTkEntry(frame, placeholder_text="ej: descargas")
+        self.espacio_ruta.insert(0, "descargas")
+        self.espacio_ruta.grid(row=0, column=1, sticky="ew", padx=5)
+        btn_examinar = customtkinter.CTkButton(
+            frame, text="Examinar...", width=100,
+            command=lambda: self.seleccionar_directorio(self.espacio_ruta)
+        )
+        btn_examinar.grid(row=0, column=2, padx=10)
+
+        frame_botones = customtkinter.CTkFrame(self.tab_espacio, fg_color="transparent")
+        frame_botones.pack(pady=5, fill='x', padx=10)
+
+        btn_analizar = customtkinter.CTkButton(
+            frame_botones, text="Analizar Espacio",
+            command=self.accion_gui_analizar_espacio, height=32,
+            fg_color=COLOR_BOTON_BUSCAR[0], hover_color=COLOR_BOTON_BUSCAR[1]
+        )
+        btn_analizar.pack(side="left", fill='x', expand=True, ipady=5, padx=(0, 5))
+
+        # Permite alternar entre el árbol completo y las carpetas más grandes
+        self.espacio_vista = customtkinter.CTkOptionMenu(
+            frame_botones, values=["Árbol", "Top 20"], width=110,
+            command=lambda _: self.mostrar_espacio()
+        )
+        self.espacio_vista.pack(side="left", padx=(5, 0))
+
+        # Árbol de carpetas con columnas de tamaño y cantidad de archivos
+        self.espacio_arbol = ttk.Treeview(self.tab_espacio, columns=("tamano", "archivos"), height=12)
+        self.espacio_arbol.heading("#0", text="Carpeta", command=lambda: self.ordenar_espacio("nombre"))
+        self.espacio_arbol.heading("tamano", text="Tamaño", command=lambda: self.ordenar_espacio("tamano"))
+        self.espacio_arbol.heading("archivos", text="Archivos", command=lambda: self.ordenar_espacio("archivos"))
+        self.espacio_arbol.column("tamano", width=110, anchor="e", stretch=False)
+        self.espacio_arbol.column("archivos", width=90, anchor="e", stretch=False)
+        self.espacio_arbol.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        # Los hijos de cada carpeta se insertan recién cuando el usuario la expande
+        self.espacio_arbol.bind("<<TreeviewOpen>>", self.expandir_nodo_espacio)
+
+    def _hijos_ordenados_espacio(self, carpetas):
+        """Ordena una lista de carpetas según la columna elegida en la pestaña Espacio."""
+        columna, descendente = self.espacio_orden
+        if columna == "nombre":
+            clave = lambda c: os.path.basename(c).lower()
+        else:
+            clave = self.espacio_analisis['tamanos' if columna == "tamano" else 'archivos'].get
+        return sorted(carpetas, key=clave, reverse=descendente)
+
+    def _insertar_nodo_espacio(self, padre, carpeta, texto=None):
+        """Inserta una carpeta en el árbol; si tiene subcarpetas agrega un hijo temporal."""
+        analisis = self.espacio_analisis
+        self.espacio_arbol.insert(
+            padre, tk.END, iid=carpeta,
+            text=texto or os.path.basename(carpeta) or carpeta,
+            values=(formatear_tamano(analisis['tamanos'][carpeta]), analisis['archivos'][carpeta])
+        )
+        if analisis['hijos'].get(carpeta):
+            self.espacio_arbol.insert(carpeta, tk.END, iid=carpeta + "\0", text="…")
+
+    def expandir_nodo_espacio(self, _evento=None):
+        """Al expandir un nodo reemplaza el hijo temporal por sus subcarpetas reales."""
+        carpeta = self.espacio_arbol.focus()
+        marcador = carpeta + "\0"
+        if not self.espacio_arbol.exists(marcador):
+            return  # Ya estaba cargado
+        self.espacio_arbol.delete(marcador)
+        for hijo in self._hijos_ordenados_espacio(self.espacio_analisis['hijos'][carpeta]):
+            self._insertar_nodo_espacio(carpeta, hijo)
+
+    def ordenar_espacio(self, columna):
+        """Cambia la columna de orden (o invierte el sentido si es la misma) y redibuja."""
+        actual, descendente = self.espacio_orden
+        self.espacio_orden = (columna, not descendente if columna == actual else columna != "nombre")
+        self.mostrar_espacio()
+
+    def mostrar_espacio(self):
+        """Dibuja el último análisis en la vista elegida (árbol perezoso o top 20)."""
+        self.espacio_arbol.delete(*self.espacio_arbol.get_children())
+        if not self.espacio_analisis:
+            return
+        raiz = self.espacio_analisis['raiz']
+        if self.espacio_vista.get() == "Top 20":
+            carpetas = sorted(self.espacio_analisis['tamanos'], key=self.espacio_analisis['tamanos'].get, reverse=True)[:20]
+            for carpeta in self._hijos_ordenados_espacio(carpetas):
+                self.espacio_arbol.insert(
+                    "", tk.END, iid=carpeta, text=carpeta,
+                    values=(formatear_tamano(self.espacio_analisis['tamanos'][carpeta]), self.espacio_analisis['archivos'][carpeta])
+                )
+        else:
+            self._insertar_nodo_espacio("", raiz, texto=raiz)
+            self.espacio_arbol.item(raiz, open=True)
+            self.espacio_arbol.focus(raiz)
+            self.expandir_nodo_espacio()
+
+    # — Pestaña TRABAJOS —
+
+    def crear_widgets_trabajos(self):
+        """
+        Widgets para ver los trabajos largos (organizar, copias masivas) guardados:
+        - Lista con estado y avance de cada uno
+        - Botones para reanudar o pausar el seleccionado y borrar los terminados
+        """
+        frame_botones = customtkinter.CTkFrame(self.tab_trabajos, fg_color="transparent")
+        frame_botones.pack(pady=(10, 5), fill='x', padx=10)
+
+        btn_reanudar = customtkinter.CTkButton(
+            frame_botones, text="Reanudar", command=self.accion_gui_reanudar_trabajo,
+            fg_color=COLOR_BOTON_EXITO[0], hover_color=COLOR_BOTON_EXITO[1]
+        )
+        btn_reanudar.pack(side="left", fill='x', expand=True, padx=(0, 5))
+        btn_pausar = customtkinter.CTkButton(frame_botones, text="Pausar", command=self.accion_gui_pausar_trabajo)
+        btn_pausar.pack(side="left", fill='x', expand=True, padx=5)
+        btn_actualizar = customtkinter.CTkButton(frame_botones, text="Actualizar", command=self.mostrar_trabajos)
+        btn_actualizar.pack(side="left", fill='x', expand=True, padx=5)
+        btn_limpiar = customtkinter.CTkButton(
+            frame_botones, text="Borrar terminados", command=self.accion_gui_borrar_trabajos,
+            fg_color=COLOR_BOTON_PELIGRO[0], hover_color=COLOR_BOTON_PELIGRO[1]
+        )
+        btn_limpiar.pack(side="left", fill='x', expand=True, padx=(5, 0))
+
+        self.trabajos_lista = ttk.Treeview(self.tab_trabajos, columns=("estado", "avance", "ruta"), height=12)
+        self.trabajos_lista.heading("#0", text="Trabajo")
+        self.trabajos_lista.heading("estado", text="Estado")
+        self.trabajos_lista.heading("avance", text="Avance")
+        self.trabajos_lista.heading("ruta", text="Carpeta")
+        self.trabajos_lista.column("#0", width=170, stretch=False)
+        self.trabajos_lista.column("estado", width=100, stretch=False)
+        self.trabajos_lista.column("avance", width=110, anchor="e", stretch=False)
+        self.trabajos_lista.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        self.mostrar_trabajos()
+
+    def mostrar_trabajos(self):
+        """Vuelve a leer los registros de trabajos y los muestra (conservando la selección)."""
+        seleccion = self.trabajos_lista.selection()
+        self.trabajos_lista.delete(*self.trabajos_lista.get_children())
+        trabajos, _ = self.gestor.listar_trabajos()
+        for trabajo in trabajos:
+            destino = trabajo.parametros.get("destino")
+            ruta = trabajo.parametros.get("ruta", "") + (f" → {destino}" if destino else "")
+            porcentaje = 100 * trabajo.hechos / trabajo.total if trabajo.total else 100
+            self.trabajos_lista.insert(
+                "", tk.END, iid=trabajo.id,
+                text=f"{time.strftime('%d/%m %H:%M', time.localtime(trabajo.creado))}  {trabajo.tipo}",
+                values=(trabajo.estado, f"{trabajo.hechos}/{trabajo.total} ({porcentaje:.0f}%)", ruta)
+            )
+        self.trabajos_lista.selection_set([i for i in seleccion if self.trabajos_lista.exists(i)])
+
+    def _avisar_trabajos_pendientes(self):
+        trabajos, _ = self.gestor.listar_trabajos()
+        pendientes = [t for t in trabajos if t.estado in RegistroTrabajo.REANUDABLES]
+        if pendientes:
+            self.actualizar_estado(
+                f"ℹ️ Hay {len(pendientes)} trabajos sin terminar: se pueden reanudar en la pestaña Trabajos."
+            )
+
+    def accion_gui_reanudar_trabajo(self):
+        """Reanuda el trabajo seleccionado en un hilo aparte; la lista se actualiza mientras avanza."""
+        seleccion = self.trabajos_lista.selection()
+        if not seleccion:
+            self.actualizar_estado("❌ Error: Selecciona un trabajo de la lista.")
+            return
+        self._iniciar_trabajo(
+            lambda detener: self.gestor.reanudar_trabajo(seleccion[0], detener), f"Reanudando '{seleccion[0]}'..."
+        )
+
+    def _iniciar_trabajo(self, tarea, mensaje):
+        """
+        Ejecuta tarea(detener) en un hilo aparte para que la ventana siga respondiendo
+        (aunque la operación esté limitada) y revisa su avance cada medio segundo.
+        El botón Pausar de la pestaña Trabajos activa `detener`.
+        """
+        if self._trabajo_en_curso is not None:
+            self.actualizar_estado("ℹ️ Ya hay un trabajo en curso; páusalo o espera a que termine.")
+            return
+        detener = threading.Event()
+        resultado = []
+        hilo = threading.Thread(target=lambda: resultado.append(tarea(detener)), daemon=True)
+        self._trabajo_en_curso = (hilo, detener, resultado)
+        hilo.start()
+        limites = self.gestor.limitador.describir()
+        if limites != "sin límites":
+            mensaje += f" (límites de E/S: {limites})"  # Para que un avance lento no parezca un cuelgue
+        self.actualizar_estado(mensaje, "normal")
+        self.after(500, self._revisar_trabajo)
+
+    def _revisar_trabajo(self):
+        """Mientras el trabajo corre refresca su avance; al terminar muestra el resultado."""
+        hilo, _, resultado = self._trabajo_en_curso
+        if hasattr(self, "trabajos_lista"):  # La pestaña Trabajos puede no haberse abierto aún
+            self.mostrar_trabajos()
+        if hilo.is_alive():
+            self.after(500, self._revisar_trabajo)
+            return
+        self._trabajo_en_curso = None
+        self.actualizar_estado(resultado[0] if resultado else "❌ Error: El trabajo terminó sin resultado.")
+
+    def accion_gui_pausar_trabajo(self):
+        if self._trabajo_en_curso is None:
+            self.actualizar_estado("ℹ️ No hay ningún trabajo en curso.")
+            return
+        self._trabajo_en_curso[1].set()  # Se detiene en el próximo paso y guarda su avance
+
+    def accion_gui_borrar_trabajos(self):
+        self.actualizar_estado(self.gestor.borrar_trabajos_terminados())
+        self.mostrar_trabajos()
+
     # — Pestaña COMPILADOR —
 
     def crear_widgets_compilador(self):
@@ -875,16 +4826,26 @@ class App(customtkinter.CTk):
             'borrar "prueba.txt" en "descargas"'
         )
 
+        frame_botones = customtkinter.CTkFrame(frame, fg_color="transparent")
+        frame_botones.grid(row=1, column=0, pady=10, padx=5, sticky="ew")
+
         self.compilador_btn = customtkinter.CTkButton(
-            frame, text="Ejecutar Comando",
+            frame_botones, text="Ejecutar Comando",
             command=self.accion_gui_compilador, height=32
         )
-        self.compilador_btn.grid(row=1, column=0, pady=10, padx=5, sticky="ew", ipady=5)
+        self.compilador_btn.pack(side="left", fill='x', expand=True, ipady=5, padx=(0, 5))
+
+        btn_todo = customtkinter.CTkButton(
+            frame_botones, text="Ejecutar Todo",
+            command=lambda: self.accion_gui_compilador(todo=True), height=32,
+            fg_color=COLOR_BOTON_EXITO[0], hover_color=COLOR_BOTON_EXITO[1]
+        )
+        btn_todo.pack(side="left", ipady=5, padx=(5, 0))
 
         self.compilador_output = customtkinter.CTkTextbox(frame, state="disabled")
         self.compilador_output.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
 
-        info = "Ayuda: El compilador ejecuta UNA línea a la vez."
+        info = "Ayuda: 'Ejecutar Comando' corre la línea del cursor; 'Ejecutar Todo' corre el script completo."
         customtkinter.CTkLabel(frame, text=info, font=customtkinter.CTkFont(size=11, slant="italic")).grid(row=3, column=0, sticky="ew", padx=5, pady=(5,0))
 
     # — Callbacks / Acciones de los botones de la GUI — 
@@ -908,7 +4869,7 @@ class App(customtkinter.CTk):
         if not n_origen or not r_origen or not r_destino:
             self.actualizar_estado("❌ Error: Los campos de origen y la ruta de destino son obligatorios.")
             return
-        resultado = self.gestor.mover_archivo(n_origen, r_origen, n_destino, r_destino)
+        resultado = self.gestor.mover_archivo(n_origen, r_origen, n_destino, r_destino, self.mover_politica.get())
         self.actualizar_estado(resultado)
 
     def accion_gui_borrar(self):
@@ -935,7 +4896,7 @@ class App(customtkinter.CTk):
         if not n_origen or not r_origen or not r_destino:
             self.actualizar_estado("❌ Error: Los campos de origen y la ruta de destino son obligatorios.")
             return
-        resultado = self.gestor.copiar_archivo(n_origen, r_origen, n_destino, r_destino)
+        resultado = self.gestor.copiar_archivo(n_origen, r_origen, n_destino, r_destino, self.copiar_estrategia.get())
         self.actualizar_estado(resultado)
 
     def accion_gui_renombrar(self):
@@ -946,7 +4907,7 @@ class App(customtkinter.CTk):
         if not n_original or not ruta or not n_nuevo:
             self.actualizar_estado("❌ Error: Todos los campos son obligatorios.")
             return
-        resultado = self.gestor.renombrar_archivo(n_original, ruta, n_nuevo)
+        resultado = self.gestor.renombrar_archivo(n_original, ruta, n_nuevo, self.renombrar_politica.get())
         self.actualizar_estado(resultado)
 
     def accion_gui_crear_carpeta(self):
@@ -985,10 +4946,12 @@ class App(customtkinter.CTk):
             return
         msg = f"¿Estás seguro de que quieres organizar automáticamente la carpeta '{ruta}'?\n\nLos archivos se moverán a subcarpetas por tipo."
         if messagebox.askyesno("Confirmar Organización", msg):
-            self.actualizar_estado("Organizando, por favor espera...", "normal")
-            self.update()  # Forzar que la GUI se refresque mientras procesa
-            resultado = self.gestor.organizar_carpeta_por_tipo(ruta)
-            self.actualizar_estado(resultado)
+            # Corre como trabajo reanudable en segundo plano: se puede pausar desde la pestaña Trabajos
+            politica = self.organizar_politica.get()
+            self._iniciar_trabajo(
+                lambda detener: self.gestor.organizar_carpeta_por_tipo(ruta, politica, detener),
+                "Organizando en segundo plano (se puede pausar en la pestaña Trabajos)..."
+            )
         else:
             self.actualizar_estado("ℹ️ Organización cancelada.", "normal")
 
@@ -1008,16 +4971,26 @@ class App(customtkinter.CTk):
             self.buscar_resultados_text.configure(state="disabled")
             return
 
-        resultados, mensaje = self.gestor.buscar_archivos(ruta, nombre)
+        # Si se usa algún filtro de fotos/videos la búsqueda incluye sus metadatos
+        fecha_desde = self.buscar_fecha_desde.get().strip()
+        fecha_hasta = self.buscar_fecha_hasta.get().strip()
+        orden = {"Fecha": "fecha", "Tamaño": "tamano", "Dimensiones": "dimensiones"}.get(self.buscar_orden.get())
+        raices = self.gestor.resolver_raices(ruta)
+        if fecha_desde or fecha_hasta or orden:
+            resultados, mensaje = self.gestor.buscar_multimedia(ruta, nombre, fecha_desde, fecha_hasta, orden)
+        elif len(raices) > 1:
+            # Varias carpetas ("todos" o una lista): los resultados llegan desde el hilo de búsqueda
+            generacion, detener = self._nueva_busqueda()
+            self._ejecutor_busqueda.submit(self._buscar_varias_en_segundo_plano, generacion, detener, raices, nombre)
+            self.buscar_resultados_text.configure(state="disabled")
+            return
+        else:
+            resultados, mensaje = self.gestor.buscar_archivos(ruta, nombre)
         self.actualizar_estado(mensaje)
 
         if resultados:
-            texto_resultados = []
-            for res in resultados:
-                tamano_formateado = f"{res['tamano_kb']:.2f} KB"
-                linea = f"Ruta: {res['ruta']}\n\tExt: {res['extension']}  |  Tamaño: {tamano_formateado}\n"
-                texto_resultados.append(linea)
-            self.buscar_resultados_text.insert("1.0", "\n".join(texto_resultados))
+            texto_resultados = [self._formatear_resultado(res) for res in resultados]
+            self.buscar_resultados_text.insert("1.0", "".join(texto_resultados))
         else:
             if "0 archivos encontrados" in mensaje:
                 self.buscar_resultados_text.insert("1.0", "No se encontraron archivos con esos criterios.")
@@ -1026,6 +4999,173 @@ class App(customtkinter.CTk):
 
         self.buscar_resultados_text.configure(state="disabled")
 
+    @staticmethod
+    def _formatear_resultado(res):
+        """Texto de un resultado de búsqueda para el cuadro de resultados."""
+        tamano_formateado = f"{res['tamano_kb']:.2f} KB"
+        linea = f"Ruta: {res['ruta']}\n\tExt: {res['extension']}  |  Tamaño: {tamano_formateado}"
+        if res.get('ancho'):
+            linea += f"  |  {res['ancho']}x{res['alto']}"
+        if res.get('fecha'):
+            linea += f"  |  Fecha: {res['fecha']}"
+        return linea + "\n\n"
+
+    def accion_gui_analizar_espacio(self):
+        """Lógica al pulsar Analizar Espacio: calcula tamaños y muestra el árbol."""
+        ruta = self.espacio_ruta.get()
+        if not ruta:
+            self.actualizar_estado("❌ Error: Debes especificar una ruta para analizar.")
+            return
+        self.actualizar_estado("Analizando espacio, por favor espera...", "normal")
+        self.update()  # Refrescar interfaz para que se muestre el estado
+
+        analisis, mensaje = self.gestor.analizar_espacio(ruta)
+        self.espacio_analisis = analisis
+        self.mostrar_espacio()
+        self.actualizar_estado(mensaje)
+
+    def accion_gui_activar_busqueda_instantanea(self):
+        """Al activar la búsqueda instantánea se vuelve a indexar la ruta elegida."""
+        if self.buscar_instantanea.get():
+            self.accion_gui_busqueda_instantanea(reindexar=True)
+
+    def accion_gui_busqueda_instantanea(self, _evento=None, reindexar=False):
+        """Se llama en cada tecla: lanza la búsqueda en segundo plano y deja obsoletas las anteriores."""
+        if not self.buscar_instantanea.get():
+            return
+        generacion, _ = self._nueva_busqueda()
+        self._ejecutor_busqueda.submit(
+            self._buscar_en_segundo_plano, generacion,
+            self.buscar_ruta.get(), self.buscar_nombre.get(), reindexar
+        )
+
+    def _nueva_busqueda(self):
+        """
+        Deja obsoletas las búsquedas anteriores: aumenta la generación y activa el evento
+        de la búsqueda en varias carpetas que pueda seguir corriendo (así termina aunque no
+        encuentre nada). Devuelve (generación, evento para detener la nueva).
+        """
+        self._detener_busqueda.set()
+        self._detener_busqueda = threading.Event()
+        self._generacion_busqueda += 1
+        return self._generacion_busqueda, self._detener_busqueda
+
+    def _buscar_en_segundo_plano(self, generacion, ruta, consulta, reindexar):
+        """Corre en el hilo de búsqueda. No toca la ventana: deja el resultado en la cola."""
+        cancelado = lambda: generacion != self._generacion_busqueda
+        if cancelado():
+            return  # El usuario ya escribió otra tecla
+        tabla = self.gestor.obtener_tabla_nombres(
+            ruta, reconstruir=reindexar,
+            al_construir=lambda: self._cola_busqueda.put((generacion, None, "Indexando nombres, por favor espera...", False))
+        )
+        if tabla is None:
+            self._cola_busqueda.put((generacion, None, f"❌ Error: La ruta '{ruta}' no es un directorio válido.", False))
+            return
+        resultados = tabla.buscar(consulta, cancelado=cancelado, presupuesto=0.016)
+        if resultados is None:
+            return
+        mensaje = f"✅ {len(resultados)} coincidencias para '{consulta}'."
+        if tabla.parcial:
+            mensaje += " (parciales: sigue escribiendo para afinar)"
+        self._cola_busqueda.put((generacion, resultados, mensaje, False))
+
+    def _buscar_varias_en_segundo_plano(self, generacion, detener, raices, nombre):
+        """
+        Búsqueda en varias carpetas a la vez (corre en el hilo de búsqueda). Los resultados
+        se envían por lotes a la cola en cuanto aparecen, para agregarlos al texto.
+        `detener` se activa cuando empieza otra búsqueda: esta ya no se muestra.
+        """
+        lote, total = [], 0
+        ultimo_envio = 0.0  # El primer resultado se muestra apenas llega
+        for resultado in self.gestor.iterar_busqueda_multiple(raices, nombre, detener):
+            lote.append(resultado)
+            total += 1
+            if len(lote) >= 200 or time.monotonic() - ultimo_envio > 0.1:
+                mensaje = f"Buscando en {len(raices)} carpetas... {total} encontrados"
+                self._cola_busqueda.put((generacion, lote, mensaje, True))
+                lote, ultimo_envio = [], time.monotonic()
+        if generacion != self._generacion_busqueda:
+            return  # Se cortó porque empezó otra búsqueda
+        mensaje = f"✅ Búsqueda finalizada. {total} archivos encontrados en {len(raices)} carpetas."
+        self._cola_busqueda.put((generacion, lote, mensaje, True))
+
+    def _revisar_cola_busqueda(self):
+        """Muestra lo que dejó el hilo de búsqueda (solo si corresponde a la última tecla)."""
+        try:
+            while True:
+                generacion, resultados, mensaje, agregar = self._cola_busqueda.get_nowait()
+                if generacion != self._generacion_busqueda:
+                    continue
+                self.actualizar_estado(mensaje)
+                if agregar:
+                    # Búsqueda en varias carpetas: los lotes se suman a lo ya mostrado
+                    self.buscar_resultados_text.configure(state="normal")
+                    self.buscar_resultados_text.insert(tk.END, "".join(self._formatear_resultado(res) for res in resultados))
+                    self.buscar_resultados_text.configure(state="disabled")
+                elif resultados is not None:
+                    self.buscar_resultados_text.configure(state="normal")
+                    self.buscar_resultados_text.delete("1.0", tk.END)
+                    self.buscar_resultados_text.insert("1.0", "\n".join(f"Ruta: {ruta}" for _, ruta in resultados))
+                    self.buscar_resultados_text.configure(state="disabled")
+        except queue.Empty:
+            pass
+        self.after(30, self._revisar_cola_busqueda)
+
+    def accion_gui_exportar_busqueda(self):
+        """Repite la búsqueda actual escribiendo los resultados en el archivo elegido."""
+        ruta = self.buscar_ruta.get()
+        if not ruta:
+            self.actualizar_estado("❌ Error: Debes especificar una ruta para 'Buscar en:'.")
+            return
+        ruta_exportacion = filedialog.asksaveasfilename(
+            title="Exportar resultados", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON por líneas", "*.jsonl"), ("Columnar", "*.gcol"),
+                       ("Comprimido (gzip)", "*.gz"), ("Todos", "*.*")]
+        )
+        if not ruta_exportacion:
+            return
+        if self._exportacion_en_curso is not None:
+            self.actualizar_estado("ℹ️ Ya hay una exportación en curso; espera a que termine.")
+            return
+
+        # Los valores se leen aquí (hilo de la ventana); el recorrido y la escritura van en
+        # un hilo aparte para que la ventana siga respondiendo con millones de resultados.
+        # No usa el hilo de búsqueda: la búsqueda instantánea no queda esperando detrás.
+        nombre = self.buscar_nombre.get()
+        fecha_desde = self.buscar_fecha_desde.get().strip()
+        fecha_hasta = self.buscar_fecha_hasta.get().strip()
+        orden = {"Fecha": "fecha", "Tamaño": "tamano", "Dimensiones": "dimensiones"}.get(self.buscar_orden.get())
+        resultado = []
+        hilo = threading.Thread(
+            target=lambda: resultado.append(
+                self._exportar_en_segundo_plano(ruta, nombre, ruta_exportacion, fecha_desde, fecha_hasta, orden)
+            ),
+            daemon=True
+        )
+        self._exportacion_en_curso = (hilo, resultado)
+        hilo.start()
+        self.actualizar_estado(f"Exportando a {ruta_exportacion} en segundo plano...", "normal")
+        self.after(200, self._revisar_exportacion)
+
+    def _exportar_en_segundo_plano(self, ruta, nombre, ruta_exportacion, fecha_desde, fecha_hasta, orden):
+        """Corre en el hilo de exportación. No toca la ventana: devuelve el mensaje final."""
+        if fecha_desde or fecha_hasta or orden:
+            resultados, mensaje = self.gestor.buscar_multimedia(ruta, nombre, fecha_desde, fecha_hasta, orden)
+            if resultados:
+                mensaje = self.gestor.exportar_resultados(resultados, ruta_exportacion, ("ancho", "alto", "fecha"))
+            return mensaje
+        return self.gestor.exportar_busqueda(ruta, nombre, ruta_exportacion)
+
+    def _revisar_exportacion(self):
+        """Espera (sin bloquear la ventana) a que termine la exportación y muestra su resultado."""
+        hilo, resultado = self._exportacion_en_curso
+        if hilo.is_alive():
+            self.after(200, self._revisar_exportacion)
+            return
+        self._exportacion_en_curso = None
+        self.actualizar_estado(resultado[0] if resultado else "❌ Error: La exportación terminó sin resultado.")
+
     def accion_gui_buscar_limpiar(self):
         """Limpia los inputs y resultados de la pestaña de búsqueda."""
         self.buscar_nombre.delete(0, tk.END)
@@ -1034,10 +5174,16 @@ class App(customtkinter.CTk):
         self.buscar_resultados_text.configure(state="disabled")
         self.actualizar_estado("Campos de búsqueda limpiados.", "normal")
 
-    def accion_gui_compilador(self):
-        """Toma el comando en la línea actual del textbox, lo ejecuta y muestra la salida."""
-        # Obtenemos solo la línea donde está el cursor
-        codigo = self.compilador_input.get("insert linestart", "insert lineend").strip()
+    def accion_gui_compilador(self, todo=False):
+        """
+        Toma el comando en la línea actual del textbox (o todo el script si todo=True),
+        lo ejecuta y muestra la salida.
+        """
+        if todo:
+            codigo = self.compilador_input.get("1.0", tk.END).strip()
+        else:
+            # Obtenemos solo la línea donde está el cursor
+            codigo = self.compilador_input.get("insert linestart", "insert lineend").strip()
         if not codigo:
             self.actualizar_estado("❌ Escribe un comando en la pestaña del compilador.", "error")
             return
@@ -1060,6 +5206,36 @@ class App(customtkinter.CTk):
 # -----------------------------------------------------------------
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gestor Inteligente de Archivos")
+    parser.add_argument("--script", help="Ejecuta un script del compilador sin abrir la ventana")
+    parser.add_argument("--serve", action="store_true", help="Inicia el servicio HTTP/JSON local en vez de la ventana")
+    parser.add_argument("--puerto", type=int, nargs="?", const=PUERTO_SERVICIO,
+                        help=f"Escucha en 127.0.0.1 (puerto {PUERTO_SERVICIO} si no se indica) en vez del socket Unix")
+    parser.add_argument("--socket", help="Escucha en este socket Unix en vez de un puerto")
+    parser.add_argument("--hilos", type=int, default=HILOS_SERVICIO, help="Peticiones atendidas a la vez")
+    parser.add_argument("--medir-inicio", action="store_true",
+                        help="Abre la ventana, muestra cuánto tardó en aparecer y la cierra (para mediciones)")
+    parser.add_argument("--limite-mb", type=float, help="MB/s máximos de las operaciones masivas")
+    parser.add_argument("--limite-archivos", type=float, help="Archivos/s máximos de las operaciones masivas")
+    parser.add_argument("--nice", type=int, help="Prioridad de CPU (0-19) de los hilos de las operaciones masivas")
+    parser.add_argument("--prioridad-es", choices=list(PRIORIDADES_ES), help="Prioridad de disco de esos hilos")
+    parser.add_argument("--adaptativo", action=argparse.BooleanOptionalAction,
+                        help="Frenar las operaciones masivas cuando sube la latencia del disco "
+                             "(activado por defecto al poner límites; --no-adaptativo lo quita)")
+    argumentos = parser.parse_args()
+
     gestor_logico = GestorDeArchivos()  # Crear lógica de gestión de archivos
-    app = App(gestor_logico)            # Crear la GUI y pasarle la lógica
-    app.mainloop()                      # Iniciar el bucle principal de la ventana
+    if (argumentos.limite_mb or argumentos.limite_archivos or argumentos.nice is not None
+            or argumentos.prioridad_es or argumentos.adaptativo):  # None si no se indicó
+        # Ej: en un servidor compartido, para no quitarle disco a los demás servicios
+        print(gestor_logico.configurar_limites(argumentos.limite_mb, argumentos.limite_archivos, argumentos.nice,
+                                               argumentos.prioridad_es, argumentos.adaptativo is not False))
+    if argumentos.script:
+        # Modo sin ventana (ej: tareas programadas con cron)
+        print(MiniCompilador(gestor_logico).ejecutar_archivo(argumentos.script))
+    elif argumentos.serve:
+        # Modo servicio: otras herramientas de la máquina usan el gestor por HTTP
+        servir(gestor_logico, argumentos.puerto, argumentos.socket, argumentos.hilos)
+    else:
+        app = App(gestor_logico, argumentos.medir_inicio)  # Crear la GUI y pasarle la lógica
+        app.mainloop()                      # Iniciar el bucle principal de la ventana
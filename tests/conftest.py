@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# definitivo.py es un solo archivo en la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import definitivo  # noqa: E402
+
+
+@pytest.fixture
+def gestor():
+    return definitivo.GestorDeArchivos()
+
+
+@pytest.fixture
+def compilador(gestor):
+    return definitivo.MiniCompilador(gestor)
@@ -0,0 +1,48 @@
+import pytest
+
+import definitivo
+from definitivo import ExportadorResultados, ResultadosColumnares, leer_columnar
+
+FILAS = [(f"/datos/carpeta {i // 7}/archivo_ñ_{i}.txt", i * 1000) for i in range(50)]
+
+
+@pytest.fixture
+def resultados():
+    # Límite chico: vuelca a disco varias veces y deja una parte en memoria
+    res = ResultadosColumnares(limite_memoria=600)
+    res.ENTRADAS_POR_LECTURA = 4  # Lecturas del volcado en varios bloques
+    for ruta, tamano in FILAS:
+        res.agregar(ruta, tamano)
+    yield res
+    res.cerrar()
+
+
+def test_vuelca_a_disco_y_conserva_el_orden(resultados):
+    assert resultados._volcadas and resultados._fines  # Parte en disco y parte en memoria
+    assert len(resultados) == len(FILAS)
+    assert [(r['ruta'], r['tamano_bytes']) for r in resultados] == FILAS
+
+
+def test_acceso_por_indice_en_disco_y_en_memoria(resultados):
+    for indice in (0, resultados._volcadas - 1, resultados._volcadas, len(FILAS) - 1, -1):
+        assert (resultados[indice]['ruta'], resultados[indice]['tamano_bytes']) == FILAS[indice]
+    assert resultados[3]['extension'] == ".txt"
+    with pytest.raises(IndexError):
+        resultados[len(FILAS)]
+
+
+@pytest.mark.parametrize("nombre", ["resultados.gcol", "resultados.gcol.gz"])
+def test_exportar_y_leer_columnar(resultados, tmp_path, monkeypatch, nombre):
+    monkeypatch.setattr(definitivo, "FILAS_POR_GRUPO", 16)  # Varios grupos + uno incompleto
+    ruta = str(tmp_path / nombre)
+    with ExportadorResultados(ruta) as exportador:
+        for res in resultados:
+            exportador.escribir(res)
+    assert list(leer_columnar(ruta)) == FILAS
+
+
+def test_leer_columnar_rechaza_otros_archivos(tmp_path):
+    ruta = tmp_path / "otro.gcol"
+    ruta.write_bytes(b"ruta,extension\n")
+    with pytest.raises(ValueError):
+        list(leer_columnar(str(ruta)))
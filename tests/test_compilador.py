@@ -0,0 +1,81 @@
+import pytest
+
+from definitivo import ErrorDeSintaxis
+
+
+def cadenas(compilador, codigo):
+    return [valor for tipo, valor, _, _ in compilador.analizar_lexico(codigo) if tipo == 'cadena']
+
+
+def test_ruta_windows_con_barra_final(compilador):
+    assert cadenas(compilador, r'borrar "a.txt" en "C:\temp\"') == ["a.txt", "C:\\temp\\"]
+
+
+def test_ruta_windows_con_barra_final_y_mas_argumentos(compilador):
+    codigo = r'copiar "a.txt" desde "C:\temp\" hasta "D:\respaldo\"'
+    assert cadenas(compilador, codigo) == ["a.txt", "C:\\temp\\", "D:\\respaldo\\"]
+
+
+def test_ruta_unc_conserva_las_dos_barras(compilador):
+    assert cadenas(compilador, r'buscar "*" en "\\servidor\carpeta"') == ["*", "\\\\servidor\\carpeta"]
+
+
+def test_ruta_posix(compilador):
+    assert cadenas(compilador, 'borrar "a b.txt" en "/home/ana/mis documentos/"') == [
+        "a b.txt", "/home/ana/mis documentos/"
+    ]
+
+
+def test_cadena_vacia(compilador):
+    assert cadenas(compilador, 'x = ""') == [""]
+
+
+def test_cadena_sin_cerrar_indica_linea_y_columna(compilador):
+    with pytest.raises(ErrorDeSintaxis) as error:
+        compilador.analizar_lexico('crear archivo "a.txt" en "documentos"\nborrar "b.txt en x')
+    assert "cadena sin cerrar" in str(error.value)
+    assert (error.value.linea, error.value.columna) == (2, 8)
+
+
+# === Analizador sintáctico ===
+
+def test_compila_comandos_variables_y_bucles(compilador):
+    codigo = (
+        'crear archivo "a.txt" en "documentos"\n'
+        '$d = "x/${archivo}"\n'
+        'para cada "*.txt" en $d:\n'
+        '  borrar "${archivo}" en "${carpeta}"\n'
+        'fin'
+    )
+    assert compilador.compilar(codigo) == (
+        ('cmd', 'crear', {'nombre': ('lit', 'a.txt'), 'ruta': ('lit', 'documentos')}, 1),
+        ('asignar', 'd', ('plantilla', (('lit', 'x/'), ('var', 'archivo'))), 2),
+        ('para', ('lit', '*.txt'), ('var', 'd'), (
+            ('cmd', 'borrar', {'nombre': ('plantilla', (('var', 'archivo'),)),
+                               'ruta': ('plantilla', (('var', 'carpeta'),))}, 4),
+        ), 3),
+    )
+
+
+def test_opciones_en_cualquier_orden(compilador):
+    assert compilador.compilar('deduplicar "d" simular usando "hardlink"') == (
+        ('cmd', 'deduplicar', {'ruta': ('lit', 'd'), 'simular': ('lit', True),
+                               'estrategia': ('lit', 'hardlink')}, 1),
+    )
+
+
+@pytest.mark.parametrize("codigo, linea, columna, mensaje", [
+    ('crear archivo "a" en "b"\nvolar "x"', 2, 1, "comando desconocido: volar"),
+    ('mover "a.txt" hasta "b"', 1, 15, "se esperaba 'desde'"),
+    ('crear archivo "a" en', 1, 21, "falta <ruta>"),
+    ('borrar "a" en "b" "c"', 1, 19, "se esperaba el fin de la instrucción"),
+    ('deduplicar "d" simular simular', 1, 24, "opción inesperada 'simular'"),
+    ('$x "a"', 1, 4, "se esperaba '=' después de $x"),
+    ('para cada "*" "x":', 1, 15, "se esperaba 'en' después del patrón"),
+    ('para cada "*" en "x":\n borrar "a" en "b"\n', 3, 1, "falta 'fin'"),
+])
+def test_errores_de_sintaxis_indican_la_posicion(compilador, codigo, linea, columna, mensaje):
+    with pytest.raises(ErrorDeSintaxis) as error:
+        compilador.compilar(codigo)
+    assert (error.value.linea, error.value.columna) == (linea, columna)
+    assert mensaje in str(error.value)
@@ -0,0 +1,30 @@
+import os
+import zipfile
+
+
+def test_comprimir_dentro_de_la_carpeta_no_se_incluye(gestor, tmp_path):
+    origen = tmp_path / "src"
+    (origen / "sub").mkdir(parents=True)
+    (origen / "a.txt").write_text("hola")
+    (origen / "sub" / "b.txt").write_text("chau")
+    destino = str(origen / "out.zip")
+
+    # Dos veces: la segunda el .zip ya existe dentro de la carpeta
+    for _ in range(2):
+        assert gestor.comprimir(str(origen), destino).startswith("✅")
+        assert sorted(zipfile.ZipFile(destino).namelist()) == ["src/a.txt", "src/sub/b.txt"]
+    assert sorted(os.listdir(origen)) == ["a.txt", "out.zip", "sub"]
+
+
+def test_comprimir_fallido_no_deja_archivo(gestor, tmp_path, monkeypatch):
+    origen = tmp_path / "src"
+    origen.mkdir()
+    (origen / "a.txt").write_text("hola")
+
+    def sin_espacio(self, *args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(zipfile.ZipFile, "write", sin_espacio)
+    resultado = gestor.comprimir(str(origen), str(tmp_path / "nuevo.zip"))
+    assert resultado.startswith("❌")
+    assert sorted(os.listdir(tmp_path)) == ["src"]
@@ -0,0 +1,142 @@
+import os
+
+import pytest
+
+import definitivo
+from definitivo import NombresOcupados, renombrar_sin_sobrescribir
+
+
+def escribir(ruta, texto):
+    with open(ruta, "w") as f:
+        f.write(texto)
+
+
+def leer(ruta):
+    with open(ruta) as f:
+        return f.read()
+
+
+@pytest.fixture
+def carpetas(tmp_path):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    origen.mkdir()
+    destino.mkdir()
+    escribir(origen / "a.txt", "nuevo")
+    escribir(destino / "a.txt", "viejo")
+    return str(origen), str(destino)
+
+
+def test_mover_sin_conflicto(gestor, carpetas):
+    origen, destino = carpetas
+    escribir(os.path.join(origen, "b.txt"), "b")
+    resultado = gestor.mover_sin_conflictos(os.path.join(origen, "b.txt"), os.path.join(destino, "b.txt"))
+    assert resultado == ("movido", os.path.join(destino, "b.txt"))
+
+
+def test_politica_renombrar(gestor, carpetas):
+    origen, destino = carpetas
+    escribir(os.path.join(destino, "a (1).txt"), "otro")
+    resultado, final = gestor.mover_sin_conflictos(os.path.join(origen, "a.txt"), os.path.join(destino, "a.txt"))
+    assert (resultado, os.path.basename(final)) == ("renombrado", "a (2).txt")
+    assert leer(os.path.join(destino, "a.txt")) == "viejo"
+    assert leer(final) == "nuevo"
+
+
+def test_politica_saltar(gestor, carpetas):
+    origen, destino = carpetas
+    resultado, _ = gestor.mover_sin_conflictos(os.path.join(origen, "a.txt"), os.path.join(destino, "a.txt"), "saltar")
+    assert resultado == "saltado"
+    assert leer(os.path.join(origen, "a.txt")) == "nuevo"
+    assert leer(os.path.join(destino, "a.txt")) == "viejo"
+
+
+def test_politica_sobrescribir(gestor, carpetas):
+    origen, destino = carpetas
+    resultado, _ = gestor.mover_sin_conflictos(
+        os.path.join(origen, "a.txt"), os.path.join(destino, "a.txt"), "sobrescribir"
+    )
+    assert resultado == "sobrescrito"
+    assert leer(os.path.join(destino, "a.txt")) == "nuevo"
+    assert not os.path.exists(os.path.join(origen, "a.txt"))
+
+
+@pytest.mark.parametrize("origen_mas_nuevo, esperado, contenido", [
+    (True, "sobrescrito", "nuevo"),
+    (False, "saltado", "viejo"),
+])
+def test_politica_conservar_reciente(gestor, carpetas, origen_mas_nuevo, esperado, contenido):
+    origen, destino = carpetas
+    ruta_origen, ruta_destino = os.path.join(origen, "a.txt"), os.path.join(destino, "a.txt")
+    viejo, nuevo = 1_000_000_000, 2_000_000_000
+    os.utime(ruta_origen, (nuevo, nuevo) if origen_mas_nuevo else (viejo, viejo))
+    os.utime(ruta_destino, (viejo, viejo) if origen_mas_nuevo else (nuevo, nuevo))
+    resultado, _ = gestor.mover_sin_conflictos(ruta_origen, ruta_destino, "conservar_reciente")
+    assert resultado == esperado
+    assert leer(ruta_destino) == contenido
+
+
+def test_politica_desconocida(gestor, carpetas):
+    origen, destino = carpetas
+    with pytest.raises(ValueError):
+        gestor.mover_sin_conflictos(os.path.join(origen, "a.txt"), os.path.join(destino, "a.txt"), "pisar")
+
+
+def test_lote_comparte_nombres_ocupados(gestor, tmp_path):
+    destino = tmp_path / "destino"
+    destino.mkdir()
+    nombres = NombresOcupados()
+    finales = []
+    for numero in range(3):
+        ruta = tmp_path / f"{numero}.txt"
+        escribir(ruta, str(numero))
+        finales.append(os.path.basename(
+            gestor.mover_sin_conflictos(str(ruta), str(destino / "x.txt"), nombres=nombres)[1]
+        ))
+    assert finales == ["x.txt", "x (1).txt", "x (2).txt"]
+
+
+def test_renombrar_sin_sobrescribir_no_pisa(tmp_path):
+    escribir(tmp_path / "a", "a")
+    escribir(tmp_path / "b", "b")
+    with pytest.raises(FileExistsError):
+        renombrar_sin_sobrescribir(str(tmp_path / "a"), str(tmp_path / "b"))
+    assert leer(tmp_path / "a") == "a" and leer(tmp_path / "b") == "b"
+
+
+def _otro_volumen(tmp_path):
+    for candidata in ("/dev/shm", "/run/shm"):
+        if os.path.isdir(candidata) and os.access(candidata, os.W_OK) \
+                and os.stat(candidata).st_dev != os.stat(tmp_path).st_dev:
+            return candidata
+    pytest.skip("no hay otro volumen escribible para probar movimientos entre volúmenes")
+
+
+@pytest.fixture
+def origen_otro_volumen(tmp_path):
+    carpeta = os.path.join(_otro_volumen(tmp_path), f"gestor-prueba-{os.getpid()}")
+    os.makedirs(carpeta)
+    yield carpeta
+    definitivo.shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def test_entre_volumenes_no_pisa_temporales_ajenos(tmp_path, origen_otro_volumen):
+    escribir(os.path.join(origen_otro_volumen, "a.txt"), "a")
+    escribir(tmp_path / "a.txt.gestor-tmp", "ajeno")
+    renombrar_sin_sobrescribir(os.path.join(origen_otro_volumen, "a.txt"), str(tmp_path / "a.txt"))
+    assert leer(tmp_path / "a.txt") == "a"
+    assert leer(tmp_path / "a.txt.gestor-tmp") == "ajeno"
+    assert not os.path.exists(os.path.join(origen_otro_volumen, "a.txt"))
+
+
+def test_entre_volumenes_copia_fallida_no_deja_restos(tmp_path, origen_otro_volumen, monkeypatch):
+    escribir(os.path.join(origen_otro_volumen, "a.txt"), "a")
+
+    def disco_lleno(origen, destino, **_):
+        escribir(destino, "parcial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(definitivo.shutil, "copy2", disco_lleno)
+    with pytest.raises(OSError):
+        renombrar_sin_sobrescribir(os.path.join(origen_otro_volumen, "a.txt"), str(tmp_path / "a.txt"))
+    assert os.listdir(tmp_path) == []
+    assert os.path.exists(os.path.join(origen_otro_volumen, "a.txt"))
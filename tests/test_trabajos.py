@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import definitivo
+from definitivo import RegistroTrabajo
+
+LINEA_CORTADA = b'{"evento": "control", "hechos": 9, "contad'
+
+
+@pytest.fixture(autouse=True)
+def directorio_trabajos(tmp_path, monkeypatch):
+    directorio = tmp_path / "trabajos"
+    monkeypatch.setattr(definitivo, "DIRECTORIO_TRABAJOS", str(directorio))
+    return directorio
+
+
+def cortar_registro(registro):
+    """Simula un cierre brusco a mitad de escribir un punto de control."""
+    with open(registro.ruta, 'ab') as f:
+        f.write(LINEA_CORTADA)
+
+
+def test_cargar_ignora_la_linea_cortada(monkeypatch):
+    monkeypatch.setattr(definitivo, "PASOS_POR_LINEA", 4)  # El plan ocupa varias líneas
+    pasos = [f"archivo_{i}.txt" for i in range(10)]
+    registro = RegistroTrabajo.crear("copiar", {"ruta": "/a", "destino": "/b"}, pasos)
+    registro.abrir()
+    registro.punto_de_control(3, {"full": 3})
+    registro.punto_de_control(5, {"full": 5})
+    registro.cerrar()
+    cortar_registro(registro)
+
+    cargado = RegistroTrabajo.cargar(registro.ruta)
+    assert cargado.pasos == pasos
+    assert (cargado.hechos, cargado.contadores, cargado.estado) == (5, {"full": 5}, "interrumpido")
+
+    # Al reabrirlo, lo nuevo va en su propia línea y se lee bien
+    cargado.abrir()
+    cargado.punto_de_control(7, {"full": 7})
+    cargado.cerrar()
+    assert RegistroTrabajo.cargar(registro.ruta).hechos == 7
+    with open(registro.ruta, 'rb') as f:
+        assert LINEA_CORTADA + b"\n" in f.read()
+
+
+def test_reanudar_despues_de_un_cierre_brusco(gestor, tmp_path):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    origen.mkdir()
+    pasos = []
+    for i in range(5):
+        (origen / f"{i}.txt").write_text(f"contenido {i}")
+        pasos.append(f"{i}.txt")
+    registro = RegistroTrabajo.crear(
+        "copiar", {"ruta": str(origen), "destino": str(destino), "estrategia": "full", "patron": "*.txt"}, pasos
+    )
+    registro.abrir()
+    registro.punto_de_control(2, {"full": 2})  # Los dos primeros "ya se copiaron"
+    registro.cerrar()
+    cortar_registro(registro)
+
+    assert RegistroTrabajo.cargar(registro.ruta).estado == "interrumpido"
+    resultado = gestor.reanudar_trabajo(registro.id)
+    assert resultado.startswith("✅"), resultado
+
+    final = RegistroTrabajo.cargar(registro.ruta)
+    assert (final.estado, final.hechos, final.contadores["full"]) == ("completado", 5, 5)
+    # Solo se copiaron los pasos que faltaban después del punto de control
+    assert sorted(os.listdir(destino)) == ["2.txt", "3.txt", "4.txt"]
+    assert (destino / "4.txt").read_text() == "contenido 4"